@@ -0,0 +1,12 @@
+"""!@file conftest.py
+@brief pytest configuration.
+
+@details Adds the src folder to the import path, so modules that import their
+sibling packages like the scripts in src do (e.g. 'from processors import
+converters') can also be imported by the tests.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
@@ -0,0 +1,220 @@
+"""!@file benchmark.py
+@brief Script to benchmark the run time and memory of the sudoku solvers.
+
+@details This script solves sudoku files with several solvers and prints, per
+solver and sudoku, the best and mean solve time over a number of repeats and
+the peak memory and memory blocks of the solve measured with tracemalloc in
+one extra traced run (tracing slows the solvers down, so the timed runs are
+not traced). With --orderings the constraint satisfaction solver is
+benchmarked once per value ordering (ascending, lcv, random). The script can
+be run from the command line with the following
+command:
+
+python src/benchmark.py [sudoku files] [--solvers SOLVER ...] [--repeats N]
+[--no-memory] [--orderings ORDERING ...] [--seed SEED]
+
+If no sudoku files are given, the easy, medium and hard sudokus of the
+tests_resources folder are used.
+
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+import os
+import time
+import argparse
+import contextlib
+from processors import converters, memory
+from solvers import registry
+from solvers.constraint_satisfaction_solver import ORDERINGS
+
+# Sudoku files benchmarked by default
+DEFAULT_FILES = (
+    "tests_resources/easy_1.txt",
+    "tests_resources/medium_1.txt",
+    "tests_resources/hard_1.txt",
+)
+
+# === BENCHMARK FUNCTIONS =====================================================
+
+# 1. benchmark_solver
+
+
+def benchmark_solver(
+    sudoku, solver, repeats=3, track_memory=True, options=None
+):
+    """!@brief Benchmark one solver on one sudoku.
+
+    @param sudoku The sudoku array (list of lists)
+    @type sudoku list of lists
+    @param solver The solver name
+    @type solver str
+    @param repeats The number of timed solves
+    @type repeats int
+    @param track_memory Optional argument to measure the memory of one extra
+    traced solve
+    @type track_memory bool
+    @param options Optional keyword arguments of the solver function (e.g.
+    the ordering of the cs solver)
+    @type options dict
+    @return result The best and mean solve time in seconds ('best',
+    'mean'), whether the sudoku was solved ('solved'), the search statistics
+    of the solver ('stats') and, if tracked, the peak memory in bytes
+    ('peak') and the memory blocks allocated and kept ('blocks')
+    @rtype dict
+    """
+    solve_function = registry.get_solver(solver)
+    options = options or {}
+    times = []
+    stats = {}
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            sudoku_solved = solve_function(sudoku, stats=stats, **options)
+            times.append(time.perf_counter() - start_time)
+        result = {
+            "best": min(times),
+            "mean": sum(times) / len(times),
+            "solved": sudoku_solved is not None,
+            "stats": stats,
+        }
+        if track_memory:
+            tracker = memory.MemoryTracker()
+            tracker.start()
+            solve_function(sudoku, **options)
+            tracker.end_stage("solve")
+            usage = tracker.stop()["solve"]
+            result.update(peak=usage["peak"], blocks=usage["blocks"])
+    return result
+
+
+# 2. run_benchmark
+
+
+def run_benchmark(
+    sudoku_files,
+    solvers,
+    repeats=3,
+    track_memory=True,
+    orderings=None,
+    seed=None,
+):
+    """!@brief Benchmark several solvers on several sudoku files.
+
+    @param sudoku_files The paths to the sudoku files
+    @type sudoku_files list of str
+    @param solvers The solver names
+    @type solvers list of str
+    @param repeats The number of timed solves per solver and sudoku
+    @type repeats int
+    @param track_memory Optional argument to measure the memory of each
+    solve
+    @type track_memory bool
+    @param orderings Optional value orderings to compare for the cs solver,
+    which then gets one row per ordering (labelled e.g. 'cs/lcv')
+    @type orderings list of str
+    @param seed Optional seed of the 'random' ordering
+    @type seed int
+    @return rows One row per solver and sudoku file: the file and solver
+    names and the result of benchmark_solver
+    @rtype list of dicts
+    @raises ValueError If a solver or an ordering is unknown
+    """
+    # Solver label: (solver name, keyword arguments of the solver)
+    variants = []
+    for solver in solvers:
+        registry.get_solver(solver)
+        if solver == "cs" and orderings:
+            for ordering in orderings:
+                if ordering not in ORDERINGS:
+                    raise ValueError(f"Unknown ordering '{ordering}'.\n")
+                options = dict(ordering=ordering, seed=seed)
+                variants.append((f"cs/{ordering}", solver, options))
+        else:
+            variants.append((solver, solver, None))
+    rows = []
+    for sudoku_file in sudoku_files:
+        sudoku = converters.convert_sudoku_txt_to_arr(sudoku_file)
+        for label, solver, options in variants:
+            result = benchmark_solver(
+                sudoku, solver, repeats, track_memory, options
+            )
+            rows.append(
+                dict(file=os.path.basename(sudoku_file), solver=label) | result
+            )
+    return rows
+
+
+# 3. format_table
+
+
+def format_table(rows):
+    """!@brief Formats benchmark rows as a text table.
+
+    @param rows The rows returned by run_benchmark
+    @type rows list of dicts
+    @return table The table with one line per row
+    @rtype str
+    """
+    header = (
+        f"{'sudoku':<16} {'solver':<12} {'best [s]':>10} {'mean [s]':>10} "
+        f"{'peak [KiB]':>11} {'blocks':>8} {'nodes':>9}"
+    )
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        peak = f"{row['peak'] / 1024:.1f}" if "peak" in row else "-"
+        blocks = row.get("blocks", "-")
+        # Search nodes of bt/cs, decisions of sat
+        stats = row["stats"]
+        nodes = stats.get("nodes", stats.get("decisions", "-"))
+        lines.append(
+            f"{row['file']:<16} {row['solver']:<12} {row['best']:>10.5f} "
+            f"{row['mean']:>10.5f} {peak:>11} {blocks:>8} {nodes:>9}"
+        )
+    return "\n".join(lines)
+
+
+# === MAIN ====================================================================
+
+
+def main():
+    """!@brief Parse command line arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the run time and memory of the solvers."
+    )
+    parser.add_argument("files", nargs="*", default=list(DEFAULT_FILES))
+    parser.add_argument(
+        "--solvers",
+        nargs="+",
+        default=["bt", "cs", "sat"],
+        choices=list(registry.SOLVERS),
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--no-memory",
+        dest="track_memory",
+        action="store_false",
+        help="skip the traced run that measures the memory",
+    )
+    parser.add_argument(
+        "--orderings",
+        nargs="+",
+        default=None,
+        choices=list(ORDERINGS),
+        help="compare these value orderings of the cs solver",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    rows = run_benchmark(
+        args.files,
+        args.solvers,
+        args.repeats,
+        args.track_memory,
+        args.orderings,
+        args.seed,
+    )
+    print(format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""!@file generate_sudokus.py
+@brief Script to generate sudoku puzzles with a unique solution.
+
+@details This script generates sudokus in parallel across processes and writes
+them to a corpus file in 'line' format (one sudoku per line), optionally with
+their solutions in a second corpus file with the same line order. The script
+can be run from the command line with the following command:
+
+python src/generate_sudokus.py output.txt count [--tier TIER | --clues N]
+[--solutions solutions.txt] [--seed SEED] [--processes N]
+
+where TIER is one of easy, medium, hard, extreme.
+
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+import time
+import itertools
+import argparse
+from processors import corpus
+from solvers import generator
+
+# === MAIN ====================================================================
+
+
+def main():
+    """!@brief Parse command line arguments and generate the sudokus."""
+    parser = argparse.ArgumentParser(
+        description="Generate sudokus with a unique solution."
+    )
+    parser.add_argument("output", help="corpus file for the sudokus")
+    parser.add_argument("count", type=int, help="number of sudokus")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--tier", choices=list(generator.TIERS))
+    group.add_argument("--clues", type=int, help="target number of clues")
+    parser.add_argument("--solutions", help="corpus file for the solutions")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    start_time = time.time()
+    pairs = generator.generate_sudokus(
+        args.count,
+        target_clues=args.clues,
+        tier=args.tier,
+        seed=args.seed,
+        processes=args.processes,
+    )
+    # Stream chunks of sudokus (and solutions) to the corpus files
+    count = 0
+    while True:
+        chunk = list(itertools.islice(pairs, 4096))
+        corpus.write_corpus(
+            args.output, [sudoku for sudoku, _ in chunk], append=count > 0
+        )
+        if args.solutions:
+            corpus.write_corpus(
+                args.solutions,
+                [sudoku_solved for _, sudoku_solved in chunk],
+                append=count > 0,
+            )
+        count += len(chunk)
+        if not chunk:
+            break
+    duration = time.time() - start_time
+    print(
+        f"Generated {count} sudokus in {duration:.2f} seconds "
+        f"({count / max(duration, 1e-9):.1f} sudokus/second)."
+    )
+
+
+if __name__ == "__main__":
+    main()
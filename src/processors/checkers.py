@@ -1,6 +1,11 @@
 import os
 import shutil
 import re
+import collections
+import functools
+import itertools
+from .topology import STANDARD
+from . import converters, corpus
 
 # flake8: noqa F401
 import typing
@@ -16,11 +21,34 @@ sudoku file is valid, if the sudoku puzzle itself is valid or if it is solved.
 It returns False otherwise. The sudoku file is valid if it has the correct file
 type and content. The sudoku puzsle is valid if it has no duplicates in the
 rows, columns or subgrids. The sudoku puzzle is solved if it has no duplicates
-or zeros in the rows, columns or subgrids.
+or zeros in the rows, columns or subgrids. In repair mode, the formatting
+problems that is_sudoku_file_valid fixes by writing a '_fixed.txt' file are
+repaired in memory instead and reported as Diagnostic tuples. The batch
+checkers check N sudokus at once as an N x 81 NumPy array: the numbers of
+each unit are gathered with one fancy index and turned into 9-bit masks, so
+whole solution files (packed binary files or corpus files in 'line' format)
+are verified without a Python loop per sudoku.
 
 @author Created by Steven Dillmann 17/12/2023
 """
 
+# Expected format of the numbered lines and separator lines
+NUMBERED_LINE = re.compile(r"^([0-9]{3})\|?([0-9]{3})\|?([0-9]{3})$")
+SEPARATOR_LINE = "---+---+---"
+# A sudoku in 'line' format: 81 ASCII digits, '0' or '.' for empty cells
+SUDOKU_LINE = re.compile(r"[0-9.]{81}")
+# A problem found in a sudoku file: a short code (e.g. 'whitespace'), the
+# 1-based line number (None for the whole file), a message and whether it
+# was repaired
+Diagnostic = collections.namedtuple(
+    "Diagnostic", ["code", "line", "message", "repaired"]
+)
+# Numbers of a solved unit
+NUMBERS = frozenset(range(1, 10))
+# Mask of a unit of the batch checkers with the numbers 1 to 9 (bit = 1 <<
+# num)
+ALL_NUMBERS = 0x3FE
+
 # 1. is_sudoku_file_valid
 
 
@@ -51,7 +79,7 @@ def is_sudoku_file_valid(sudoku_file):
 # 2. is_sudoku_valid
 
 
-def is_sudoku_valid(sudoku_arr):
+def is_sudoku_valid(sudoku_arr, topology=STANDARD):
     """!@brief Check if the sudoku puzzle is valid.
 
     @details This function checks if the sudoku puzzle is valid by examining
@@ -59,6 +87,9 @@ def is_sudoku_valid(sudoku_arr):
 
     @param sudoku_arr The sudoku array (list of lists) to check
     @type sudoku_arr list
+    @param topology Optional topology of the sudoku (e.g. X-sudoku or jigsaw
+    regions), defaults to the standard sudoku
+    @type topology Topology
     @return True if the sudoku is valid, False otherwise
     @rtype bool
     @raises TypeError: If the sudoku array is not a list of lists
@@ -76,28 +107,10 @@ def is_sudoku_valid(sudoku_arr):
         non_zeros_list = [num for num in list_of_numbers if num != 0]
         return len(non_zeros_list) != len(set(non_zeros_list))
 
-    # Check rows for duplicates
-    for row_idx, row in enumerate(sudoku_arr):
-        if check_duplicates(row):
-            error_list.append(f"Duplicate numbers in row {row_idx + 1}.\n")
-    # Check columns for duplicates
-    for col in range(9):
-        column = [sudoku_arr[row][col] for row in range(9)]
-        if check_duplicates(column):
-            error_list.append(f"Duplicate numbers in column {col + 1}.\n")
-    # Check subgrids for duplicates
-    for i in range(0, 9, 3):
-        for j in range(0, 9, 3):
-            subgrid = [
-                sudoku_arr[a][b]
-                for a in range(i, i + 3)
-                for b in range(j, j + 3)
-            ]
-            if check_duplicates(subgrid):
-                error_list.append(
-                    f"Duplicate numbers in subgrid starting"
-                    f"at cell ({i + 1}, {j + 1}).\n"
-                )
+    # Check rows, columns and subgrids for duplicates
+    for unit, label in zip(topology.unit_coords, topology.unit_labels):
+        if check_duplicates([sudoku_arr[row][col] for row, col in unit]):
+            error_list.append(f"Duplicate numbers in {label}.\n")
     # Print error messages if there are any and return False
     if error_list:
         for error_message in error_list:
@@ -110,7 +123,7 @@ def is_sudoku_valid(sudoku_arr):
 # 3. is_sudoku_solved
 
 
-def is_sudoku_solved(sudoku_arr):
+def is_sudoku_solved(sudoku_arr, topology=STANDARD, verbose=True):
     """!@brief Check if the sudoku puzzle is solved.
 
     @details This function checks if the sudoku puzzle is solved by examining
@@ -118,6 +131,12 @@ def is_sudoku_solved(sudoku_arr):
 
     @param sudoku_arr The sudoku array (list of lists) to check
     @type sudoku_arr list
+    @param topology Optional topology of the sudoku (e.g. X-sudoku or jigsaw
+    regions), defaults to the standard sudoku
+    @type topology Topology
+    @param verbose Optional argument to print the units that are not solved
+    (False returns at the first one, e.g. to check candidate solutions)
+    @type verbose bool
     @return True if the sudoku is solved, False otherwise
     @rtype bool
     @raises TypeError If the sudoku array is not a list of lists
@@ -129,28 +148,12 @@ def is_sudoku_solved(sudoku_arr):
         raise TypeError("Input Sudoku should be a list of lists.")
     # Store error messages in a list
     error_list = []
-    # Check rows and columns for unique numbers and zeros
-    for i in range(9):
-        row_numbers = set(sudoku_arr[i])
-        col_numbers = set(sudoku_arr[j][i] for j in range(9))
-
-        if len(row_numbers) != 9:
-            error_list.append(f"Duplicate/missing numbers in row {i+1}.\n")
-
-        if len(col_numbers) != 9:
-            error_list.append(f"Duplicate/missing numbers in column {i+1}.\n")
-    # Check subgrids for unique numbers and zeros
-    for a in range(0, 9, 3):
-        for b in range(0, 9, 3):
-            subgrid_numbers = set()
-            for i in range(3):
-                for j in range(3):
-                    subgrid_numbers.add(sudoku_arr[a + i][b + j])
-            if len(subgrid_numbers) != 9:
-                error_list.append(
-                    f"Duplicate/missing numbers in subgrid"
-                    f"starting at cell ({a+1}, {b+1}).\n"
-                )
+    # Check rows, columns and subgrids for unique numbers and zeros
+    for unit, label in zip(topology.unit_coords, topology.unit_labels):
+        if {sudoku_arr[row][col] for row, col in unit} != NUMBERS:
+            if not verbose:
+                return False
+            error_list.append(f"Duplicate/missing numbers in {label}.\n")
     if error_list:
         for error_message in error_list:
             print("Error: ", error_message)
@@ -159,6 +162,381 @@ def is_sudoku_solved(sudoku_arr):
     return True
 
 
+# 4. repair_sudoku_file
+
+
+def repair_sudoku_file(sudoku_file):
+    """!@brief Reads a sudoku file and repairs its formatting in memory.
+
+    @details Unlike is_sudoku_file_valid, no '_fixed.txt' file is written: a
+    wrong file extension is reported and the content is read anyway, and the
+    content is repaired with repair_sudoku_text.
+
+    @param sudoku_file The path to the sudoku file
+    @type sudoku_file str
+    @return sudoku_txt The repaired sudoku text, or None if the file cannot
+    be repaired
+    @rtype str or None
+    @return diagnostics The problems found
+    @rtype list of Diagnostic
+    @raises FileNotFoundError If the sudoku file does not exist
+    """
+    diagnostics = []
+    file_extension = os.path.splitext(sudoku_file)[1]
+    if file_extension != ".txt":
+        diagnostics.append(
+            Diagnostic(
+                "extension",
+                None,
+                f"File extension '{file_extension}' is not '.txt'.",
+                True,
+            )
+        )
+    try:
+        with open(sudoku_file, "r") as file:
+            sudoku_txt = file.read()
+    except UnicodeDecodeError:
+        diagnostics.append(
+            Diagnostic("encoding", None, "File is not a text file.", False)
+        )
+        return None, diagnostics
+    sudoku_txt, content_diagnostics = repair_sudoku_text(sudoku_txt)
+    return sudoku_txt, diagnostics + content_diagnostics
+
+
+# 5. repair_sudoku_text
+
+
+def repair_sudoku_text(sudoku_txt):
+    """!@brief Repairs the formatting of sudoku text in memory.
+
+    @details Strips white space, removes empty lines, adds missing '|'
+    separators to the numbered lines and replaces missing or malformed
+    separator lines (lines without digits after the 3rd and 6th numbered
+    line) with '---+---+---'. Lines with other characters and a wrong number
+    of numbered lines cannot be repaired.
+
+    @param sudoku_txt The content of a sudoku file
+    @type sudoku_txt str
+    @return sudoku_txt The repaired sudoku text in the expected format, or
+    None if it cannot be repaired
+    @rtype str or None
+    @return diagnostics The problems found, in order of the lines
+    @rtype list of Diagnostic
+
+    Example:
+    >>> repair_sudoku_text("  000|007|000\n\n000009504 ...")
+    ('000|007|000\n000|009|504\n...', [Diagnostic(code='whitespace',
+    line=1, message='Leading/trailing white space.', repaired=True), ...])
+    """
+    diagnostics = []
+    sudoku_lines = sudoku_txt.split("\n")
+    blank_lines = [
+        i for i, line in enumerate(sudoku_lines) if not line.strip()
+    ]
+    filled_lines = [
+        i for i in range(len(sudoku_lines)) if i not in blank_lines
+    ]
+    # Report white space and empty lines (leading, middle and trailing)
+    for i, line in enumerate(sudoku_lines):
+        if line.strip() and line != line.strip():
+            diagnostics.append(
+                Diagnostic(
+                    "whitespace", i + 1, "Leading/trailing white space.", True
+                )
+            )
+            break
+    first = filled_lines[0] if filled_lines else len(sudoku_lines)
+    last = filled_lines[-1] if filled_lines else -1
+    for code, lines in (
+        ("leading_empty_lines", [i for i in blank_lines if i < first]),
+        ("middle_empty_lines", [i for i in blank_lines if first < i < last]),
+        ("trailing_empty_lines", [i for i in blank_lines if i > last]),
+    ):
+        # A single final newline is not a trailing empty line
+        if code == "trailing_empty_lines" and lines == [len(sudoku_lines) - 1]:
+            continue
+        if lines:
+            message = f"{code.replace('_', ' ').capitalize()} removed."
+            diagnostics.append(Diagnostic(code, lines[0] + 1, message, True))
+    # Parse the numbered lines and separator lines
+    rows = []
+    separators = {}
+    for i in filled_lines:
+        line = "".join(sudoku_lines[i].split())
+        match = NUMBERED_LINE.match(line)
+        if match:
+            row = "|".join(match.groups())
+            if row != line:
+                diagnostics.append(
+                    Diagnostic(
+                        "numbered_line",
+                        i + 1,
+                        f"Line {i + 1} normalised to '{row}'.",
+                        True,
+                    )
+                )
+            rows.append(row)
+        elif (
+            len(rows) in (3, 6)
+            and len(rows) not in separators
+            and not any(char.isdigit() for char in line)
+        ):
+            separators[len(rows)] = i
+            if line != SEPARATOR_LINE:
+                diagnostics.append(
+                    Diagnostic(
+                        "separator_line",
+                        i + 1,
+                        f"Line {i + 1} replaced by '{SEPARATOR_LINE}'.",
+                        True,
+                    )
+                )
+        else:
+            diagnostics.append(
+                Diagnostic(
+                    "line_format",
+                    i + 1,
+                    f"Line {i + 1} doesn't match expected format.",
+                    False,
+                )
+            )
+            return None, diagnostics
+    if len(rows) != 9:
+        diagnostics.append(
+            Diagnostic(
+                "line_count",
+                None,
+                f"Expected 9 numbered lines, found {len(rows)}.",
+                False,
+            )
+        )
+        return None, diagnostics
+    for position in (3, 6):
+        if position not in separators:
+            diagnostics.append(
+                Diagnostic(
+                    "separator_line",
+                    None,
+                    f"Missing separator after numbered line {position} "
+                    "added.",
+                    True,
+                )
+            )
+    sudoku_lines = (
+        rows[:3] + [SEPARATOR_LINE] + rows[3:6] + [SEPARATOR_LINE] + rows[6:]
+    )
+    return "\n".join(sudoku_lines), diagnostics
+
+
+# 6. is_sudoku_valid_batch
+
+
+def is_sudoku_valid_batch(sudokus, topology=STANDARD):
+    """!@brief Check if a batch of sudoku puzzles is valid.
+
+    @details Vectorized version of is_sudoku_valid for N sudokus, without
+    printing: a unit is invalid if it has a number more than once (zeros
+    excluded).
+
+    @param sudokus The sudokus (N x 81 or N x 9 x 9 numbers from 0 to 9)
+    @type sudokus numpy.ndarray or list
+    @param topology Optional topology of the sudokus, defaults to the
+    standard sudoku
+    @type topology Topology
+    @return valid True for each valid sudoku
+    @rtype numpy.ndarray of bool
+    @return first_unit The index of the first invalid unit of each sudoku
+    (see topology.unit_labels), -1 for valid sudokus
+    @rtype numpy.ndarray of int
+    @raises ValueError If the sudokus contain numbers outside 0 to 9
+    """
+    import numpy as np
+
+    bits, sizes = _get_mask_tables()
+    unit_cells = _get_unit_cells(_get_cells(sudokus), topology)
+    masks = np.bitwise_or.reduce(bits[unit_cells], axis=2)
+    # A unit is valid if it has as many different numbers as filled cells
+    filled = np.count_nonzero(unit_cells, axis=2)
+    return _get_first_unit(sizes[masks] != filled)
+
+
+# 7. is_sudoku_solved_batch
+
+
+def is_sudoku_solved_batch(sudokus, topology=STANDARD):
+    """!@brief Check if a batch of sudoku puzzles is solved.
+
+    @details Vectorized version of is_sudoku_solved for N sudokus, without
+    printing: a unit is solved if it has the numbers 1 to 9.
+
+    @param sudokus The sudokus (N x 81 or N x 9 x 9 numbers from 0 to 9)
+    @type sudokus numpy.ndarray or list
+    @param topology Optional topology of the sudokus, defaults to the
+    standard sudoku
+    @type topology Topology
+    @return solved True for each solved sudoku
+    @rtype numpy.ndarray of bool
+    @return first_unit The index of the first unsolved unit of each sudoku
+    (see topology.unit_labels), -1 for solved sudokus
+    @rtype numpy.ndarray of int
+    @raises ValueError If the sudokus contain numbers outside 0 to 9
+    """
+    import numpy as np
+
+    bits, _ = _get_mask_tables()
+    unit_cells = _get_unit_cells(_get_cells(sudokus), topology)
+    masks = np.bitwise_or.reduce(bits[unit_cells], axis=2)
+    # 9 cells with the 9 numbers have no duplicates and no zeros
+    return _get_first_unit(masks != ALL_NUMBERS)
+
+
+# 8. verify_solution_batch
+
+
+def verify_solution_batch(sudokus, solutions, topology=STANDARD):
+    """!@brief Verify a batch of solutions against their sudoku puzzles.
+
+    @details A solution is verified if it is solved and keeps every given
+    number of its sudoku. The first offending unit is the first unit that is
+    not solved or has a changed given number.
+
+    @param sudokus The sudokus (N x 81 or N x 9 x 9 numbers from 0 to 9)
+    @type sudokus numpy.ndarray or list
+    @param solutions The solutions of the sudokus (same shape)
+    @type solutions numpy.ndarray or list
+    @param topology Optional topology of the sudokus, defaults to the
+    standard sudoku
+    @type topology Topology
+    @return verified True for each verified solution
+    @rtype numpy.ndarray of bool
+    @return first_unit The index of the first offending unit of each
+    solution (see topology.unit_labels), -1 for verified solutions
+    @rtype numpy.ndarray of int
+    @raises ValueError If the numbers of sudokus and solutions differ or
+    they contain numbers outside 0 to 9
+    """
+    import numpy as np
+
+    cells = _get_cells(sudokus)
+    solution_cells = _get_cells(solutions)
+    if cells.shape != solution_cells.shape:
+        raise ValueError("Number of sudokus and solutions differ.\n")
+    bits, _ = _get_mask_tables()
+    unit_cells = _get_unit_cells(solution_cells, topology)
+    masks = np.bitwise_or.reduce(bits[unit_cells], axis=2)
+    # A given number changed by the solution fails all units of its cell
+    changed = (cells != 0) & (cells != solution_cells)
+    changed_units = _get_unit_cells(changed, topology).any(axis=2)
+    return _get_first_unit((masks != ALL_NUMBERS) | changed_units)
+
+
+# 9. verify_sudoku_bin_file
+
+
+def verify_sudoku_bin_file(bin_file, topology=STANDARD, chunk_size=65536):
+    """!@brief Verify the solutions stored in a packed binary file.
+
+    @details Reads the memory-mapped file (see
+    converters.write_sudoku_bin_file) in chunks of sudokus, so the memory
+    stays bounded for files of any size, and verifies each chunk with
+    verify_solution_batch.
+
+    @param bin_file The path to the packed binary file with solutions
+    @type bin_file str
+    @param topology Optional topology of the sudokus, defaults to the
+    standard sudoku
+    @type topology Topology
+    @param chunk_size Optional number of sudokus verified at once
+    @type chunk_size int
+    @return verified True for each verified solution
+    @rtype numpy.ndarray of bool
+    @return first_unit The index of the first offending unit of each
+    solution, -1 for verified solutions
+    @rtype numpy.ndarray of int
+    @raises ValueError If the file is not a packed binary sudoku file or
+    has no solutions
+    """
+    import numpy as np
+
+    sudokus, solutions = converters.read_sudoku_bin_file(bin_file)
+    if solutions is None:
+        raise ValueError(f"'{bin_file}' has no solutions.\n")
+    verified = np.empty(len(sudokus), dtype=bool)
+    first_unit = np.empty(len(sudokus), dtype=np.intp)
+    for start in range(0, len(sudokus), chunk_size):
+        stop = start + chunk_size
+        verified[start:stop], first_unit[start:stop] = verify_solution_batch(
+            converters.unpack_sudoku_batch(sudokus[start:stop]),
+            converters.unpack_sudoku_batch(solutions[start:stop]),
+            topology,
+        )
+    return verified, first_unit
+
+
+# 10. verify_sudoku_line_files
+
+
+def verify_sudoku_line_files(
+    sudoku_file, solution_file, topology=STANDARD, chunk_size=65536
+):
+    """!@brief Verify the solutions in a corpus file in 'line' format
+    against the sudokus of another.
+
+    @details Streams both (compressed) corpus files with
+    corpus.iter_corpus_lines, so the memory stays bounded for files of any
+    size, and verifies chunks of sudokus with verify_solution_batch. The
+    solution of sudoku i is the i-th line of the solution file (as written
+    by generate_sudokus.py --solutions).
+
+    @param sudoku_file The path to the corpus file with the sudokus
+    @type sudoku_file str
+    @param solution_file The path to the corpus file with the solutions
+    @type solution_file str
+    @param topology Optional topology of the sudokus, defaults to the
+    standard sudoku
+    @type topology Topology
+    @param chunk_size Optional number of sudokus verified at once
+    @type chunk_size int
+    @return verified True for each verified solution
+    @rtype numpy.ndarray of bool
+    @return first_unit The index of the first offending unit of each
+    solution, -1 for verified solutions
+    @rtype numpy.ndarray of int
+    @raises ValueError If a line is not a sudoku in 'line' format or the
+    files have different numbers of sudokus
+    """
+    import numpy as np
+
+    pairs = itertools.zip_longest(
+        corpus.iter_corpus_lines(sudoku_file),
+        corpus.iter_corpus_lines(solution_file),
+    )
+    verified, first_unit = [], []
+    start = 0
+    while True:
+        chunk = list(itertools.islice(pairs, chunk_size))
+        if not chunk:
+            break
+        sudokus, solutions = zip(*chunk)
+        if None in sudokus or None in solutions:
+            raise ValueError(
+                f"'{sudoku_file}' and '{solution_file}' have different "
+                "numbers of sudokus.\n"
+            )
+        chunk_verified, chunk_first_unit = verify_solution_batch(
+            _get_line_cells(sudokus, sudoku_file, start),
+            _get_line_cells(solutions, solution_file, start),
+            topology,
+        )
+        verified.append(chunk_verified)
+        first_unit.append(chunk_first_unit)
+        start += len(chunk)
+    if not verified:
+        return np.empty(0, dtype=bool), np.empty(0, dtype=np.intp)
+    return np.concatenate(verified), np.concatenate(first_unit)
+
+
 # === HELPER FUNCTIONS ========================================================
 
 # 1.1 is_file_type_valid
@@ -303,3 +681,109 @@ def is_file_content_valid(sudoku_file):
             print("Please use this new file as input.\n")
             return False
     return True
+
+
+# 6.1 _get_cells
+
+
+def _get_cells(sudokus):
+    """!@brief Gets a batch of sudokus as an N x 81 array of numbers.
+
+    @param sudokus The sudokus (N x 81 or N x 9 x 9 numbers from 0 to 9)
+    @type sudokus numpy.ndarray or list
+    @return cells The sudokus (N x 81)
+    @rtype numpy.ndarray
+    @raises ValueError If the sudokus contain numbers outside 0 to 9
+    """
+    import numpy as np
+
+    cells = np.asarray(sudokus).reshape(-1, 81)
+    if cells.size and (cells.min() < 0 or cells.max() > 9):
+        raise ValueError("Sudoku numbers must be between 0 and 9.\n")
+    return cells
+
+
+# 6.2 _get_unit_cells
+
+
+def _get_unit_cells(cells, topology):
+    """!@brief Gathers the cells of each unit of a batch of sudokus.
+
+    @param cells The sudokus (N x 81)
+    @type cells numpy.ndarray
+    @param topology The topology of the sudokus
+    @type topology Topology
+    @return unit_cells The cells of each unit (N x units x 9)
+    @rtype numpy.ndarray
+    """
+    import numpy as np
+
+    return cells[:, np.asarray(topology.units)]
+
+
+# 6.3 _get_first_unit
+
+
+def _get_first_unit(bad_units):
+    """!@brief Gets the result of a batch check from its failed units.
+
+    @param bad_units True for each failed unit of each sudoku (N x units)
+    @type bad_units numpy.ndarray of bool
+    @return ok True for each sudoku without failed units
+    @rtype numpy.ndarray of bool
+    @return first_unit The index of the first failed unit, -1 if none
+    @rtype numpy.ndarray of int
+    """
+    import numpy as np
+
+    failed = bad_units.any(axis=1)
+    return ~failed, np.where(failed, bad_units.argmax(axis=1), -1)
+
+
+# 6.4 _get_mask_tables
+
+
+@functools.lru_cache(maxsize=None)
+def _get_mask_tables():
+    """!@brief Builds the lookup tables of the batch checkers once.
+
+    @return bits The bit of each number (1 << num, none for 0)
+    @rtype numpy.ndarray of uint16
+    @return sizes The number of numbers of each mask
+    @rtype numpy.ndarray of uint8
+    """
+    import numpy as np
+
+    bits = np.array([0] + [1 << num for num in range(1, 10)], dtype=np.uint16)
+    sizes = np.array(
+        [bin(mask).count("1") for mask in range(1 << 10)], dtype=np.uint8
+    )
+    return bits, sizes
+
+
+# 10.1 _get_line_cells
+
+
+def _get_line_cells(lines, corpus_file, start):
+    """!@brief Gets sudokus in 'line' format as an N x 81 array of numbers.
+
+    @param lines The sudokus in 'line' format
+    @type lines list of str
+    @param corpus_file The path to the corpus file (for error messages)
+    @type corpus_file str
+    @param start The index of the first sudoku in the corpus file
+    @type start int
+    @return cells The sudokus (N x 81)
+    @rtype numpy.ndarray
+    @raises ValueError If a line is not a sudoku in 'line' format
+    """
+    import numpy as np
+
+    for i, line in enumerate(lines):
+        if SUDOKU_LINE.fullmatch(line) is None:
+            raise ValueError(
+                f"Sudoku {start + i} of '{corpus_file}' is not a sudoku in "
+                "'line' format.\n"
+            )
+    text = "".join(lines).replace(".", "0").encode("ascii")
+    return (np.frombuffer(text, dtype=np.uint8) - 48).reshape(-1, 81)
@@ -1,4 +1,4 @@
-import textwrap
+import struct
 
 # flake8: noqa F401
 import typing
@@ -9,11 +9,42 @@ import typing
 (list of lists) and vice versa.
 
 @details This script takes a sudoku text file as an input and returns a sudoku
-array (list of lists) and vice versa.
+array (list of lists) and vice versa. Sudoku arrays can also be formatted
+(individually or in batches) into the 'boxed' text format or the 81-character
+'line' format, and packed into a compact binary format with 4 bits per cell.
 
 @author Created by Steven Dillmann 17/12/2023
 """
 
+# Precomputed output templates, filled with a single '%' formatting call
+_ROW_TEMPLATE = "%d%d%d|%d%d%d|%d%d%d"
+_SEPARATOR_LINE = "---+---+---"
+SUDOKU_TEMPLATES = {
+    # 11-line format with '|' and '---+---+---' separators
+    "boxed": "\n".join(
+        [_ROW_TEMPLATE] * 3
+        + [_SEPARATOR_LINE]
+        + [_ROW_TEMPLATE] * 3
+        + [_SEPARATOR_LINE]
+        + [_ROW_TEMPLATE] * 3
+    ),
+    # 81-character single line format (row by row, zeros for empty cells)
+    "line": "%d" * 81,
+}
+# Separator between consecutive sudokus in a batch, per output format
+_BATCH_SEPARATORS = {"boxed": "\n\n", "line": "\n"}
+# Number of sudokus rendered per template call in a batch
+_BATCH_CHUNK_SIZE = 1024
+# Packed binary format: 4 bits per cell, 2 cells per byte (high nibble first)
+PACKED_SIZE = 41
+# Sparse binary format: 81-bit clue bitmap followed by the packed clues
+_BITMAP_SIZE = 11
+# Packed binary file header: magic, version, flags, sudoku count
+_BIN_MAGIC = b"SDKB"
+_BIN_VERSION = 1
+_BIN_HAS_SOLUTIONS = 0x01
+_BIN_HEADER = struct.Struct("<4sBB2xQ")
+
 # 1. convert_sudoku_txt_to_arr
 
 
@@ -41,23 +72,14 @@ def convert_sudoku_txt_to_arr(sudoku_txt: str) -> list:
     @return sudoku_arr The sudoku array (list of lists)
     @rtype list of lists
     @raises FileNotFoundError If the sudoku text file does not exist
+    @see convert_sudoku_str_to_arr Function to convert the text content
     """
     # Check if the sudoku text file exists
     try:
         # Open the file in read mode
         with open(sudoku_txt, "r") as file:
-            # Read sudoku text and split into lines
-            sudoku_txt = file.read()
-            sudoku_lines = sudoku_txt.split("\n")
-            # Remove separator rows ('---+---+---')
-            sudoku_lines = [line for line in sudoku_lines if "+" not in line]
-            # Create sudoku array and return by iterating over each line
-            sudoku_arr = []
-            for line in sudoku_lines:
-                line = line.replace("|", "")  # remove '|' separators
-                row = [int(char) for char in line]
-                sudoku_arr.append(row)
-        return sudoku_arr
+            # Read sudoku text and convert it
+            return convert_sudoku_str_to_arr(file.read())
     except FileNotFoundError:
         raise FileNotFoundError("Sudoku text file does not exist.\n")
 
@@ -96,16 +118,375 @@ def convert_sudoku_arr_to_txt(sudoku_arr: list) -> str:
     # Check if the sudoku array is 9x9
     if len(sudoku_arr) != 9 or len(sudoku_arr[0]) != 9:
         raise ValueError("Sudoku array is not 9x9.\n")
-    # Initialise the sudoku text
-    sudoku_txt = ""
-    # Create sudoku text by iterating over each row
-    for row in sudoku_arr:
-        line = "".join(str(num) for num in row)
-        line = "|".join(textwrap.wrap(line, width=3))  # insert '|' separators
-        sudoku_txt += line + "\n"
-    # Insert separator rows ('---+---+---')
-    sudoku_lines = sudoku_txt.split("\n")
-    sudoku_lines.insert(3, "---+---+---")
-    sudoku_lines.insert(7, "---+---+---")
-    sudoku_txt = "\n".join(sudoku_lines[:-1])  # exclude the last empty line
+    return format_sudoku(sudoku_arr, "boxed")
+
+
+# 3. format_sudoku
+
+
+def format_sudoku(sudoku_arr: list, fmt: str = "boxed") -> str:
+    """!@brief Formats a sudoku array (list of lists) as text.
+
+    @details Fills the precomputed template of the requested output format
+    with the 81 numbers of the sudoku in a single formatting call. The
+    supported formats are 'boxed' (the 11-line format of the sudoku text
+    files) and 'line' (all 81 numbers on a single line).
+
+    @param sudoku_arr The sudoku array (list of lists)
+    @type sudoku_arr list of lists
+    @param fmt The output format ('boxed' or 'line')
+    @type fmt str
+    @return sudoku_txt The formatted sudoku
+    @rtype str
+    @raises ValueError If the output format is not supported
+    """
+    template = _get_template(fmt)
+    return template % tuple([num for row in sudoku_arr for num in row])
+
+
+# 4. format_sudoku_batch
+
+
+def format_sudoku_batch(sudoku_arrs: list, fmt: str = "line") -> str:
+    """!@brief Formats a batch of sudoku arrays into a single text buffer.
+
+    @details Renders chunks of sudokus with one template call per chunk and
+    joins them into a single string. Sudokus in 'line' format are separated
+    by a newline, sudokus in 'boxed' format by an empty line. The returned
+    buffer ends with a newline unless the batch is empty.
+
+    @param sudoku_arrs The sudoku arrays (list of lists of lists)
+    @type sudoku_arrs list
+    @param fmt The output format ('boxed' or 'line')
+    @type fmt str
+    @return sudoku_txt The formatted batch of sudokus
+    @rtype str
+    @raises ValueError If the output format is not supported
+    """
+    template = _get_template(fmt) + _BATCH_SEPARATORS[fmt]
+    chunks = []
+    for start in range(0, len(sudoku_arrs), _BATCH_CHUNK_SIZE):
+        chunk = sudoku_arrs[start : start + _BATCH_CHUNK_SIZE]
+        chunks.append(
+            (template * len(chunk))
+            % tuple([num for arr in chunk for row in arr for num in row])
+        )
+    sudoku_txt = "".join(chunks)
+    # Only keep a single trailing newline after the last sudoku
+    if fmt == "boxed" and sudoku_txt:
+        sudoku_txt = sudoku_txt[:-1]
     return sudoku_txt
+
+
+# 5. convert_sudoku_line_to_arr
+
+
+def convert_sudoku_line_to_arr(sudoku_line: str) -> list:
+    """!@brief Converts a sudoku in 'line' format to a sudoku array
+    (list of lists).
+
+    @details Converts a line of 81 characters (row by row, '0' or '.' for
+    empty cells), as used by the puzzle corpus files, to a sudoku array
+    (list of lists). Surrounding whitespace is ignored.
+
+    @param sudoku_line The sudoku in 'line' format
+    @type sudoku_line str
+    @return sudoku_arr The sudoku array (list of lists)
+    @rtype list of lists
+    @raises ValueError If the line is not 81 digits long
+    """
+    digits = sudoku_line.strip().replace(".", "0")
+    if len(digits) != 81 or not digits.isdigit():
+        raise ValueError(f"Invalid sudoku line: '{sudoku_line.strip()}'.\n")
+    return [list(map(int, digits[i : i + 9])) for i in range(0, 81, 9)]
+
+
+# 6. convert_sudoku_arr_to_bin
+
+
+def convert_sudoku_arr_to_bin(sudoku_arr: list) -> bytes:
+    """!@brief Converts a sudoku array (list of lists) to the packed binary
+    format.
+
+    @details Packs the 81 numbers of the sudoku with 4 bits per cell into 41
+    bytes. Cell i (row by row) is stored in byte i // 2, in the high nibble
+    for even i and in the low nibble for odd i.
+
+    @param sudoku_arr The sudoku array (list of lists)
+    @type sudoku_arr list of lists
+    @return sudoku_bin The packed sudoku (41 bytes)
+    @rtype bytes
+    """
+    cells = [num for row in sudoku_arr for num in row] + [0]
+    return bytes([(cells[i] << 4) | cells[i + 1] for i in range(0, 82, 2)])
+
+
+# 7. convert_sudoku_bin_to_arr
+
+
+def convert_sudoku_bin_to_arr(sudoku_bin: bytes) -> list:
+    """!@brief Converts a sudoku in the packed binary format to a sudoku array
+    (list of lists).
+
+    @param sudoku_bin The packed sudoku (41 bytes)
+    @type sudoku_bin bytes
+    @return sudoku_arr The sudoku array (list of lists)
+    @rtype list of lists
+    @raises ValueError If the packed sudoku is not 41 bytes long
+    """
+    if len(sudoku_bin) != PACKED_SIZE:
+        raise ValueError(f"Packed sudoku is not {PACKED_SIZE} bytes long.\n")
+    cells = []
+    for byte in sudoku_bin:
+        cells.append(byte >> 4)
+        cells.append(byte & 0x0F)
+    return [cells[i : i + 9] for i in range(0, 81, 9)]
+
+
+# 8. convert_sudoku_arr_to_sparse_bin
+
+
+def convert_sudoku_arr_to_sparse_bin(sudoku_arr: list) -> bytes:
+    """!@brief Converts a sudoku array (list of lists) to the sparse binary
+    format.
+
+    @details Stores an 81-bit clue bitmap (11 bytes, cell i in bit 7 - i % 8
+    of byte i // 8) followed by the clues packed with 4 bits each. A sudoku
+    with 17 clues takes 20 bytes instead of 41.
+
+    @param sudoku_arr The sudoku array (list of lists)
+    @type sudoku_arr list of lists
+    @return sudoku_bin The sparse packed sudoku
+    @rtype bytes
+    """
+    cells = [num for row in sudoku_arr for num in row]
+    bitmap = bytearray(_BITMAP_SIZE)
+    clues = []
+    for i, num in enumerate(cells):
+        if num:
+            bitmap[i >> 3] |= 0x80 >> (i & 7)
+            clues.append(num)
+    if len(clues) % 2:
+        clues.append(0)
+    return bytes(bitmap) + bytes(
+        [(clues[i] << 4) | clues[i + 1] for i in range(0, len(clues), 2)]
+    )
+
+
+# 9. convert_sudoku_sparse_bin_to_arr
+
+
+def convert_sudoku_sparse_bin_to_arr(sudoku_bin: bytes) -> list:
+    """!@brief Converts a sudoku in the sparse binary format to a sudoku array
+    (list of lists).
+
+    @param sudoku_bin The sparse packed sudoku
+    @type sudoku_bin bytes
+    @return sudoku_arr The sudoku array (list of lists)
+    @rtype list of lists
+    @raises ValueError If the length does not match the clue bitmap
+    """
+    bitmap = sudoku_bin[:_BITMAP_SIZE]
+    clue_cells = (
+        [i for i in range(81) if bitmap[i >> 3] & (0x80 >> (i & 7))]
+        if len(bitmap) == _BITMAP_SIZE
+        else []
+    )
+    if len(sudoku_bin) != _BITMAP_SIZE + (len(clue_cells) + 1) // 2:
+        raise ValueError("Sparse packed sudoku has an invalid length.\n")
+    clues = []
+    for byte in sudoku_bin[_BITMAP_SIZE:]:
+        clues.append(byte >> 4)
+        clues.append(byte & 0x0F)
+    cells = [0] * 81
+    for i, num in zip(clue_cells, clues):
+        cells[i] = num
+    return [cells[i : i + 9] for i in range(0, 81, 9)]
+
+
+# 10. pack_sudoku_batch
+
+
+def pack_sudoku_batch(sudokus):
+    """!@brief Packs a contiguous array of sudokus into the packed binary
+    format.
+
+    @details Vectorized version of convert_sudoku_arr_to_bin for N sudokus.
+    Accepts anything numpy can turn into an N x 81 (or N x 9 x 9) array of
+    integers between 0 and 9.
+
+    @param sudokus The sudokus (N x 81 or N x 9 x 9)
+    @type sudokus numpy.ndarray or list
+    @return packed The packed sudokus (N x 41)
+    @rtype numpy.ndarray of uint8
+    @raises ValueError If the sudokus contain numbers outside 0 to 9
+    """
+    # numpy is only needed for batches, keep it out of the CLI start up
+    import numpy as np
+
+    cells = np.asarray(sudokus).reshape(-1, 81)
+    if cells.size and (cells.min() < 0 or cells.max() > 9):
+        raise ValueError("Sudoku numbers must be between 0 and 9.\n")
+    padded = np.zeros((cells.shape[0], 2 * PACKED_SIZE), dtype=np.uint8)
+    padded[:, :81] = cells
+    return (padded[:, 0::2] << 4) | padded[:, 1::2]
+
+
+# 11. unpack_sudoku_batch
+
+
+def unpack_sudoku_batch(packed):
+    """!@brief Unpacks a contiguous array of sudokus in the packed binary
+    format.
+
+    @details Vectorized version of convert_sudoku_bin_to_arr for N sudokus.
+    Accepts an N x 41 array or any buffer of N * 41 bytes (e.g. a slice of a
+    memory-mapped packed binary file).
+
+    @param packed The packed sudokus (N x 41 or N * 41 bytes)
+    @type packed numpy.ndarray or bytes-like
+    @return sudokus The unpacked sudokus (N x 81)
+    @rtype numpy.ndarray of uint8
+    """
+    import numpy as np
+
+    if not isinstance(packed, np.ndarray):
+        packed = np.frombuffer(packed, dtype=np.uint8)
+    packed = packed.reshape(-1, PACKED_SIZE)
+    cells = np.empty((packed.shape[0], 2 * PACKED_SIZE), dtype=np.uint8)
+    cells[:, 0::2] = packed >> 4
+    cells[:, 1::2] = packed & 0x0F
+    return cells[:, :81]
+
+
+# 12. write_sudoku_bin_file
+
+
+def write_sudoku_bin_file(bin_file, sudokus, solutions=None):
+    """!@brief Writes sudokus (and optionally their solutions) to a packed
+    binary file.
+
+    @details The file starts with a 16-byte header (magic 'SDKB', version,
+    flags, sudoku count) followed by one fixed-width record per sudoku: the
+    41-byte packed sudoku, followed by the 41-byte packed solution if
+    solutions are given.
+
+    @param bin_file The path to the packed binary file
+    @type bin_file str
+    @param sudokus The sudokus (N x 81 or N x 9 x 9)
+    @type sudokus numpy.ndarray or list
+    @param solutions Optional solutions of the sudokus (N x 81 or N x 9 x 9)
+    @type solutions numpy.ndarray or list
+    @raises ValueError If the number of solutions does not match
+    """
+    import numpy as np
+
+    records = pack_sudoku_batch(sudokus)
+    flags = 0
+    if solutions is not None:
+        packed_solutions = pack_sudoku_batch(solutions)
+        if packed_solutions.shape != records.shape:
+            raise ValueError("Number of sudokus and solutions differ.\n")
+        records = np.hstack([records, packed_solutions])
+        flags |= _BIN_HAS_SOLUTIONS
+    with open(bin_file, "wb") as file:
+        file.write(
+            _BIN_HEADER.pack(_BIN_MAGIC, _BIN_VERSION, flags, len(records))
+        )
+        file.write(np.ascontiguousarray(records).tobytes())
+
+
+# 13. read_sudoku_bin_file
+
+
+def read_sudoku_bin_file(bin_file):
+    """!@brief Memory-maps the sudokus (and solutions) of a packed binary
+    file.
+
+    @details Returns zero-copy views into the memory-mapped file, so slicing
+    them (e.g. sudokus[i:j]) does not read the rest of the file. Use
+    unpack_sudoku_batch to unpack a slice.
+
+    @param bin_file The path to the packed binary file
+    @type bin_file str
+    @return sudokus The packed sudokus (N x 41)
+    @rtype numpy.ndarray of uint8
+    @return solutions The packed solutions (N x 41), or None if the file has
+    no solutions
+    @rtype numpy.ndarray of uint8 or None
+    @raises ValueError If the file is not a packed binary sudoku file
+    """
+    import numpy as np
+
+    with open(bin_file, "rb") as file:
+        header = file.read(_BIN_HEADER.size)
+    if len(header) < _BIN_HEADER.size:
+        raise ValueError("Not a packed binary sudoku file.\n")
+    magic, version, flags, count = _BIN_HEADER.unpack(header)
+    if magic != _BIN_MAGIC or version != _BIN_VERSION:
+        raise ValueError("Not a packed binary sudoku file.\n")
+    record_size = PACKED_SIZE * (2 if flags & _BIN_HAS_SOLUTIONS else 1)
+    if not count:
+        records = np.zeros((0, record_size), dtype=np.uint8)
+    else:
+        records = np.memmap(
+            bin_file,
+            dtype=np.uint8,
+            mode="r",
+            offset=_BIN_HEADER.size,
+            shape=(count, record_size),
+        )
+    if flags & _BIN_HAS_SOLUTIONS:
+        return records[:, :PACKED_SIZE], records[:, PACKED_SIZE:]
+    return records, None
+
+
+# 14. convert_sudoku_str_to_arr
+
+
+def convert_sudoku_str_to_arr(sudoku_str: str) -> list:
+    """!@brief Converts the text of a sudoku file to a sudoku array (list of
+    lists).
+
+    @details Converts text in the same format as convert_sudoku_txt_to_arr
+    without reading a file, e.g. text repaired in memory by
+    checkers.repair_sudoku_text.
+
+    @param sudoku_str The sudoku text (11 lines with separators)
+    @type sudoku_str str
+    @return sudoku_arr The sudoku array (list of lists)
+    @rtype list of lists
+    """
+    sudoku_lines = sudoku_str.split("\n")
+    # Remove separator rows ('---+---+---')
+    sudoku_lines = [line for line in sudoku_lines if "+" not in line]
+    # Create sudoku array and return by iterating over each line
+    sudoku_arr = []
+    for line in sudoku_lines:
+        line = line.replace("|", "")  # remove '|' separators
+        row = [int(char) for char in line]
+        sudoku_arr.append(row)
+    return sudoku_arr
+
+
+# === HELPER FUNCTIONS ========================================================
+
+# 3.1 _get_template
+
+
+def _get_template(fmt):
+    """!@brief Gets the precomputed template of an output format.
+
+    @param fmt The output format ('boxed' or 'line')
+    @type fmt str
+    @return template The template of the output format
+    @rtype str
+    @raises ValueError If the output format is not supported
+    """
+    try:
+        return SUDOKU_TEMPLATES[fmt]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported sudoku format '{fmt}'. "
+            f"Choose one of: {', '.join(SUDOKU_TEMPLATES)}.\n"
+        )
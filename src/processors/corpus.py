@@ -0,0 +1,456 @@
+import os
+import bz2
+import gzip
+import lzma
+import mmap
+import queue
+import struct
+import threading
+from array import array
+from . import converters
+
+# flake8: noqa F401
+import typing
+
+# === MAIN CLASSES AND FUNCTIONS ==============================================
+"""!@file corpus.py
+@brief Module containing tools for random access to large sudoku corpus files.
+
+@details This script memory-maps a sudoku corpus file (one sudoku per line in
+the 81-character 'line' format, '0' or '.' for empty cells) and builds or
+loads a sidecar index with the byte offset of every line. Sudoku i (and any
+slice of sudokus) can then be read in O(1) without reading the whole file,
+which lets workers pick disjoint index ranges of the same corpus. Lines are
+decoded as ASCII with other bytes replaced by U+FFFD, so a corrupt line fails
+to parse as one sudoku instead of stopping the reading of the corpus.
+
+Corpus files compressed with gzip (.gz), xz (.xz) or bzip2 (.bz2) are read
+and written directly. iter_corpus_lines streams a (compressed) corpus with
+the decompression running in a background thread, so it overlaps with the
+solving of the sudokus already read; PuzzleCorpus decompresses a compressed
+corpus into memory for random access.
+
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Suffix of the sidecar index file next to the corpus file
+INDEX_SUFFIX = ".idx"
+# Index header: magic, corpus size (bytes), corpus mtime (ns), sudoku count
+_INDEX_MAGIC = b"SDKIDX1\0"
+_INDEX_HEADER = struct.Struct("<8sQQQ")
+
+# Number of sudokus formatted and written at once by write_corpus
+_WRITE_CHUNK_SIZE = 4096
+
+# Compressed corpus file suffixes and their compression modules
+COMPRESSIONS = {".gz": gzip, ".xz": lzma, ".bz2": bz2}
+# Bytes decompressed per chunk and chunks read ahead by iter_corpus_lines
+_READ_CHUNK_SIZE = 1 << 20
+_READ_AHEAD_CHUNKS = 4
+
+# 1. PuzzleCorpus
+
+
+class PuzzleCorpus:
+    """!@brief Random-access reader for sudoku corpus files.
+
+    @details The corpus file is memory-mapped and a sidecar line-offset index
+    ('<corpus_file>.idx') is built on first use and memory-mapped on later
+    uses. The index is rebuilt when the corpus file size or modification
+    time changes. Empty lines are skipped and not counted as sudokus. A
+    compressed corpus (.gz, .xz, .bz2) is decompressed into memory instead
+    of being memory-mapped; its index holds offsets into the decompressed
+    data.
+
+    Example:
+    >>> with PuzzleCorpus("puzzles.txt") as corpus:
+    ...     len(corpus), corpus[0], corpus.get_line(-1)
+    >>> corpus[corpus.shard(worker_id, num_workers)]
+    """
+
+    def __init__(self, corpus_file, index_file=None, save_index=True):
+        """!@brief Opens a sudoku corpus file.
+
+        @param corpus_file The path to the corpus file
+        @type corpus_file str
+        @param index_file Optional path to the sidecar index file (defaults
+        to the corpus file path with the '.idx' suffix)
+        @type index_file str
+        @param save_index Optional argument to save a (re)built index to the
+        sidecar index file (True/False)
+        @type save_index bool
+        @raises FileNotFoundError If the corpus file does not exist
+        """
+        self.corpus_file = corpus_file
+        self.index_file = index_file or corpus_file + INDEX_SUFFIX
+        self._file = open(corpus_file, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._key = (stat.st_size, stat.st_mtime_ns)
+        # Memory-mapping an empty file is not possible
+        if is_compressed(corpus_file):
+            with open_corpus(corpus_file, "rb") as file:
+                self._data = file.read()
+        elif stat.st_size:
+            self._data = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        else:
+            self._data = b""
+        self._index_data = None
+        self._offsets = self._load_index()
+        if self._offsets is None:
+            self._offsets = self._build_index(save_index)
+
+    # 1.1 Sequence protocol
+
+    def __len__(self):
+        """!@brief Number of sudokus in the corpus."""
+        return len(self._offsets) // 2
+
+    def __getitem__(self, key):
+        """!@brief Gets sudoku i (or a list of sudokus for a slice) as sudoku
+        array(s) (list of lists).
+
+        @param key The index or slice of the sudoku(s)
+        @type key int or slice
+        @return The sudoku array, or a list of sudoku arrays for a slice
+        @rtype list of lists or list
+        @raises IndexError If the index is out of range
+        """
+        if isinstance(key, slice):
+            return [
+                converters.convert_sudoku_line_to_arr(line)
+                for line in self.iter_lines(*key.indices(len(self)))
+            ]
+        return converters.convert_sudoku_line_to_arr(self.get_line(key))
+
+    def __iter__(self):
+        """!@brief Iterates over all sudoku arrays in the corpus."""
+        for line in self.iter_lines():
+            yield converters.convert_sudoku_line_to_arr(line)
+
+    # 1.2 Line access
+
+    def get_line(self, i):
+        """!@brief Gets the line of sudoku i in 'line' format.
+
+        @param i The index of the sudoku (negative indices count from the
+        end)
+        @type i int
+        @return The 81-character sudoku line
+        @rtype str
+        @raises IndexError If the index is out of range
+        """
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("Corpus index out of range.\n")
+        start, end = self._offsets[2 * i], self._offsets[2 * i + 1]
+        return self._data[start:end].decode("ascii", errors="replace")
+
+    def iter_lines(self, start=0, stop=None, step=1):
+        """!@brief Iterates over the lines of a range of sudokus.
+
+        @param start The index of the first sudoku
+        @type start int
+        @param stop The index after the last sudoku (defaults to the end,
+        clamped to the corpus like a slice)
+        @type stop int
+        @param step The step between sudoku indices
+        @type step int
+        @return Generator of 81-character sudoku lines
+        @rtype generator
+        """
+        offsets, data = self._offsets, self._data
+        # Clamp the range to the corpus like a slice
+        for i in range(*slice(start, stop, step).indices(len(self))):
+            line = data[offsets[2 * i] : offsets[2 * i + 1]]
+            yield line.decode("ascii", errors="replace")
+
+    def shard(self, worker, num_workers):
+        """!@brief Gets the disjoint index range of a worker.
+
+        @details Splits the corpus into num_workers contiguous ranges of
+        (almost) equal size and returns the range of the given worker.
+
+        @param worker The index of the worker (0 to num_workers - 1)
+        @type worker int
+        @param num_workers The total number of workers
+        @type num_workers int
+        @return The slice of sudoku indices of the worker
+        @rtype slice
+        @raises ValueError If the worker index is out of range
+        """
+        if not 0 <= worker < num_workers:
+            raise ValueError("Worker index out of range.\n")
+        n = len(self)
+        return slice(
+            n * worker // num_workers, n * (worker + 1) // num_workers
+        )
+
+    # 1.3 Resource handling
+
+    def close(self):
+        """!@brief Closes the memory maps and the corpus file."""
+        # Release the exported buffers before closing the memory maps
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._offsets = array("Q")
+        for data in (self._data, self._index_data):
+            if isinstance(data, mmap.mmap):
+                data.close()
+        self._data = b""
+        self._index_data = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # === HELPER METHODS ======================================================
+
+    def _load_index(self):
+        """!@brief Memory-maps the sidecar index if it matches the corpus.
+
+        @return The (start, end) line offsets, or None if the index is
+        missing or stale
+        @rtype memoryview or None
+        """
+        try:
+            with open(self.index_file, "rb") as index:
+                header = index.read(_INDEX_HEADER.size)
+                if len(header) < _INDEX_HEADER.size:
+                    return None
+                magic, size, mtime_ns, count = _INDEX_HEADER.unpack(header)
+                if magic != _INDEX_MAGIC or (size, mtime_ns) != self._key:
+                    return None
+                if not count:
+                    return array("Q")
+                index_data = mmap.mmap(
+                    index.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        except (OSError, ValueError):
+            return None
+        offsets = memoryview(index_data)[_INDEX_HEADER.size :].cast("Q")
+        if len(offsets) != 2 * count:
+            offsets.release()
+            index_data.close()
+            return None
+        self._index_data = index_data
+        return offsets
+
+    def _build_index(self, save_index):
+        """!@brief Scans the corpus once and builds the line offset index.
+
+        @param save_index Save the index to the sidecar index file
+        @type save_index bool
+        @return The (start, end) line offsets
+        @rtype array
+        """
+        data, offsets = self._data, array("Q")
+        size, start = len(data), 0
+        while start < size:
+            end = data.find(b"\n", start)
+            if end < 0:
+                end = size
+            next_start = end + 1
+            # Strip carriage returns and surrounding whitespace
+            while end > start and data[end - 1] in b"\r \t":
+                end -= 1
+            while start < end and data[start] in b" \t":
+                start += 1
+            if end > start:
+                offsets.append(start)
+                offsets.append(end)
+            start = next_start
+        if save_index:
+            try:
+                self._save_index(offsets)
+            except OSError:
+                pass  # the index is still usable in memory
+        return offsets
+
+    def _save_index(self, offsets):
+        """!@brief Writes the line offset index to the sidecar index file.
+
+        @details The index is written to a temporary file first and then
+        renamed, so concurrent readers never see a partial index.
+
+        @param offsets The (start, end) line offsets
+        @type offsets array
+        """
+        header = _INDEX_HEADER.pack(
+            _INDEX_MAGIC, *self._key, len(offsets) // 2
+        )
+        tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as index:
+            index.write(header)
+            offsets.tofile(index)
+        os.replace(tmp_file, self.index_file)
+
+
+# 2. write_corpus
+
+
+def write_corpus(corpus_file, sudokus, append=False):
+    """!@brief Writes sudoku arrays to a corpus file in 'line' format.
+
+    @details Consumes any iterable of sudoku arrays (e.g. a generator) and
+    writes them in chunks, each formatted into a single buffer. Corpus files
+    ending in .gz, .xz or .bz2 are compressed (appending adds a new
+    compressed stream, which is read back as one corpus).
+
+    @param corpus_file The path to the corpus file
+    @type corpus_file str
+    @param sudokus The sudoku arrays (list of lists) to write
+    @type sudokus iterable
+    @param append Optional argument to append to an existing corpus file
+    @type append bool
+    @return count The number of sudokus written
+    @rtype int
+    """
+    count = 0
+    chunk = []
+    with open_corpus(corpus_file, "at" if append else "wt") as file:
+        for sudoku in sudokus:
+            chunk.append(sudoku)
+            if len(chunk) == _WRITE_CHUNK_SIZE:
+                file.write(converters.format_sudoku_batch(chunk, "line"))
+                count += len(chunk)
+                chunk = []
+        file.write(converters.format_sudoku_batch(chunk, "line"))
+    return count + len(chunk)
+
+
+# 3. iter_corpus_lines
+
+
+def iter_corpus_lines(corpus_file, start=0, stop=None):
+    """!@brief Streams the sudoku lines of a (compressed) corpus file.
+
+    @details Reads the corpus sequentially without an index. A background
+    thread reads and decompresses the file in chunks of 1 MiB, up to 4
+    chunks ahead, while the caller processes the lines; the compression
+    modules release the GIL while decompressing, so this overlaps with
+    solving. Empty lines are skipped and not counted as sudokus.
+
+    @param corpus_file The path to the corpus file (.txt, .gz, .xz, .bz2)
+    @type corpus_file str
+    @param start Optional index of the first sudoku
+    @type start int
+    @param stop Optional index after the last sudoku
+    @type stop int
+    @return Generator of 81-character sudoku lines
+    @rtype generator
+    @raises FileNotFoundError If the corpus file does not exist
+
+    Example:
+    >>> for line in iter_corpus_lines("puzzles.txt.xz", stop=1000):
+    ...     sudoku = converters.convert_sudoku_line_to_arr(line)
+    """
+    chunks = queue.Queue(maxsize=_READ_AHEAD_CHUNKS)
+    done = threading.Event()
+    # Open in the calling thread, so a missing file raises here
+    file = open_corpus(corpus_file, "rb")
+    thread = threading.Thread(
+        target=_read_chunks, args=(file, chunks, done), daemon=True
+    )
+    thread.start()
+    try:
+        index = 0
+        tail = b""
+        while stop is None or index < stop:
+            chunk = chunks.get()
+            if isinstance(chunk, BaseException):
+                raise chunk
+            lines = (tail + chunk).split(b"\n")
+            # Keep the last (partial) line for the next chunk
+            tail = lines.pop() if chunk else b""
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                if stop is not None and index >= stop:
+                    break
+                if index >= start:
+                    yield line.decode("ascii", errors="replace")
+                index += 1
+            if not chunk:
+                break
+    finally:
+        done.set()
+        thread.join()
+        file.close()
+
+
+# 4. open_corpus
+
+
+def open_corpus(corpus_file, mode="rt"):
+    """!@brief Opens a corpus file, compressed or not.
+
+    @param corpus_file The path to the corpus file; files ending in .gz, .xz
+    or .bz2 are (de)compressed with gzip, lzma or bz2
+    @type corpus_file str
+    @param mode The file mode (e.g. 'rt', 'rb', 'wt', 'at')
+    @type mode str
+    @return file The file object
+    @rtype file object
+    """
+    module = COMPRESSIONS.get(os.path.splitext(corpus_file)[1])
+    if module is None:
+        return open(corpus_file, mode)
+    return module.open(corpus_file, mode)
+
+
+# 5. is_compressed
+
+
+def is_compressed(corpus_file):
+    """!@brief Checks if a corpus file is compressed (.gz, .xz, .bz2)."""
+    return os.path.splitext(corpus_file)[1] in COMPRESSIONS
+
+
+# === HELPER FUNCTIONS ========================================================
+
+# 3.1 _read_chunks
+
+
+def _read_chunks(file, chunks, done):
+    """!@brief Reads (and decompresses) a file into a queue of chunks (runs in
+    a background thread).
+
+    @details Puts an empty chunk at the end of the file, or the exception if
+    reading fails. Stops early when done is set by the reader.
+
+    @param file The binary file object
+    @type file file object
+    @param chunks The queue of chunks
+    @type chunks queue.Queue
+    @param done The event set when the reader stops
+    @type done threading.Event
+    """
+    try:
+        while not done.is_set():
+            chunk = file.read(_READ_CHUNK_SIZE)
+            _put_chunk(chunks, chunk, done)
+            if not chunk:
+                return
+    except Exception as error:
+        _put_chunk(chunks, error, done)
+
+
+# 3.2 _put_chunk
+
+
+def _put_chunk(chunks, chunk, done):
+    """!@brief Puts a chunk into the queue unless the reader stopped."""
+    while not done.is_set():
+        try:
+            chunks.put(chunk, timeout=0.1)
+            return
+        except queue.Full:
+            pass
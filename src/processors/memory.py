@@ -0,0 +1,145 @@
+import tracemalloc
+
+# flake8: noqa F401
+import typing
+
+# === MAIN CLASSES ============================================================
+"""!@file memory.py
+@brief Module containing tools to measure the memory used by solve stages.
+
+@details This script measures, with the standard library tracemalloc module,
+the peak memory allocated by Python in each stage of a solve (e.g. parse,
+validate, solve, verify) above the memory allocated when the stage started,
+the memory still allocated at the end of the stage and the number of memory
+blocks it allocated and kept. Unlike line-sampling profilers it sees every
+allocation, needs no compiled extension and reports the peak of a single
+sudoku, which is what sizes the memory limit of a batch worker. Tracing slows
+allocation-heavy code down, so timings taken while tracing are not
+comparable with untraced timings.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Frames kept per traced allocation (1 is enough for totals)
+TRACE_FRAMES = 1
+
+# 1. MemoryTracker
+
+
+class MemoryTracker:
+    """!@brief Per-stage peak memory and allocation counts of a solve.
+
+    @details Each stage entry has the keys 'peak' (peak bytes allocated
+    during the stage above the start of the stage), 'net' (bytes still
+    allocated at the end of the stage) and 'blocks' (memory blocks allocated
+    and still alive at the end of the stage). The 'total' entry covers all
+    stages since start.
+
+    Example:
+    >>> tracker = MemoryTracker()
+    >>> tracker.start()
+    >>> sudoku = converters.convert_sudoku_txt_to_arr(sudoku_file)
+    >>> tracker.end_stage("parse")
+    >>> tracker.stop()
+    {'parse': {'peak': 10240, 'net': 2048, 'blocks': 30}, 'total': {...}}
+    """
+
+    def __init__(self):
+        """!@brief Creates a tracker that is not tracing yet."""
+        self.stages = {}
+        self._started_tracing = False
+        self._start = None
+        self._stage_start = None
+        self._peak = 0
+
+    # 1.1 start
+
+    def start(self):
+        """!@brief Starts tracing (if not already tracing) and the first
+        stage."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self._started_tracing = True
+        self.stages = {}
+        self._peak = 0
+        self._start = self._stage_start = self._take_snapshot()
+
+    # 1.2 end_stage
+
+    def end_stage(self, stage):
+        """!@brief Records the memory of the stage that just ended and starts
+        the next stage.
+
+        @param stage The name of the stage
+        @type stage str
+        @return usage The memory usage of the stage
+        @rtype dict
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        state = self._take_snapshot()
+        usage = self._get_usage(self._stage_start, state, peak)
+        self._peak = max(self._peak, peak - self._start[1])
+        self.stages[stage] = usage
+        self._stage_start = state
+        return usage
+
+    # 1.3 stop
+
+    def stop(self):
+        """!@brief Records the total memory usage and stops tracing (if this
+        tracker started it).
+
+        @return stages The memory usage of each stage and of all stages
+        ('total')
+        @rtype dict
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        state = self._take_snapshot()
+        self._peak = max(self._peak, peak - self._start[1])
+        total = self._get_usage(self._start, state, peak)
+        total["peak"] = self._peak
+        self.stages["total"] = total
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return self.stages
+
+    # === HELPER METHODS ======================================================
+
+    @staticmethod
+    def _take_snapshot():
+        """!@brief Counts the traced memory blocks and resets the peak.
+
+        @details The snapshot is dropped before the allocated memory is read,
+        so the memory of the snapshot itself is not counted.
+
+        @return state The number of memory blocks (without the allocations of
+        tracemalloc itself) and the bytes allocated
+        @rtype tuple
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        blocks = len(snapshot.traces)
+        del snapshot
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return blocks, current
+
+    @staticmethod
+    def _get_usage(start, end, peak):
+        """!@brief Computes the memory usage between two states.
+
+        @param start The memory blocks and bytes allocated at the start
+        @type start tuple
+        @param end The memory blocks and bytes allocated at the end
+        @type end tuple
+        @param peak The traced peak since the start
+        @type peak int
+        @return usage The peak, net and blocks of the interval
+        @rtype dict
+        """
+        return {
+            "peak": max(peak - start[1], 0),
+            "net": end[1] - start[1],
+            "blocks": end[0] - start[0],
+        }
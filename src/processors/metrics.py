@@ -0,0 +1,536 @@
+import os
+import sys
+import math
+import atexit
+import bisect
+import threading
+
+# flake8: noqa F401
+import typing
+
+# === MAIN CLASSES ============================================================
+"""!@file metrics.py
+@brief Module containing an in-process metrics registry with counters,
+histograms and the Prometheus text exposition format.
+
+@details This script keeps counters and histograms, each with a fixed set of
+label names (e.g. solver and status) and one series per combination of label
+values. The metrics of a registry are rendered in the Prometheus text
+exposition format (version 0.0.4), which can be written to a file on an
+interval (e.g. for the textfile collector of the node exporter) or printed
+to stdout when the process exits. The solve scripts record every solve in
+the default registry with record_solve: the solves by solver and status, the
+duration of each solve stage, the search nodes of the solver and the paths
+of the linear programming solves. Updates take
+one lock per metric, so a registry can be shared by threads; worker processes
+have their own registry, so the scripts record the results in the driver.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Upper bounds of the duration buckets in seconds
+DURATION_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Upper bounds of the search node buckets
+NODE_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000, 10000000)
+# Paths counted by the linear programming solver (see solve_sudoku_lp)
+LP_PATH_NAMES = ("relaxation", "mip_fixed", "mip", "infeasible")
+
+# 1. Counter
+
+
+class Counter:
+    """!@brief Counter with one monotonically increasing value per
+    combination of label values.
+
+    Example:
+    >>> solves = Counter("solves_total", "Solves.", ("solver", "status"))
+    >>> solves.inc(solver="cs", status="solved")
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        """!@brief Creates a counter without series.
+
+        @param name The metric name (e.g. sudoku_solves_total)
+        @type name str
+        @param help_text The description of the metric
+        @type help_text str
+        @param labels Optional label names
+        @type labels tuple of str
+        """
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    # 1.1 inc
+
+    def inc(self, amount=1, **labels):
+        """!@brief Increases the series of the label values.
+
+        @param amount Optional non-negative amount to add
+        @type amount int or float
+        @param labels The value of each label name
+        @type labels str
+        @raises ValueError If the amount is negative or the label names do
+        not match
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase.\n")
+        key = _get_label_values(self, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    # 1.2 get
+
+    def get(self, **labels):
+        """!@brief Gets the value of the series of the label values (0 if
+        it was never increased)."""
+        with self._lock:
+            return self._values.get(_get_label_values(self, labels), 0)
+
+    # 1.3 samples
+
+    def samples(self):
+        """!@brief Gets the samples of the counter.
+
+        @return samples The (name, labels, value) of each series, labels as
+        (name, value) pairs
+        @rtype list of tuples
+        """
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            (self.name, tuple(zip(self.labels, key)), value)
+            for key, value in values
+        ]
+
+
+# 2. Histogram
+
+
+class Histogram:
+    """!@brief Histogram with cumulative buckets, a sum and a count per
+    combination of label values.
+
+    Example:
+    >>> durations = Histogram("stage_seconds", "Stages.", ("stage",))
+    >>> durations.observe(0.003, stage="solve")
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DURATION_BUCKETS):
+        """!@brief Creates a histogram without series.
+
+        @param name The metric name (e.g. sudoku_stage_duration_seconds)
+        @type name str
+        @param help_text The description of the metric
+        @type help_text str
+        @param labels Optional label names ('le' is reserved)
+        @type labels tuple of str
+        @param buckets Optional increasing upper bounds of the buckets (the
+        +Inf bucket is added)
+        @type buckets tuple of float
+        @raises ValueError If the buckets are not increasing
+        """
+        if list(buckets) != sorted(set(buckets)):
+            raise ValueError("Histogram buckets must be increasing.\n")
+        if "le" in labels:
+            raise ValueError("The label name 'le' is reserved.\n")
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Per series: the count of each bucket (+Inf last), the sum
+        self._series = {}
+        self._lock = threading.Lock()
+
+    # 2.1 observe
+
+    def observe(self, value, **labels):
+        """!@brief Adds an observation to the series of the label values.
+
+        @param value The observed value (e.g. a duration in seconds)
+        @type value int or float
+        @param labels The value of each label name
+        @type labels str
+        @raises ValueError If the label names do not match
+        """
+        key = _get_label_values(self, labels)
+        # Index of the first bucket with value <= upper bound
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][bucket] += 1
+            series[1] += value
+
+    # 2.2 get
+
+    def get(self, **labels):
+        """!@brief Gets the count and sum of the series of the label values.
+
+        @return count The number of observations
+        @rtype int
+        @return total The sum of the observations
+        @rtype float
+        """
+        with self._lock:
+            series = self._series.get(_get_label_values(self, labels))
+            if series is None:
+                return 0, 0
+            return sum(series[0]), series[1]
+
+    # 2.3 samples
+
+    def samples(self):
+        """!@brief Gets the samples of the histogram.
+
+        @return samples The cumulative <name>_bucket samples (with an 'le'
+        label), <name>_sum and <name>_count of each series
+        @rtype list of tuples
+        """
+        with self._lock:
+            series = sorted(
+                (key, list(counts), total)
+                for key, (counts, total) in self._series.items()
+            )
+        samples = []
+        for key, counts, total in series:
+            labels = tuple(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        labels + (("le", _format_number(bound)),),
+                        cumulative,
+                    )
+                )
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+# 3. MetricsRegistry
+
+
+class MetricsRegistry:
+    """!@brief Collection of metrics rendered together.
+
+    Example:
+    >>> registry = MetricsRegistry()
+    >>> solves = registry.counter("solves_total", "Solves.", ("status",))
+    >>> solves.inc(status="solved")
+    >>> print(registry.to_prometheus())
+    # HELP solves_total Solves.
+    # TYPE solves_total counter
+    solves_total{status="solved"} 1
+    """
+
+    def __init__(self):
+        """!@brief Creates an empty registry."""
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    # 3.1 counter
+
+    def counter(self, name, help_text, labels=()):
+        """!@brief Gets the counter of a name, created on first use.
+
+        @see Counter
+        @raises ValueError If the name is used by another kind of metric or
+        with other label names
+        """
+        return self._get_metric(Counter, name, help_text, labels)
+
+    # 3.2 histogram
+
+    def histogram(self, name, help_text, labels=(), buckets=DURATION_BUCKETS):
+        """!@brief Gets the histogram of a name, created on first use.
+
+        @see Histogram
+        @raises ValueError If the name is used by another kind of metric or
+        with other label names
+        """
+        return self._get_metric(Histogram, name, help_text, labels, buckets)
+
+    # 3.3 to_prometheus
+
+    def to_prometheus(self):
+        """!@brief Renders the metrics in the Prometheus text format.
+
+        @return text One HELP and TYPE line per metric followed by its
+        samples, metrics in order of creation
+        @rtype str
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(
+                f"# HELP {metric.name} {_escape(metric.help_text, False)}"
+            )
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    label_text = ",".join(
+                        f'{label}="{_escape(label_value)}"'
+                        for label, label_value in labels
+                    )
+                    name = f"{name}{{{label_text}}}"
+                lines.append(f"{name} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    # 3.4 write
+
+    def write(self, path):
+        """!@brief Writes the metrics in the Prometheus text format to a
+        file.
+
+        @details The text is written to a temporary file that replaces the
+        file, so a scraper never reads a partly written file.
+
+        @param path The path of the metrics file
+        @type path str
+        """
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(self.to_prometheus())
+        os.replace(temporary_path, path)
+
+    # === HELPER METHODS ======================================================
+
+    def _get_metric(self, metric_class, name, help_text, labels, *args):
+        """!@brief Gets or creates a metric of a class."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, help_text, labels, *args)
+                self._metrics[name] = metric
+            elif not isinstance(
+                metric, metric_class
+            ) or metric.labels != tuple(labels):
+                raise ValueError(
+                    f"Metric '{name}' is already registered as a "
+                    f"{metric.kind} with labels {metric.labels}.\n"
+                )
+            return metric
+
+
+# 4. MetricsExporter
+
+
+class MetricsExporter:
+    """!@brief Background thread that writes a registry to a file on an
+    interval.
+
+    Example:
+    >>> exporter = MetricsExporter(REGISTRY, "sudoku.prom", interval=15)
+    >>> exporter.start()
+    >>> ...
+    >>> exporter.stop()
+    """
+
+    def __init__(self, registry, path, interval=15.0):
+        """!@brief Creates an exporter.
+
+        @param registry The registry to export
+        @type registry MetricsRegistry
+        @param path The path of the metrics file
+        @type path str
+        @param interval Optional time between two writes in seconds
+        @type interval float
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    # 4.1 start
+
+    def start(self):
+        """!@brief Writes the metrics file and starts the writing thread."""
+        self.registry.write(self.path)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # 4.2 stop
+
+    def stop(self):
+        """!@brief Stops the writing thread and writes the final metrics."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.registry.write(self.path)
+
+    # 4.3 _run
+
+    def _run(self):
+        """!@brief Writes the metrics file every interval until stopped."""
+        while not self._stopped.wait(self.interval):
+            self.registry.write(self.path)
+
+
+# === MAIN FUNCTIONS ==========================================================
+
+# Default registry and the metrics of the solve scripts
+REGISTRY = MetricsRegistry()
+SOLVES = REGISTRY.counter(
+    "sudoku_solves_total",
+    "Sudoku solves by solver and status.",
+    ("solver", "status"),
+)
+STAGE_DURATIONS = REGISTRY.histogram(
+    "sudoku_stage_duration_seconds",
+    "Duration of the solve stages (parse, validate, solve, verify, queue, "
+    "total) in seconds.",
+    ("solver", "stage"),
+)
+SEARCH_NODES = REGISTRY.histogram(
+    "sudoku_search_nodes",
+    "Search nodes (numbers placed by the search) per solve.",
+    ("solver",),
+    NODE_BUCKETS,
+)
+LP_PATHS = REGISTRY.counter(
+    "sudoku_lp_paths_total",
+    "Linear programming solves by path (relaxation, mip_fixed, mip, "
+    "infeasible).",
+    ("solver", "path"),
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "sudoku_cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+)
+
+# 5. record_solve
+
+
+def record_solve(solver, status, timings=None, stats=None):
+    """!@brief Records a solve in the default registry.
+
+    @param solver The solver name
+    @type solver str
+    @param status The status of the solve (see results.STATUSES)
+    @type status str
+    @param timings Optional duration of each stage in seconds
+    @type timings dict
+    @param stats Optional search statistics of the solver (the nodes and
+    the linear programming paths are recorded if the solver counts them)
+    @type stats dict
+    """
+    SOLVES.inc(solver=solver, status=status)
+    for stage, duration in (timings or {}).items():
+        STAGE_DURATIONS.observe(duration, solver=solver, stage=stage)
+    if stats and "nodes" in stats:
+        SEARCH_NODES.observe(stats["nodes"], solver=solver)
+    for path in LP_PATH_NAMES:
+        if stats and path in stats:
+            LP_PATHS.inc(stats[path], solver=solver, path=path)
+
+
+# 6. export_metrics
+
+
+def export_metrics(path=None, interval=15.0, registry=REGISTRY):
+    """!@brief Exports a registry until the process exits.
+
+    @details With a path, the metrics file is written every interval and a
+    last time when the process exits. Without a path (or with '-') the
+    metrics are printed to stdout when the process exits.
+
+    @param path Optional path of the metrics file, '-' for stdout
+    @type path str
+    @param interval Optional time between two writes in seconds
+    @type interval float
+    @param registry Optional registry to export, defaults to the default
+    registry
+    @type registry MetricsRegistry
+    @return exporter The exporter writing the file, or None for stdout
+    @rtype MetricsExporter or None
+    """
+    if path is None or path == "-":
+        atexit.register(_print_metrics, registry)
+        return None
+    exporter = MetricsExporter(registry, path, interval)
+    exporter.start()
+    atexit.register(exporter.stop)
+    return exporter
+
+
+# === HELPER FUNCTIONS ========================================================
+
+# 1.1 _get_label_values
+
+
+def _get_label_values(metric, labels):
+    """!@brief Gets the label values of a series in the order of the label
+    names of its metric.
+
+    @raises ValueError If the label names do not match
+    """
+    if len(labels) != len(metric.labels):
+        raise ValueError(
+            f"Metric '{metric.name}' has the labels {metric.labels}, "
+            f"got {tuple(labels)}.\n"
+        )
+    try:
+        return tuple(str(labels[label]) for label in metric.labels)
+    except KeyError:
+        raise ValueError(
+            f"Metric '{metric.name}' has the labels {metric.labels}, "
+            f"got {tuple(labels)}.\n"
+        ) from None
+
+
+# 3.5 _escape
+
+
+def _escape(text, quotes=True):
+    """!@brief Escapes a label value (or a help text without quotes)."""
+    text = text.replace("\\", "\\\\").replace("\n", "\\n")
+    return text.replace('"', '\\"') if quotes else text
+
+
+# 3.6 _format_number
+
+
+def _format_number(value):
+    """!@brief Formats a sample value or bucket bound (+Inf for infinity)."""
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+# 6.1 _print_metrics
+
+
+def _print_metrics(registry):
+    """!@brief Prints the metrics of a registry to stdout."""
+    sys.stdout.write(registry.to_prometheus())
+    sys.stdout.flush()
@@ -0,0 +1,189 @@
+import io
+import os
+import csv
+import json
+import threading
+
+# flake8: noqa F401
+import typing
+
+# === MAIN CLASSES ============================================================
+"""!@file results.py
+@brief Module containing a streaming writer for batch solve results.
+
+@details This script writes one record per solved sudoku to a JSON lines
+(.jsonl) or CSV (.csv) file: the input id, the status (solved, unsolvable,
+invalid, timeout or error), the solver, the solution in 'line' format, the
+timings of the solve stages in seconds, the search statistics of the solver
+and optionally the memory usage of the solve stages (see the memory module).
+A writer truncates the file unless it is opened with append=True (e.g. to
+resume a batch) and writes the CSV header of a new or truncated file when it
+is opened. Records are buffered and appended in chunks, each with a single
+write to a file opened in append mode, so a writer can be shared by several
+threads and several processes can append to the same file (opened with
+append=True once it exists) without interleaving records.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Statuses of a solve result
+STATUSES = ("solved", "unsolvable", "invalid", "timeout", "error")
+# Stages of a solve, in order
+STAGES = ("parse", "validate", "solve", "verify", "total")
+# Columns of the CSV format (timings in seconds, stats and memory as JSON)
+CSV_FIELDS = (
+    ("id", "status", "solver", "solution")
+    + tuple(f"time_{stage}" for stage in STAGES)
+    + ("stats", "memory")
+)
+
+# 1. ResultWriter
+
+
+class ResultWriter:
+    """!@brief Buffered, thread-safe JSON lines/CSV writer for solve results.
+
+    Example:
+    >>> with ResultWriter("results.jsonl") as results:
+    ...     results.write(0, "solved", "cs", solution, {"solve": 0.01})
+    """
+
+    def __init__(self, path, fmt=None, buffer_size=256, append=False):
+        """!@brief Opens (or creates) the result file.
+
+        @param path The path of the result file
+        @type path str
+        @param fmt Optional format, jsonl or csv (defaults to the file
+        extension, jsonl for other extensions)
+        @type fmt str
+        @param buffer_size The number of records buffered before a write
+        @type buffer_size int
+        @param append Optional argument to append to the records already in
+        the file instead of truncating it
+        @type append bool
+        @raises ValueError If the format is unknown
+        """
+        if fmt is None:
+            fmt = "csv" if path.endswith(".csv") else "jsonl"
+        if fmt not in ("jsonl", "csv"):
+            raise ValueError(f"Unknown result format '{fmt}'.\n")
+        self.path = path
+        self.fmt = fmt
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        if not append:
+            flags |= os.O_TRUNC
+        self._fd = os.open(path, flags, 0o644)
+        if fmt == "csv" and os.fstat(self._fd).st_size == 0:
+            # Write the header right away, before any (other) writer appends
+            self._buffer.append(self._format_csv(CSV_FIELDS))
+            self._flush()
+
+    # 1.1 write
+
+    def write(
+        self,
+        puzzle_id,
+        status,
+        solver,
+        solution=None,
+        timings=None,
+        stats=None,
+        memory=None,
+    ):
+        """!@brief Adds the result of one sudoku.
+
+        @param puzzle_id The id of the input sudoku (e.g. its index or file)
+        @type puzzle_id int or str
+        @param status The status (solved, unsolvable, invalid, timeout,
+        error)
+        @type status str
+        @param solver The solver name
+        @type solver str
+        @param solution Optional solution in 'line' format
+        @type solution str
+        @param timings Optional timings of the solve stages in seconds
+        @type timings dict
+        @param stats Optional search statistics of the solver
+        @type stats dict
+        @param memory Optional memory usage of the solve stages (see
+        memory.MemoryTracker)
+        @type memory dict
+        @raises ValueError If the status is unknown
+        """
+        if status not in STATUSES:
+            raise ValueError(f"Unknown result status '{status}'.\n")
+        timings = timings or {}
+        stats = stats or {}
+        if self.fmt == "jsonl":
+            record = {
+                "id": puzzle_id,
+                "status": status,
+                "solver": solver,
+                "solution": solution,
+                "timings": timings,
+                "stats": stats,
+            }
+            if memory is not None:
+                record["memory"] = memory
+            line = json.dumps(record, separators=(",", ":")) + "\n"
+        else:
+            line = self._format_csv(
+                [puzzle_id, status, solver, solution or ""]
+                + [timings.get(stage, "") for stage in STAGES]
+                + [
+                    json.dumps(value, separators=(",", ":")) if value else ""
+                    for value in (stats, memory)
+                ]
+            )
+        with self._lock:
+            self._buffer.append(line)
+            self.count += 1
+            if len(self._buffer) >= self.buffer_size:
+                self._flush()
+
+    # 1.2 flush
+
+    def flush(self):
+        """!@brief Writes the buffered records to the file."""
+        with self._lock:
+            self._flush()
+
+    # 1.3 close
+
+    def close(self):
+        """!@brief Writes the buffered records and closes the file."""
+        with self._lock:
+            if self._fd is None:
+                return
+            self._flush()
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # === HELPER METHODS ======================================================
+
+    def _flush(self):
+        """!@brief Writes the buffer with one write (lock must be held)."""
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode("utf-8")
+        self._buffer = []
+        # A single write to an O_APPEND file keeps the chunk in one piece
+        while data:
+            written = os.write(self._fd, data)
+            data = data[written:]
+
+    @staticmethod
+    def _format_csv(row):
+        """!@brief Formats one CSV row (with quoting) as a string."""
+        text = io.StringIO()
+        csv.writer(text, lineterminator="\n").writerow(row)
+        return text.getvalue()
@@ -0,0 +1,203 @@
+import re
+from multiprocessing import shared_memory
+from . import converters
+from .results import STATUSES, STAGES
+
+# flake8: noqa F401
+import typing
+
+# === MAIN CLASSES ============================================================
+"""!@file shared_batch.py
+@brief Module containing a shared memory buffer of packed sudokus for
+parallel batch solving.
+
+@details This script stores a batch of sudokus in a
+multiprocessing.shared_memory block as fixed-width records: the sudoku and
+its solution in the 41-byte packed binary format, a status code and the
+timings of the solve stages. The driver process fills the sudokus and sends
+the workers only the name of the block and index ranges; the workers attach
+to the block once, read the sudokus of their range and write the solutions,
+statuses and timings back in place, so no sudoku or solution is pickled
+between the processes.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Status code of a record that has not been solved yet (the other codes are
+# the indices of results.STATUSES)
+PENDING = 255
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+# A valid sudoku line: 81 ASCII digits, '0' or '.' for empty cells
+SUDOKU_LINE = re.compile(r"[0-9.]{81}")
+
+# 1. SharedBatch
+
+
+class SharedBatch:
+    """!@brief Fixed-width records of packed sudokus in shared memory.
+
+    @details The records form a numpy structured array with the fields
+    'sudoku' and 'solution' (41 bytes each), 'status' (uint8) and 'timings'
+    (one float64 per stage of results.STAGES, NaN if the stage was not
+    reached).
+
+    Example:
+    >>> batch = SharedBatch(size=4096)                 # driver
+    >>> batch.load_lines(lines)
+    >>> worker_batch = SharedBatch(name=batch.name)    # worker
+    >>> worker_batch.get_sudoku(0)
+    >>> worker_batch.set_result(0, "solved", sudoku_solved, timings)
+    >>> batch.get_results()                            # driver
+    >>> batch.close(); batch.unlink()
+    """
+
+    def __init__(self, size=None, name=None):
+        """!@brief Creates a new block of size records or attaches to the
+        block with the given name.
+
+        @param size The number of records of a new block
+        @type size int
+        @param name The name of an existing block (in a worker process)
+        @type name str
+        @raises ValueError If neither size nor name is given
+        """
+        # numpy is only needed for batches, keep it out of the CLI start up
+        import numpy as np
+
+        if name is None and size is None:
+            raise ValueError("Give the size or the name of a batch.\n")
+        dtype = np.dtype(
+            [
+                ("sudoku", np.uint8, (converters.PACKED_SIZE,)),
+                ("solution", np.uint8, (converters.PACKED_SIZE,)),
+                ("status", np.uint8),
+                ("timings", "<f8", (len(STAGES),)),
+            ]
+        )
+        if name is None:
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=max(size, 1) * dtype.itemsize
+            )
+        else:
+            # Worker processes share the resource tracker of the driver, so
+            # attaching does not register the block a second time
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self.size = self._shm.size // dtype.itemsize
+        self.count = 0
+        self.records = np.ndarray(
+            (self.size,), dtype=dtype, buffer=self._shm.buf
+        )
+
+    # 1.1 load_lines
+
+    def load_lines(self, lines):
+        """!@brief Packs sudokus in 'line' format into the first records.
+
+        @details Lines that are not valid sudoku lines get the status
+        'error'; all other records are set to pending.
+
+        @param lines The sudokus in 'line' format (at most size lines)
+        @type lines list of str
+        @return count The number of loaded sudokus
+        @rtype int
+        @raises ValueError If there are more lines than records
+        """
+        import numpy as np
+
+        if len(lines) > self.size:
+            raise ValueError("More sudokus than records in the batch.\n")
+        records = self.records[: len(lines)]
+        digits = []
+        valid = []
+        for line in lines:
+            line = line.strip()
+            is_valid = SUDOKU_LINE.fullmatch(line) is not None
+            valid.append(is_valid)
+            digits.append(line.replace(".", "0") if is_valid else "0" * 81)
+        cells = (
+            np.frombuffer("".join(digits).encode("ascii"), dtype=np.uint8) - 48
+        )
+        records["sudoku"] = converters.pack_sudoku_batch(cells)
+        records["status"] = np.where(valid, PENDING, STATUS_CODES["error"])
+        records["timings"] = np.nan
+        self.count = len(lines)
+        return self.count
+
+    # 1.2 get_sudoku
+
+    def get_sudoku(self, i):
+        """!@brief Gets the sudoku array (list of lists) of record i."""
+        return converters.convert_sudoku_bin_to_arr(
+            self.records[i]["sudoku"].tobytes()
+        )
+
+    # 1.3 set_result
+
+    def set_result(self, i, status, sudoku_solved=None, timings=None):
+        """!@brief Writes the result of record i in place.
+
+        @param i The index of the record
+        @type i int
+        @param status The status (see results.STATUSES)
+        @type status str
+        @param sudoku_solved Optional solved sudoku array (list of lists)
+        @type sudoku_solved list of lists
+        @param timings Optional timings of the solve stages in seconds
+        @type timings dict
+        """
+        record = self.records[i]
+        record["status"] = STATUS_CODES[status]
+        if sudoku_solved is not None:
+            record["solution"] = bytearray(
+                converters.convert_sudoku_arr_to_bin(sudoku_solved)
+            )
+        if timings:
+            record["timings"] = [
+                timings.get(stage, float("nan")) for stage in STAGES
+            ]
+
+    # 1.4 get_results
+
+    def get_results(self):
+        """!@brief Reads the results of the loaded records.
+
+        @return results The (status, solution, timings) of each loaded
+        record, with the solution in 'line' format for solved sudokus (else
+        None) and the timings of the stages that were reached
+        @rtype list of tuples
+        """
+        import numpy as np
+
+        records = self.records[: self.count]
+        solutions = converters.unpack_sudoku_batch(records["solution"]) + 48
+        solution_text = solutions.tobytes().decode("ascii")
+        results = []
+        for i, (code, timings) in enumerate(
+            zip(records["status"].tolist(), records["timings"].tolist())
+        ):
+            status = STATUSES[code] if code != PENDING else "error"
+            solution = None
+            if status == "solved":
+                solution = solution_text[81 * i : 81 * i + 81]
+            timings = {
+                stage: value
+                for stage, value in zip(STAGES, timings)
+                if not np.isnan(value)
+            }
+            results.append((status, solution, timings))
+        return results
+
+    # 1.5 close
+
+    def close(self):
+        """!@brief Detaches from the shared memory block."""
+        # Drop the numpy view first, the block cannot be closed while it is
+        # exported
+        self.records = None
+        self._shm.close()
+
+    # 1.6 unlink
+
+    def unlink(self):
+        """!@brief Frees the shared memory block (creating process only)."""
+        self._shm.unlink()
@@ -0,0 +1,158 @@
+# flake8: noqa F401
+import typing
+
+# === MAIN CLASSES ============================================================
+"""!@file topology.py
+@brief Module containing the precomputed unit and peer tables of sudoku
+grids.
+
+@details This script computes, once at import, the units (rows, columns and
+subgrids) of the sudoku grid, the units of each cell and the 20 peers of
+each cell (the cells sharing a unit with it) as flat tuples, so that the
+solvers and checkers look them up instead of recomputing subgrid origins in
+their inner loops. Cells are numbered 0 to 80 row by row (cell = row * 9 +
+col). A Topology can also be built with custom regions (jigsaw sudokus) and
+the two diagonals as extra units (X-sudokus); the solvers and checkers that
+accept a topology then solve and check these variants unchanged.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Topology
+
+
+class Topology:
+    """!@brief Units and peers of a sudoku grid.
+
+    @details Units are numbered rows 0-8, columns 9-17, regions 18-26 and
+    then the diagonals (if any).
+
+    Attributes:
+    - units: The cells of each unit (tuple of tuples of cell indices)
+    - unit_coords: The (row, col) of the cells of each unit
+    - unit_labels: A readable name of each unit (e.g. 'row 1')
+    - cell_units: The units of each cell
+    - peers: The cells sharing a unit with each cell (without the cell)
+    - peer_coords: The (row, col) of the peers of each cell
+    - nonrow_peer_coords: The (row, col) of the peers outside the row of
+      each cell (the row itself is checked as a whole)
+
+    Example:
+    >>> Topology().peers[0][:4]
+    (1, 2, 3, 4)
+    >>> len(Topology(diagonals=True).peers[0])
+    26
+    """
+
+    def __init__(self, regions=None, diagonals=False):
+        """!@brief Builds the tables of a sudoku grid.
+
+        @param regions Optional region of each cell for jigsaw sudokus, as a
+        9x9 array (list of lists) or a string of 81 region labels; defaults
+        to the 3x3 subgrids
+        @type regions list of lists or str
+        @param diagonals Optional argument to add the two diagonals as units
+        (X-sudoku)
+        @type diagonals bool
+        @raises ValueError If the regions do not split the grid into 9
+        regions of 9 cells
+        """
+        units = [tuple(range(row * 9, row * 9 + 9)) for row in range(9)]
+        labels = [f"row {row + 1}" for row in range(9)]
+        units += [tuple(range(col, 81, 9)) for col in range(9)]
+        labels += [f"column {col + 1}" for col in range(9)]
+        if regions is None:
+            for a in range(0, 9, 3):
+                for b in range(0, 9, 3):
+                    units.append(
+                        tuple(
+                            row * 9 + col
+                            for row in range(a, a + 3)
+                            for col in range(b, b + 3)
+                        )
+                    )
+                    labels.append(
+                        f"subgrid starting at cell ({a + 1}, {b + 1})"
+                    )
+        else:
+            region_units = _get_region_units(regions)
+            units += region_units
+            labels += [f"region {k + 1}" for k in range(len(region_units))]
+        if diagonals:
+            units.append(tuple(i * 10 for i in range(9)))
+            labels.append("main diagonal")
+            units.append(tuple(i * 8 + 8 for i in range(9)))
+            labels.append("anti-diagonal")
+        self.units = tuple(units)
+        self.unit_coords = tuple(
+            tuple(divmod(cell, 9) for cell in unit) for unit in units
+        )
+        self.unit_labels = tuple(labels)
+        self.cell_units = tuple(
+            tuple(u for u, unit in enumerate(units) if cell in unit)
+            for cell in range(81)
+        )
+        self.peers = tuple(
+            tuple(
+                sorted(
+                    {
+                        peer
+                        for u in self.cell_units[cell]
+                        for peer in units[u]
+                        if peer != cell
+                    }
+                )
+            )
+            for cell in range(81)
+        )
+        self.peer_coords = tuple(
+            tuple(divmod(peer, 9) for peer in peers) for peers in self.peers
+        )
+        self.nonrow_peer_coords = tuple(
+            tuple((row, col) for row, col in coords if row != cell // 9)
+            for cell, coords in enumerate(self.peer_coords)
+        )
+
+
+# Standard sudoku and X-sudoku topologies
+STANDARD = Topology()
+X_SUDOKU = Topology(diagonals=True)
+
+# Flat tables of the standard sudoku
+UNITS = STANDARD.units
+UNIT_COORDS = STANDARD.unit_coords
+UNIT_LABELS = STANDARD.unit_labels
+CELL_UNITS = STANDARD.cell_units
+PEERS = STANDARD.peers
+PEER_COORDS = STANDARD.peer_coords
+NONROW_PEER_COORDS = STANDARD.nonrow_peer_coords
+
+
+# === HELPER FUNCTIONS ========================================================
+
+# 1.1 _get_region_units
+
+
+def _get_region_units(regions):
+    """!@brief Gets the cells of each region of a jigsaw sudoku.
+
+    @param regions The region of each cell as a 9x9 array (list of lists) or
+    a string of 81 region labels
+    @type regions list of lists or str
+    @return region_units The cells of each region, in order of first
+    appearance
+    @rtype list of tuples
+    @raises ValueError If the regions do not split the grid into 9 regions
+    of 9 cells
+    """
+    if isinstance(regions, str):
+        labels = list(regions)
+    else:
+        labels = [label for row in regions for label in row]
+    if len(labels) != 81:
+        raise ValueError("Regions must assign a region to all 81 cells.\n")
+    cells = {}
+    for cell, label in enumerate(labels):
+        cells.setdefault(label, []).append(cell)
+    if len(cells) != 9 or any(len(unit) != 9 for unit in cells.values()):
+        raise ValueError("Regions must be 9 regions of 9 cells each.\n")
+    return [tuple(unit) for unit in cells.values()]
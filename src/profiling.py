@@ -1,145 +1,332 @@
-import cProfile
-from memory_profiler import profile as mem_profile
-from solve_sudoku import solve_sudoku
-
-# import psutil
-# import os
-
-# === PROFILING FUNCTIONS =====================================================
 """!@file profiling.py
-@brief Module containing tools to profile the sudoku solvers.
-
-@details This script takes a sudoku text file as an input and profiles the
-backtracking, constraint satisfaction and linear programming solvers.
-@author Created by Steven Dillmann 17/12/2023
-"""
+@brief Script to profile the sudoku solvers and compare saved profiles.
 
-# 1. profile_bt
+@details This script profiles solvers on sudoku files and keeps the
+profiles as artifacts: for each solver and sudoku file (tier, e.g. easy_1)
+it writes the cProfile statistics of the repeated solves to a .pstats file
+and the call stacks sampled with a profiling timer signal to a .collapsed
+file (one 'frame;frame;frame count' line per stack, the input format of
+flamegraph tools such as flamegraph.pl or speedscope). The sampled solves
+run separately from the cProfile solves, so the samples are not skewed by
+the profiler overhead. With --memory the peak memory of one extra solve is
+measured with tracemalloc (see the memory module). In diff mode two saved
+.pstats files are compared function by function. The script can be run from
+the command line with the following commands:
 
+python src/profiling.py [sudoku files] [--solvers SOLVER ...] [--repeats N]
+[--output DIR] [--interval SECONDS] [--memory]
 
-def profile_bt(file_path):
-    """!@brief Profile the backtracking (bt) algorithm solver.
+python src/profiling.py --diff OLD.pstats NEW.pstats [--top N]
 
-    @details This function profiles the backtracking algorithm. It profiles the
-    following cases:
+If no sudoku files are given, the easy, medium and hard sudokus of the
+tests_resources folder are profiled.
 
-    1. Profile the bt solver with an easy sudoku.
-    2. Profile the bt solver with a medium sudoku.
-    3. Profile the bt solver with a hard sudoku.
-    4. Profile the bt solver with an extreme sudoku.
+@author Created by Steven Dillmann 17/12/2023
+"""
 
-    @param file_path The path to the sudoku file to be solved.
-    @type file_path str
-    """
-    print("Profiling Backtracking Solver for: ", file_path)
-    solve_sudoku(file_path, solver="bt")
+import os
+import signal
+import pstats
+import cProfile
+import argparse
+import contextlib
+import collections
+from processors import converters, memory
+from solvers import registry
 
+# Sudoku files profiled by default
+DEFAULT_FILES = (
+    "tests_resources/easy_1.txt",
+    "tests_resources/medium_1.txt",
+    "tests_resources/hard_1.txt",
+)
 
-# 2. profile_cs
+# === PROFILING FUNCTIONS/CLASSES =============================================
 
+# 1. StackSampler
 
-def profile_cs(file_path):
-    """!@brief Profile the constraint satisfaction (cs) algorithm solver.
 
-    @details This function profiles the constraint satisfaction solver. It
-    profiles the following cases:
+class StackSampler:
+    """!@brief Samples the call stack of the main thread with a profiling
+    timer signal.
 
-    1. Profile the cs solver with an easy sudoku.
-    2. Profile the cs solver with a medium sudoku.
-    3. Profile the cs solver with a hard sudoku.
-    4. Profile the cs solver with an extreme sudoku.
+    @details Every interval of CPU time (ITIMER_PROF) the SIGPROF handler
+    counts the current call stack, so the counts are proportional to the
+    time spent in each stack. Only available on Unix.
 
-    @param file_path The path to the sudoku file to be solved.
-    @type file_path str
+    Example:
+    >>> sampler = StackSampler(interval=0.001)
+    >>> with sampler:
+    ...     solve_sudoku_cs(sudoku)
+    >>> sampler.save("cs_hard_1.collapsed")
     """
-    print("Profiling Constraint Satisfaction Solver for: ", file_path)
-    solve_sudoku(file_path, solver="cs")
 
+    def __init__(self, interval=0.001):
+        """!@brief Creates a sampler.
+
+        @param interval The CPU time between two samples in seconds
+        @type interval float
+        """
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._previous_handler = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # 1.1 start
+
+    def start(self):
+        """!@brief Starts sampling."""
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    # 1.2 stop
+
+    def stop(self):
+        """!@brief Stops sampling."""
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler)
+
+    # 1.3 collapsed
+
+    def collapsed(self):
+        """!@brief Gets the sampled stacks in the collapsed stack format.
+
+        @return lines One 'frame;frame;frame count' line per stack (root
+        first), the most sampled stacks first
+        @rtype list of str
+        """
+        return [
+            f"{stack} {count}" for stack, count in self.stacks.most_common()
+        ]
+
+    # 1.4 save
+
+    def save(self, collapsed_file):
+        """!@brief Saves the sampled stacks in the collapsed stack format.
+
+        @param collapsed_file The path of the output file
+        @type collapsed_file str
+        """
+        with open(collapsed_file, "w") as file:
+            file.writelines(line + "\n" for line in self.collapsed())
+
+    # 1.5 _sample
+
+    def _sample(self, signum, frame):
+        """!@brief SIGPROF handler that counts the interrupted stack."""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                f":{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        self.stacks[";".join(reversed(frames))] += 1
+
+
+# 2. profile_solver
+
+
+def profile_solver(
+    sudoku_file,
+    solver,
+    repeats=1,
+    output_dir="profiles",
+    interval=0.001,
+    track_memory=False,
+):
+    """!@brief Profile one solver on one sudoku file and save the profiles.
+
+    @details Solves the sudoku repeats times under cProfile and repeats
+    times under the StackSampler and writes <solver>_<tier>.pstats and
+    <solver>_<tier>.collapsed to the output directory, where the tier is the
+    name of the sudoku file without extension.
+
+    @param sudoku_file The path to the sudoku file
+    @type sudoku_file str
+    @param solver The solver name
+    @type solver str
+    @param repeats Optional number of solves per profile
+    @type repeats int
+    @param output_dir Optional directory of the profiles (created if needed)
+    @type output_dir str
+    @param interval Optional CPU time between two stack samples in seconds
+    @type interval float
+    @param track_memory Optional argument to measure the peak memory of one
+    extra solve with tracemalloc
+    @type track_memory bool
+    @return result The paths of the profiles ('pstats', 'collapsed'), the
+    number of stack samples ('samples') and, if tracked, the peak memory in
+    bytes ('peak')
+    @rtype dict
+    @raises ValueError If the solver is not registered
+    """
+    solve_function = registry.get_solver(solver)
+    sudoku = converters.convert_sudoku_txt_to_arr(sudoku_file)
+    tier = os.path.splitext(os.path.basename(sudoku_file))[0]
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, f"{solver}_{tier}")
+    result = {"pstats": base + ".pstats", "collapsed": base + ".collapsed"}
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        profiler = cProfile.Profile()
+        for _ in range(repeats):
+            profiler.runcall(solve_function, sudoku)
+        profiler.dump_stats(result["pstats"])
+
+        sampler = StackSampler(interval)
+        with sampler:
+            for _ in range(repeats):
+                solve_function(sudoku)
+        sampler.save(result["collapsed"])
+        result["samples"] = sum(sampler.stacks.values())
+
+        if track_memory:
+            tracker = memory.MemoryTracker()
+            tracker.start()
+            solve_function(sudoku)
+            tracker.end_stage("solve")
+            result["peak"] = tracker.stop()["solve"]["peak"]
+    return result
+
+
+# 3. diff_profiles
+
+
+def diff_profiles(old_file, new_file):
+    """!@brief Compare two saved profiles function by function.
+
+    @param old_file The path to the old .pstats file
+    @type old_file str
+    @param new_file The path to the new .pstats file
+    @type new_file str
+    @return rows One row per function of either profile: the function
+    ('file:line(name)'), its calls, total time (without subcalls) and
+    cumulative time in the old and new profile (0 if missing) and the change
+    of the total time, largest absolute change first
+    @rtype list of dicts
+    """
+    old_stats = pstats.Stats(old_file).stats
+    new_stats = pstats.Stats(new_file).stats
+    rows = []
+    for function in set(old_stats) | set(new_stats):
+        # Each entry is (primitive calls, calls, tottime, cumtime, callers)
+        _, old_calls, old_tottime, old_cumtime, _ = old_stats.get(
+            function, (0, 0, 0.0, 0.0, None)
+        )
+        _, new_calls, new_tottime, new_cumtime, _ = new_stats.get(
+            function, (0, 0, 0.0, 0.0, None)
+        )
+        filename, line, name = function
+        rows.append(
+            {
+                "function": f"{os.path.basename(filename)}:{line}({name})",
+                "old_calls": old_calls,
+                "new_calls": new_calls,
+                "old_tottime": old_tottime,
+                "new_tottime": new_tottime,
+                "old_cumtime": old_cumtime,
+                "new_cumtime": new_cumtime,
+                "delta": new_tottime - old_tottime,
+            }
+        )
+    rows.sort(key=lambda row: abs(row["delta"]), reverse=True)
+    return rows
+
+
+# 4. format_diff
+
+
+def format_diff(rows, top=20):
+    """!@brief Formats the rows of diff_profiles as a text table.
+
+    @param rows The rows returned by diff_profiles
+    @type rows list of dicts
+    @param top Optional number of rows to show
+    @type top int
+    @return table The table with one line per function
+    @rtype str
+    """
+    header = (
+        f"{'old tottime':>12} {'new tottime':>12} {'change':>10} "
+        f"{'old calls':>10} {'new calls':>10}  function"
+    )
+    lines = [header, "-" * len(header)]
+    for row in rows[:top]:
+        lines.append(
+            f"{row['old_tottime']:>12.5f} {row['new_tottime']:>12.5f} "
+            f"{row['delta']:>+10.5f} {row['old_calls']:>10} "
+            f"{row['new_calls']:>10}  {row['function']}"
+        )
+    return "\n".join(lines)
 
-# 3. profile_lp
-
-
-def profile_lp(file_path):
-    """!@brief Profile the linear programming (lp) algorithm solver.
-
-    @details This function profiles the linear programming solver. It profiles
-    the following cases:
 
-    1. Profile the lp solver with an easy sudoku.
-    2. Profile the lp solver with a medium sudoku.
-    3. Profile the lp solver with a hard sudoku.
-    4. Profile the lp solver with an extreme sudoku.
+# === MAIN ====================================================================
 
-    @param file_path The path to the sudoku file to be solved.
-    @type file_path str
-    """
-    print("Profiling Linear Programming Solver for: ", file_path)
-    solve_sudoku(file_path, solver="lp")
 
+def main():
+    """!@brief Parse command line arguments and profile the solvers or
+    compare two profiles."""
+    parser = argparse.ArgumentParser(
+        description="Profile the solvers or compare two saved profiles."
+    )
+    parser.add_argument("files", nargs="*", default=list(DEFAULT_FILES))
+    parser.add_argument(
+        "--solvers",
+        nargs="+",
+        default=["bt", "cs"],
+        choices=list(registry.SOLVERS),
+    )
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--output", default="profiles")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.001,
+        help="CPU time between two stack samples in seconds",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="measure the peak memory of one extra solve with tracemalloc",
+    )
+    parser.add_argument(
+        "--diff",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="compare two .pstats files instead of profiling",
+    )
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.diff:
+        print(format_diff(diff_profiles(*args.diff), args.top))
+        return
+    for sudoku_file in args.files:
+        for solver in args.solvers:
+            result = profile_solver(
+                sudoku_file,
+                solver,
+                args.repeats,
+                args.output,
+                args.interval,
+                args.memory,
+            )
+            peak = ""
+            if "peak" in result:
+                peak = f", peak memory {result['peak'] / 1024:.1f} KiB"
+            print(
+                f"{solver} {sudoku_file}: {result['pstats']}, "
+                f"{result['collapsed']} ({result['samples']} samples{peak})"
+            )
 
-# === MAIN ====================================================================
 
 if __name__ == "__main__":
-    easy_file = "tests_resources/easy_1.txt"
-    medium_file = "tests_resources/medium_1.txt"
-    hard_file = "tests_resources/hard_1.txt"
-    extreme_file = "tests_resources/extreme_1.txt"
-
-    # Profiling using memory_profiler (mem_profile)
-    profile_bt_mem = mem_profile(profile_bt)
-    profile_bt_mem(easy_file)
-    profile_bt_mem(medium_file)
-    profile_bt_mem(hard_file)
-    # profile_bt_mem(extreme_file)
-
-    profile_cs_mem = mem_profile(profile_cs)
-    profile_cs_mem(easy_file)
-    profile_cs_mem(medium_file)
-    profile_cs_mem(hard_file)
-    # profile_cs_mem(extreme_file)
-
-    profile_lp_mem = mem_profile(profile_lp)
-    profile_lp_mem(easy_file)
-    profile_lp_mem(medium_file)
-    profile_lp_mem(hard_file)
-    # profile_lp_mem(extreme_file)
-
-    # Profiling using cProfile
-    cProfile.run("profile_bt(easy_file)", sort="cumtime")
-    cProfile.run("profile_bt(medium_file)", sort="cumtime")
-    cProfile.run("profile_bt(hard_file)", sort="cumtime")
-    # cProfile.run("profile_bt(extreme_file)", sort="cumtime")
-
-    cProfile.run("profile_cs(easy_file)", sort="cumtime")
-    cProfile.run("profile_cs(medium_file)", sort="cumtime")
-    cProfile.run("profile_cs(hard_file)", sort="cumtime")
-    # cProfile.run("profile_cs(extreme_file)", sort="cumtime")
-
-    cProfile.run("profile_lp(easy_file)", sort="cumtime")
-    cProfile.run("profile_lp(medium_file)", sort="cumtime")
-    cProfile.run("profile_lp(hard_file)", sort="cumtime")
-    # cProfile.run("profile_lp(extreme_file)", sort="cumtime")
-
-
-# def profile_solve(file_path):
-#     initial_memory = psutil.Process(os.getpid()).memory_info().rss / 1024
-#     print("Initial Memory:", initial_memory, "KiB")
-
-#     solve_sudoku(file_path, solver="bt")
-
-#     final_memory = psutil.Process(os.getpid()).memory_info().rss / 1024
-#     print("Final Memory:", final_memory, "KiB")
-
-#     memory_increment = final_memory - initial_memory
-#     print("Memory Increment:", memory_increment, "KiB")
-
-# if __name__ == "__main__":
-#     easy_file = "tests_resources/easy_1.txt"
-#     medium_file = "tests_resources/medium_1.txt"
-#     hard_file = "tests_resources/hard_1.txt"
-#     extreme_file = "tests_resources/extreme_1.txt"
-
-#     profile_lp(easy_file)
-#     profile_lp(medium_file)
-#     profile_lp(hard_file)
-#     profile_lp(extreme_file)
+    main()
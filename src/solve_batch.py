@@ -0,0 +1,407 @@
+"""!@file solve_batch.py
+@brief Script to solve a corpus of sudokus and stream the results to a file.
+
+@details This script solves the sudokus of a corpus file ('line' format, one
+sudoku per line, optionally compressed as .gz, .xz or .bz2) across processes
+and writes one record per sudoku to a JSON lines (.jsonl) or CSV (.csv)
+result file: the index of the sudoku, its status (solved, unsolvable,
+invalid, timeout or error), the solver, the solution, the timings of the
+parse, validate, solve and verify stages, the search statistics of the
+solver and optionally the peak memory and allocations of each stage (to size
+the memory limits of batch workers). The records are written in corpus order
+while the batch is running (replacing an existing result file, or appended
+to it with --append, e.g. to resume a batch with --start), and each result
+is recorded in the default metrics registry (see the metrics module), which
+--metrics exports in the Prometheus text format. The script can be run from
+the command line with the following command:
+
+python src/solve_batch.py corpus.txt results.jsonl [--solver SOLVER]
+[--processes N] [--timeout SECONDS] [--start I] [--stop J] [--memory]
+[--metrics FILE] [--metrics-interval SECONDS] [--append]
+
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import functools
+import itertools
+import contextlib
+import collections
+import multiprocessing
+from processors import checkers, converters, corpus, memory, metrics
+from processors import results, shared_batch
+from solvers import registry
+
+# === WORKER FUNCTIONS ========================================================
+
+# 1. init_worker
+
+
+def init_worker(solver):
+    """!@brief Warm up a worker process.
+
+    @details Imports the solver once per worker process and silences the
+    warnings printed by the checkers and solvers.
+
+    @param solver The solver name
+    @type solver str
+    """
+    sys.stdout = open(os.devnull, "w")
+    registry.get_solver(solver)
+
+
+# 2. solve_line
+
+
+def solve_line(task):
+    """!@brief Solve one sudoku of the corpus.
+
+    @param task The (index, line, solver, timeout, track_memory) of the
+    sudoku, where timeout is an optional time budget of the solve stage in
+    seconds and track_memory whether to measure the memory of each stage
+    @type task tuple
+    @return result The (index, status, solution, timings, stats, memory) of
+    the sudoku, with the solution in 'line' format (or None) and the memory
+    usage of the stages (or None)
+    @rtype tuple
+    """
+    index, line, solver, timeout, track_memory = task
+    status, sudoku_solved, timings, stats, memory_usage = _solve_stages(
+        lambda: converters.convert_sudoku_line_to_arr(line),
+        solver,
+        timeout,
+        track_memory,
+    )
+    solution = None
+    if status == "solved":
+        solution = converters.format_sudoku(sudoku_solved, "line")
+    return index, status, solution, timings, stats, memory_usage
+
+
+# 3. solve_range
+
+
+def solve_range(task):
+    """!@brief Solve a range of sudokus of a shared batch in place.
+
+    @details Attaches to the shared memory block of the batch (once per
+    worker process), solves the pending sudokus of the range and writes their
+    statuses, solutions and timings back into the block. Only the search
+    statistics and memory usage are sent back to the driver.
+
+    @param task The (name, start, stop, solver, timeout, track_memory) of the
+    range, where name is the name of the shared memory block
+    @type task tuple
+    @return extras The (stats, memory) of each sudoku of the range
+    @rtype list of tuples
+    """
+    name, start, stop, solver, timeout, track_memory = task
+    batch = _shared_batches.get(name)
+    if batch is None:
+        batch = _shared_batches[name] = shared_batch.SharedBatch(name=name)
+    extras = []
+    for i in range(start, stop):
+        if batch.records[i]["status"] != shared_batch.PENDING:
+            # The line could not be parsed when the batch was loaded
+            extras.append(({}, None))
+            continue
+        status, sudoku_solved, timings, stats, memory_usage = _solve_stages(
+            functools.partial(batch.get_sudoku, i),
+            solver,
+            timeout,
+            track_memory,
+        )
+        if status != "solved":
+            sudoku_solved = None
+        batch.set_result(i, status, sudoku_solved, timings)
+        extras.append((stats, memory_usage))
+    return extras
+
+
+# Shared batches attached by the worker process, by block name
+_shared_batches = {}
+
+# === HELPER FUNCTIONS ========================================================
+
+# 4. _solve_stages
+
+
+def _solve_stages(parse, solver, timeout, track_memory):
+    """!@brief Parse, validate, solve and verify one sudoku.
+
+    @param parse Function returning the sudoku array (list of lists), raises
+    a ValueError if the sudoku cannot be parsed
+    @type parse function
+    @param solver The solver name
+    @type solver str
+    @param timeout Optional time budget of the solve stage in seconds
+    @type timeout float
+    @param track_memory Whether to measure the memory of each stage
+    @type track_memory bool
+    @return result The (status, sudoku_solved, timings, stats, memory) of the
+    sudoku, with the solver output as sudoku_solved (or None)
+    @rtype tuple
+    """
+    timings = {}
+    stats = {}
+    tracker = memory.MemoryTracker() if track_memory else None
+    if tracker is not None:
+        tracker.start()
+    start_time = stage_time = time.perf_counter()
+
+    # Record the duration (and memory) of a stage
+    def end_stage(stage):
+        timings[stage] = time.perf_counter() - stage_time
+        if tracker is not None:
+            tracker.end_stage(stage)
+        return time.perf_counter()
+
+    def result(status, sudoku_solved=None):
+        timings["total"] = time.perf_counter() - start_time
+        memory_usage = tracker.stop() if tracker is not None else None
+        return status, sudoku_solved, timings, stats, memory_usage
+
+    try:
+        sudoku = parse()
+    except ValueError:
+        end_stage("parse")
+        return result("error")
+    stage_time = end_stage("parse")
+    if not checkers.is_sudoku_valid(sudoku):
+        end_stage("validate")
+        return result("invalid")
+    stage_time = end_stage("validate")
+    if timeout:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        sudoku_solved = registry.get_solver(solver)(sudoku, stats=stats)
+    except SolveTimeout:
+        end_stage("solve")
+        return result("timeout")
+    except Exception:
+        end_stage("solve")
+        return result("error")
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    stage_time = end_stage("solve")
+    solved = sudoku_solved is not None and checkers.is_sudoku_solved(
+        sudoku_solved
+    )
+    end_stage("verify")
+    if not solved:
+        return result("unsolvable", sudoku_solved)
+    return result("solved", sudoku_solved)
+
+
+# 4.1 SolveTimeout
+
+
+class SolveTimeout(Exception):
+    """!@brief Raised in a worker when the time budget of a solve is over."""
+
+
+def _raise_timeout(signum, frame):
+    """!@brief SIGALRM handler that interrupts the running solver."""
+    raise SolveTimeout()
+
+
+# === BATCH ===================================================================
+
+# Number of sudokus per shared memory block and per task of a worker
+SHARED_BLOCK_SIZE = 4096
+RANGE_SIZE = 32
+
+# 5. solve_batch
+
+
+def solve_batch(
+    corpus_file,
+    results_file,
+    solver="cs",
+    processes=None,
+    timeout=None,
+    start=0,
+    stop=None,
+    track_memory=False,
+    append=False,
+):
+    """!@brief Solve the sudokus of a corpus and stream the results to a
+    file.
+
+    @param corpus_file The path to the corpus file
+    @type corpus_file str
+    @param results_file The path to the result file (.jsonl or .csv)
+    @type results_file str
+    @param solver Optional solver (bt, cs, lp, sat)
+    @type solver str
+    @param processes Optional number of processes (defaults to the number of
+    CPUs, 1 solves in the calling process); with more processes the sudokus
+    are passed to the workers in shared memory blocks
+    @type processes int
+    @param timeout Optional time budget per sudoku in seconds
+    @type timeout float
+    @param start Optional index of the first sudoku
+    @type start int
+    @param stop Optional index after the last sudoku
+    @type stop int
+    @param track_memory Optional argument to record the peak memory and
+    allocations of each stage (slows the solvers down)
+    @type track_memory bool
+    @param append Optional argument to append the records to the result
+    file instead of replacing it
+    @type append bool
+    @return counts The number of sudokus per status
+    @rtype collections.Counter
+    @raises ValueError If the solver is not registered
+    """
+    registry.get_solver(solver)
+    counts = collections.Counter()
+    processes = processes or os.cpu_count() or 1
+    with contextlib.ExitStack() as stack:
+        if corpus.is_compressed(corpus_file):
+            # Stream the corpus, decompressing it in a background thread
+            lines = stack.enter_context(
+                contextlib.closing(
+                    corpus.iter_corpus_lines(corpus_file, start, stop)
+                )
+            )
+        else:
+            puzzles = stack.enter_context(corpus.PuzzleCorpus(corpus_file))
+            lines = puzzles.iter_lines(start, stop)
+        # Opened (and the CSV header written) before the workers start
+        writer = stack.enter_context(
+            results.ResultWriter(results_file, append=append)
+        )
+        if processes == 1:
+            stack.enter_context(
+                contextlib.redirect_stdout(open(os.devnull, "w"))
+            )
+            tasks = (
+                (index, line, solver, timeout, track_memory)
+                for index, line in zip(itertools.count(start), lines)
+            )
+            for index, status, *record in map(solve_line, tasks):
+                writer.write(index, status, solver, *record)
+                _, timings, stats, _ = record
+                metrics.record_solve(solver, status, timings, stats)
+                counts[status] += 1
+            return counts
+
+        # Create the shared blocks before the pool, so that the workers use
+        # the resource tracker of the driver
+        batches = []
+        for _ in range(2):
+            batch = shared_batch.SharedBatch(SHARED_BLOCK_SIZE)
+            stack.callback(batch.unlink)
+            stack.callback(batch.close)
+            batches.append(batch)
+        pool = stack.enter_context(
+            multiprocessing.Pool(processes, init_worker, (solver,))
+        )
+
+        # Write the results of a solved block in corpus order
+        def write_block(batch, job, offset):
+            extras = itertools.chain.from_iterable(job.get())
+            for index, result, extra in zip(
+                itertools.count(offset), batch.get_results(), extras
+            ):
+                status, solution, timings = result
+                writer.write(index, status, solver, solution, timings, *extra)
+                metrics.record_solve(solver, status, timings, extra[0])
+                counts[status] += 1
+
+        # Double buffering: load the next block while the workers solve the
+        # current one
+        running = None
+        offset = start
+        blocks = iter(
+            lambda: list(itertools.islice(lines, SHARED_BLOCK_SIZE)), []
+        )
+        for batch, block in zip(itertools.cycle(batches), blocks):
+            count = batch.load_lines(block)
+            ranges = []
+            for i in range(0, count, RANGE_SIZE):
+                stop_i = min(i + RANGE_SIZE, count)
+                ranges.append(
+                    (batch.name, i, stop_i, solver, timeout, track_memory)
+                )
+            job = pool.map_async(solve_range, ranges, chunksize=1)
+            if running is not None:
+                write_block(*running)
+            running = (batch, job, offset)
+            offset += count
+        if running is not None:
+            write_block(*running)
+    return counts
+
+
+# === MAIN ====================================================================
+
+
+def main():
+    """!@brief Parse command line arguments and solve the corpus."""
+    parser = argparse.ArgumentParser(
+        description="Solve a corpus of sudokus and write the results."
+    )
+    parser.add_argument("corpus", help="corpus file with one sudoku per line")
+    parser.add_argument("results", help="result file (.jsonl or .csv)")
+    parser.add_argument("--solver", default="cs")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--stop", type=int, default=None)
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="record the peak memory of each stage with tracemalloc",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="write the metrics in the Prometheus text format to FILE "
+        "while the batch runs ('-' prints them to stdout at exit)",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=15.0,
+        help="seconds between two writes of the metrics file",
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="append to the result file instead of replacing it",
+    )
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.export_metrics(args.metrics, args.metrics_interval)
+
+    start_time = time.time()
+    counts = solve_batch(
+        args.corpus,
+        args.results,
+        solver=args.solver,
+        processes=args.processes,
+        timeout=args.timeout,
+        start=args.start,
+        stop=args.stop,
+        track_memory=args.memory,
+        append=args.append,
+    )
+    duration = time.time() - start_time
+    total = sum(counts.values())
+    summary = ", ".join(f"{counts[status]} {status}" for status in counts)
+    print(
+        f"Processed {total} sudokus in {duration:.2f} seconds "
+        f"({total / max(duration, 1e-9):.1f} sudokus/second): {summary}."
+    )
+
+
+if __name__ == "__main__":
+    main()
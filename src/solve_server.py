@@ -0,0 +1,434 @@
+"""!@file solve_server.py
+@brief Script containing a long-running local sudoku solve server.
+
+@details This script starts an asyncio server that listens on a Unix socket or
+a localhost TCP port and accepts newline-delimited JSON requests of the form
+
+{"id": 1, "grid": "000007000...", "solver": "cs", "deadline": 2.0}
+
+where grid is the sudoku in 'line' format (or a sudoku array), solver is one
+of bt, cs, lp, sat, pcs (default cs) and deadline is an optional time budget
+in seconds, counted from the arrival of the request. The requests are
+dispatched to a pool of pre-forked worker processes that have already
+imported all solvers, and one JSON response per request is streamed back as
+soon as it is ready (so responses can arrive out of order, matched by id):
+
+{"id": 1, "status": "solved", "solution": "241768539...", "solver": "cs",
+"timings": {"queue": ..., "parse": ..., "solve": ..., "verify": ...,
+"total": ...}, "stats": {"nodes": ..., ...}}
+
+The deadline is enforced inside the worker with a SIGALRM timer, so a
+request that runs out of time stops its solver and frees the worker instead
+of occupying it after its response was sent; a worker that does not stop
+within a grace period exits and the pool is replaced.
+
+The status is one of solved, unsolvable, invalid, timeout or error, and
+stats are the search statistics of the solver. Every response is recorded in
+the default metrics registry (see the metrics module), which --metrics writes
+to a file in the Prometheus text format while the server runs. A client
+can pipeline any number of requests on one connection. Once max_inflight
+requests are being solved (until their responses are written), the server
+stops reading from the sockets until a response has been written, so
+clients are slowed down by TCP/socket backpressure instead of growing an
+unbounded queue; idle connections do not count. On SIGINT/SIGTERM the
+server stops accepting connections, finishes the requests in flight and
+shuts down the workers.
+
+The script can be run from the command line with the following command:
+
+python src/solve_server.py [--unix PATH | --host HOST --port PORT]
+[--workers N] [--max-inflight N] [--metrics FILE] [--metrics-interval
+SECONDS]
+
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+import os
+import sys
+import time
+import json
+import signal
+import asyncio
+import argparse
+import concurrent.futures
+from processors import checkers, converters, metrics
+from solvers import registry
+
+# === WORKER FUNCTIONS ========================================================
+
+# 1. init_worker
+
+
+def init_worker():
+    """!@brief Warm up a worker process.
+
+    @details Imports all solvers (including pulp for the lp solver) once per
+    worker process and silences the warnings printed by the checkers and
+    solvers, which would otherwise interleave on the server's stdout.
+    """
+    sys.stdout = open(os.devnull, "w")
+    for solver in registry.SOLVERS:
+        try:
+            registry.get_solver(solver)
+        except ImportError:
+            pass  # solver not available in this environment
+
+
+# 2. solve_request
+
+
+def solve_request(grid, solver, expires=None):
+    """!@brief Solve a single sudoku in a worker process.
+
+    @param grid The sudoku in 'line' format or as a sudoku array
+    @type grid str or list of lists
+    @param solver The solver to use (bt, cs, lp, sat, pcs)
+    @type solver str
+    @param expires Optional time (time.time()) at which the solve is stopped
+    with the status timeout
+    @type expires float
+    @return response The status, solution (in 'line' format), timings and
+    search statistics
+    @rtype dict
+    """
+    timings = {}
+    start_time = time.perf_counter()
+    try:
+        if isinstance(grid, str):
+            sudoku = converters.convert_sudoku_line_to_arr(grid)
+        else:
+            sudoku = [list(map(int, row)) for row in grid]
+            if len(sudoku) != 9 or any(len(row) != 9 for row in sudoku):
+                raise ValueError("Sudoku array is not 9x9.\n")
+    except (TypeError, ValueError) as e:
+        return {"status": "error", "error": str(e).strip()}
+    if not registry.is_solver_loaded(solver):
+        return {"status": "error", "error": f"Unknown solver '{solver}'."}
+    valid = checkers.is_sudoku_valid(sudoku)
+    timings["parse"] = time.perf_counter() - start_time
+    if not valid:
+        return {"status": "invalid", "timings": timings}
+    start_time = time.perf_counter()
+    stats = {}
+    if expires is not None:
+        remaining = expires - time.time()
+        if remaining <= 0:
+            return {"status": "timeout", "timings": timings}
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        sudoku_solved = registry.get_solver(solver)(sudoku, stats=stats)
+    except SolveTimeout:
+        timings["solve"] = time.perf_counter() - start_time
+        return {"status": "timeout", "timings": timings, "stats": stats}
+    finally:
+        if expires is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    timings["solve"] = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    solved = sudoku_solved is not None and checkers.is_sudoku_solved(
+        sudoku_solved
+    )
+    timings["verify"] = time.perf_counter() - start_time
+    if not solved:
+        return {"status": "unsolvable", "timings": timings, "stats": stats}
+    return {
+        "status": "solved",
+        "solution": converters.format_sudoku(sudoku_solved, "line"),
+        "timings": timings,
+        "stats": stats,
+    }
+
+
+# Seconds a worker gets to stop a solve after its deadline before it exits
+DEADLINE_GRACE = 1.0
+
+# 2.1 SolveTimeout
+
+
+class SolveTimeout(Exception):
+    """!@brief Raised in a worker when the deadline of a request is over."""
+
+
+def _raise_timeout(signum, frame):
+    """!@brief SIGALRM handler that interrupts the running solver.
+
+    @details Arms a last timer that ends the worker process if the solver
+    does not stop within DEADLINE_GRACE seconds (solve_request disarms it as
+    soon as the solve returns).
+    """
+    signal.signal(signal.SIGALRM, _exit_worker)
+    signal.setitimer(signal.ITIMER_REAL, DEADLINE_GRACE)
+    raise SolveTimeout()
+
+
+def _exit_worker(signum, frame):
+    """!@brief SIGALRM handler that ends a worker stuck after its deadline
+    (the server then replaces the pool)."""
+    os._exit(1)
+
+
+# 3. worker_pid
+
+
+def worker_pid():
+    """!@brief Return the process id of the worker (used for warm up)."""
+    return os.getpid()
+
+
+# 3.1 _solver_label
+
+
+def _solver_label(solver):
+    """!@brief Map the solver of a request to a bounded metrics label.
+
+    @details The solver name comes from the client, so anything that is not
+    a known solver is recorded as 'unknown' instead of creating a new label.
+
+    @param solver The solver named by the request
+    @type solver any
+    @return label The solver name or 'unknown'
+    @rtype str
+    """
+    if isinstance(solver, str) and solver in registry.SOLVERS:
+        return solver
+    return "unknown"
+
+
+# === SERVER ==================================================================
+
+# 4. SolveServer
+
+
+class SolveServer:
+    """!@brief Asyncio sudoku solve server with a pool of warm workers.
+
+    Example:
+    >>> server = SolveServer(workers=4)
+    >>> asyncio.run(server.serve(unix_path="/tmp/sudoku.sock"))
+    """
+
+    def __init__(self, workers=None, max_inflight=None, default_solver="cs"):
+        """!@brief Create the solve server.
+
+        @param workers Optional number of worker processes (defaults to the
+        number of CPUs)
+        @type workers int
+        @param max_inflight Optional maximum number of requests being solved
+        at once (defaults to 4 per worker)
+        @type max_inflight int
+        @param default_solver Solver used if a request names none
+        @type default_solver str
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_inflight = max_inflight or 4 * self.workers
+        self.default_solver = default_solver
+        self._pool = None
+        self._server = None
+        self._inflight = None
+        self._tasks = set()
+        self._connections = set()
+        self._stopping = None
+
+    # 4.1 serve
+
+    async def serve(self, unix_path=None, host="127.0.0.1", port=8765):
+        """!@brief Start the workers and serve until stop() is called or the
+        process receives SIGINT/SIGTERM.
+
+        @param unix_path Optional path of a Unix socket to listen on (TCP is
+        used otherwise)
+        @type unix_path str
+        @param host The host to listen on for TCP
+        @type host str
+        @param port The port to listen on for TCP
+        @type port int
+        """
+        loop = asyncio.get_running_loop()
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        self._stopping = asyncio.Event()
+        self._pool = self._create_pool()
+        # Pre-fork all workers: submitting one job per worker before any
+        # of them finishes its warm up makes the pool start every process
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(self._pool, worker_pid)
+                for _ in range(self.workers)
+            ]
+        )
+        if unix_path:
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=unix_path
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, host=host, port=port
+            )
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # not in the main thread or not supported
+        print(
+            f"Serving on {unix_path or f'{host}:{port}'} with "
+            f"{self.workers} workers.",
+            flush=True,
+        )
+        try:
+            await self._stopping.wait()
+        finally:
+            await self._shutdown(unix_path)
+
+    # 4.2 stop
+
+    def stop(self):
+        """!@brief Ask the server to shut down gracefully."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    # === HELPER METHODS ======================================================
+
+    async def _handle_connection(self, reader, writer):
+        """!@brief Read pipelined requests from one connection."""
+        write_lock = asyncio.Lock()
+        connection_tasks = set()
+        self._connections.add(writer)
+        try:
+            while not self._stopping.is_set():
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):
+                    line = b""
+                if not line.strip():
+                    if not line:
+                        break
+                    continue
+                # Backpressure: stop reading while max_inflight is reached
+                # (an idle connection waiting for input holds no permit)
+                await self._inflight.acquire()
+                task = asyncio.ensure_future(
+                    self._handle_request(line, writer, write_lock)
+                )
+                # The permit is held until the response has been written
+                task.add_done_callback(lambda _: self._inflight.release())
+                for tasks in (self._tasks, connection_tasks):
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        finally:
+            self._connections.discard(writer)
+            # Let the responses of this connection finish before closing
+            await asyncio.gather(*connection_tasks, return_exceptions=True)
+            writer.close()
+
+    async def _handle_request(self, line, writer, write_lock):
+        """!@brief Solve one request in the pool and write its response."""
+        received = time.perf_counter()
+        request_id = None
+        solver = self.default_solver
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object.")
+            request_id = request.get("id")
+            solver = request.get("solver") or self.default_solver
+            deadline = request.get("deadline")
+            expires = None
+            if deadline is not None:
+                expires = time.time() + float(deadline)
+            pool = self._pool
+            future = asyncio.get_running_loop().run_in_executor(
+                pool, solve_request, request.get("grid"), solver, expires
+            )
+            try:
+                response = await future
+            except concurrent.futures.BrokenExecutor:
+                # A worker exited (e.g. stuck after its deadline)
+                self._replace_pool(pool)
+                timed_out = expires is not None and time.time() >= expires
+                response = {
+                    "status": "timeout" if timed_out else "error",
+                    "error": "Worker process stopped.",
+                }
+            response["solver"] = solver
+        except (ValueError, TypeError) as e:
+            response = {"status": "error", "error": str(e)}
+        except Exception as e:
+            # Failure inside the worker (e.g. missing lp solver binary)
+            response = {"status": "error", "error": repr(e)}
+        response = {"id": request_id, **response}
+        timings = response.setdefault("timings", {})
+        worker_time = sum(timings.values())
+        timings["total"] = time.perf_counter() - received
+        # Time spent waiting for a worker and transferring the request
+        timings["queue"] = max(0.0, timings["total"] - worker_time)
+        metrics.record_solve(
+            _solver_label(solver),
+            response["status"],
+            timings,
+            response.get("stats"),
+        )
+        try:
+            async with write_lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass  # client went away, drop the response
+
+    def _replace_pool(self, broken_pool):
+        """!@brief Replace a broken worker pool (once for all its
+        requests)."""
+        if self._pool is broken_pool:
+            self._pool = self._create_pool()
+            broken_pool.shutdown(wait=False)
+
+    def _create_pool(self):
+        """!@brief Create a pool of warm worker processes."""
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, initializer=init_worker
+        )
+
+    async def _shutdown(self, unix_path):
+        """!@brief Stop accepting, finish in-flight requests, stop workers."""
+        self._server.close()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        self._pool.shutdown(wait=True)
+        if unix_path and os.path.exists(unix_path):
+            os.unlink(unix_path)
+        print("Server stopped.", flush=True)
+
+
+# === MAIN ====================================================================
+
+
+def main():
+    """!@brief Parse command line arguments and run the solve server."""
+    parser = argparse.ArgumentParser(description="Local sudoku solve server.")
+    parser.add_argument("--unix", help="path of the Unix socket to listen on")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-inflight", type=int, default=None)
+    parser.add_argument("--solver", default="cs", help="default solver")
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="write the metrics in the Prometheus text format to FILE",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=15.0,
+        help="seconds between two writes of the metrics file",
+    )
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.export_metrics(args.metrics, args.metrics_interval)
+    server = SolveServer(args.workers, args.max_inflight, args.solver)
+    asyncio.run(server.serve(args.unix, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
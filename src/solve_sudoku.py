@@ -36,6 +36,9 @@ argument. The solver argument can be one of the following:
 1. bt: backtracking algorithm
 2. cs: constraint satisfaction algorithm
 3. lp: linear programming algorithm
+4. sat: boolean satisfiability (CDCL) algorithm
+5. pcs: parallel constraint satisfaction algorithm
+6. lpr: linear programming algorithm, LP relaxation first
 
 If no solver argument is specified, the script will use the constraint
 satisfaction algorithm by default.
@@ -47,17 +50,20 @@ satisfaction algorithm by default.
 import sys
 import os
 import time
-from processors import checkers, converters
-from solvers import (
-    back_tracking_solver,
-    constraint_satisfaction_solver,
-    linear_programming_solver,
-)
+from processors import checkers, converters, memory, metrics
+from solvers import registry
 
 # === OVERALL SUDOKU SOLVER FUNCTION ==========================================
 
 
-def solve_sudoku(sudoku_file, solver="lp", save_file=False):
+def solve_sudoku(
+    sudoku_file,
+    solver="lp",
+    save_file=False,
+    results=None,
+    track_memory=False,
+    repair=False,
+):
     """!@brief This is the main function to solve a sudoku.
 
     @details It takes a sudoku file as an input and returns a solved sudoku
@@ -76,6 +82,9 @@ def solve_sudoku(sudoku_file, solver="lp", save_file=False):
     1. bt: backtracking algorithm
     2. cs: constraint satisfaction algorithm
     3. lp: linear programming algorithm
+    4. sat: boolean satisfiability (CDCL) algorithm
+    5. pcs: parallel constraint satisfaction algorithm
+    6. lpr: linear programming algorithm, LP relaxation first
 
     If no [solver] argument is specified, the script will use the linear
     programming algorithm by default.
@@ -90,24 +99,38 @@ def solve_sudoku(sudoku_file, solver="lp", save_file=False):
 
     @param sudoku_file Textfile with unsolved sudoku
     @type sudoku_file Textfile
-    @param solver Optional solver argument (bt, cs, lp)
+    @param solver Optional solver argument (bt, cs, lp, sat, pcs)
     @type solver str
     @param save_file Optional argument to save the solved sudoku to a file
     (True/False)
     @type save_file bool
+    @param results Optional result writer (processors.results.ResultWriter)
+    that gets one record with the status, per-stage timings and search
+    statistics of the solve
+    @type results ResultWriter
+    @note Every call also records the status, stage timings and search nodes
+    of the solve in the default metrics registry (processors.metrics)
+    @param track_memory Optional argument to measure the peak memory and
+    allocations of each stage with tracemalloc, print the peak memory and
+    add it to the result record (True/False); tracing slows the solvers down
+    @type track_memory bool
+    @param repair Optional argument to repair the formatting of the sudoku
+    file in memory (white space, empty lines, separators, file extension)
+    and solve it in the same call, instead of writing a '_fixed.txt' file and
+    returning None (True/False)
+    @type repair bool
     @return sudoku_solution Print the solved sudoku to the terminal
     @return duration Print the duration to the terminal
     @see checkers.is_sudoku_file_valid Function to check if the sudoku file is
     valid
+    @see checkers.repair_sudoku_file Function to repair the sudoku file in
+    memory
     @see converters.convert_sudoku_txt_to_arr Function to convert the sudoku
     file to an array
     @see checkers.is_sudoku_valid Function to check if the sudoku is valid
-    @see back_tracking_solver.solve_sudoku_bt Function to solve the sudoku with
-    the backtracking algorithm
-    @see constraint_satisfaction_solver.solve_sudoku_cs Function to solve the
-    sudoku with the constraint satisfaction algorithm
-    @see linear_programming_solver.solve_sudoku_lp Function to solve the sudoku
-    with the linear programming algorithm
+    @see registry.get_solver Function to load the solver (bt: backtracking,
+    cs: constraint satisfaction, lp: linear programming, sat: boolean
+    satisfiability, pcs: parallel constraint satisfaction algorithm)
     @see checkers.is_sudoku_solved Function to check if the sudoku is solved
     @see converters.convert_sudoku_arr_to_txt Function to convert the solved
     sudoku array to text
@@ -137,34 +160,86 @@ def solve_sudoku(sudoku_file, solver="lp", save_file=False):
     """
     # Record the start time
     start_time = time.time()
-    # Check if the input sudoku file is valid
-    if not checkers.is_sudoku_file_valid(sudoku_file):
-        return None
-    # Convert the sudoku file to an array
-    sudoku = converters.convert_sudoku_txt_to_arr(sudoku_file)
+    # Fall back to the default solver before anything is recorded, so an
+    # invalid solver name never becomes a metrics label or result field
+    known_solver = isinstance(solver, str) and solver in registry.SOLVERS
+    if not known_solver:
+        solver = "cs"
+    timings = {}
+    stats = {}
+    tracker = memory.MemoryTracker() if track_memory else None
+    if tracker is not None:
+        tracker.start()
+
+    # Record the duration (and memory) of a stage and the result of the solve
+    def end_stage(stage):
+        timings[stage] = time.perf_counter() - stage_time
+        if tracker is not None:
+            tracker.end_stage(stage)
+        return time.perf_counter()
+
+    def record(status, solution=None):
+        memory_usage = None
+        if tracker is not None:
+            memory_usage = tracker.stop()
+            peak = memory_usage["total"]["peak"] / 1024
+            print(f"Peak memory: {peak:.1f} KiB.")
+        timings["total"] = time.time() - start_time
+        metrics.record_solve(solver, status, timings, stats)
+        if results is not None:
+            results.write(
+                sudoku_file,
+                status,
+                solver,
+                solution,
+                timings,
+                stats,
+                memory_usage,
+            )
+
+    stage_time = time.perf_counter()
+    if repair:
+        # Repair the sudoku file in memory and convert it to an array
+        sudoku_txt, diagnostics = checkers.repair_sudoku_file(sudoku_file)
+        for diagnostic in diagnostics:
+            status = "Fixed" if diagnostic.repaired else "Error"
+            print(f"{status}: {diagnostic.message}\n")
+        if sudoku_txt is None:
+            print("WARNING SUMMARY: INVALID FILE CONTENT!\n")
+            record("invalid")
+            return None
+        sudoku = converters.convert_sudoku_str_to_arr(sudoku_txt)
+    else:
+        # Check if the input sudoku file is valid
+        if not checkers.is_sudoku_file_valid(sudoku_file):
+            record("invalid")
+            return None
+        # Convert the sudoku file to an array
+        sudoku = converters.convert_sudoku_txt_to_arr(sudoku_file)
+    stage_time = end_stage("parse")
     # Check if the sudoku is valid
     if not checkers.is_sudoku_valid(sudoku):
+        end_stage("validate")
+        record("invalid")
         return None
-    # Solve the sudoku with specified solver or default solver
-    if solver == "bt":
-        print("Use backtracking solver.")
-        sudoku_solved = back_tracking_solver.solve_sudoku_bt(sudoku)
-    elif solver == "cs":
-        print("Use constraint satisfaction solver.")
-        sudoku_solved = constraint_satisfaction_solver.solve_sudoku_cs(sudoku)
-    elif solver == "lp":
-        print("Use linear programming solver.")
-        sudoku_solved = linear_programming_solver.solve_sudoku_lp(sudoku)
+    stage_time = end_stage("validate")
+    # Solve the sudoku with specified solver or default solver (the solver
+    # module is only imported here, so unused solvers cost no start up time)
+    if known_solver:
+        print(f"Use {registry.get_solver_description(solver)} solver.")
     else:
         print("Invalid solver specified.")
         print("Use default solver (constraint satisfaction solver).")
-        sudoku_solved = constraint_satisfaction_solver.solve_sudoku_cs(sudoku)
+    sudoku_solved = registry.get_solver(solver)(sudoku, stats=stats)
+    stage_time = end_stage("solve")
     # Check if the sudoku was unsolveable
     if sudoku_solved is None:
+        record("unsolvable")
         return None
     else:
         # Check if the sudoku is valid and solved
         if checkers.is_sudoku_solved(sudoku_solved):
+            end_stage("verify")
             # Convert the solved Sudoku array back to text
             solution = converters.convert_sudoku_arr_to_txt(sudoku_solved)
             end_time = time.time()  # record the end time
@@ -172,6 +247,7 @@ def solve_sudoku(sudoku_file, solver="lp", save_file=False):
             print(f"Solved in {duration:.5f} seconds with {solver} solver.\n")
             print("Sudoku solution:\n")
             print(solution, "\n")
+            record("solved", converters.format_sudoku(sudoku_solved, "line"))
             # Save the solved Sudoku string to a file if save_file is True
             if save_file:
                 solved_file = os.path.splitext(sudoku_file)[0] + "_solved.txt"
@@ -179,7 +255,9 @@ def solve_sudoku(sudoku_file, solver="lp", save_file=False):
                     file.write(solution)
                 print(f"Solved sudoku saved to this file: {solved_file}")
         else:
+            end_stage("verify")
             print("Sudoku solution is invalid or not solved. Returned 'None'.")
+            record("unsolvable")
             return None
         return solution, duration
 
@@ -195,29 +273,49 @@ def main():
     command line arguments:
 
     1. sudoku_file: The path to the sudoku file to be solved.
-    2. solver: Optional solver argument (bt, cs, lp)
+    2. solver: Optional solver argument (bt, cs, lp, sat, pcs)
     3. save_file: Optional argument to save the solved sudoku to a file
     (True/False)
+    4. --memory: Optional flag to measure and print the peak memory
+    5. --repair: Optional flag to repair the sudoku file in memory
+    6. --metrics: Optional flag to print the metrics of the solve in the
+    Prometheus text format when the script exits
 
     If no [solver] argument is specified, the script will use the linear
     programming algorithm by default. If no [save_file] argument is specified,
     the script will not save the solved sudoku to a file by default.
     """
-    if len(sys.argv) < 2 or len(sys.argv) > 4:
-        print("Usage: python solve_sudoku.py input.txt [solver] [save_file]")
+    args = sys.argv[1:]
+    flags = {
+        flag for flag in ("--memory", "--repair", "--metrics") if flag in args
+    }
+    args = [arg for arg in args if arg not in flags]
+    if len(args) < 1 or len(args) > 3:
+        print(
+            "Usage: python solve_sudoku.py input.txt [solver] [save_file] "
+            "[--memory] [--repair] [--metrics]"
+        )
         return
 
-    sudoku_file = sys.argv[1]
+    sudoku_file = args[0]
     solver = "lp"  # Default solver
     save_file = False  # Default save_file
 
-    if len(sys.argv) >= 3:
-        solver = sys.argv[2]
-
-    if len(sys.argv) == 4:
-        save_file = True if sys.argv[3].lower() == "true" else False
-
-    solve_sudoku(sudoku_file, solver, save_file)
+    if len(args) >= 2:
+        solver = args[1]
+
+    if len(args) == 3:
+        save_file = True if args[2].lower() == "true" else False
+
+    if "--metrics" in flags:
+        metrics.export_metrics()
+    solve_sudoku(
+        sudoku_file,
+        solver,
+        save_file,
+        track_memory="--memory" in flags,
+        repair="--repair" in flags,
+    )
 
 
 if __name__ == "__main__":
@@ -1,3 +1,5 @@
+from processors.topology import STANDARD
+
 # flake8: noqa F401
 import typing
 
@@ -12,7 +14,7 @@ returns a solved sudoku array (list of lists) using the backtracking algorithm.
 
 
 # 1. solve_sudoku_bt
-def solve_sudoku_bt(sudoku):
+def solve_sudoku_bt(sudoku, topology=STANDARD, stats=None, observer=None):
     """!@brief This is the main function to solve a sudoku using the
     backtracking algorithm.
 
@@ -23,6 +25,16 @@ def solve_sudoku_bt(sudoku):
 
     @param sudoku The sudoku array (list of lists) to solve
     @type sudoku list of lists
+    @param topology Optional topology of the sudoku (e.g. X-sudoku or jigsaw
+    regions), defaults to the standard sudoku
+    @type topology Topology
+    @param stats Optional dictionary that is updated with the search
+    statistics (nodes: numbers placed, backtracks: numbers taken back)
+    @type stats dict
+    @param observer Optional search observer (see observers.SearchObserver)
+    that is told about every assign, backtrack and contradiction; without an
+    observer the unobserved search loop runs
+    @type observer SearchObserver
     @return sudoku_solved The solved sudoku array (list of lists)
     @rtype list of lists
     @see is_number_valid Function to check if a number is valid in sudoku
@@ -59,9 +71,12 @@ def solve_sudoku_bt(sudoku):
     """
     # Create copy of initial sudoku
     sudoku_solved = [row[:] for row in sudoku]
+    # Count the numbers placed and taken back
+    nodes = backtracks = 0
 
     # Run backtracking algorithm
     def solve():
+        nonlocal nodes, backtracks
         for row in range(9):
             for col in range(9):
                 # Find empty cell
@@ -69,18 +84,51 @@ def solve_sudoku_bt(sudoku):
                     # Try all numbers for this cell
                     for num in range(1, 10):
                         # Check if number is valid for this cell based on rules
-                        if is_number_valid(sudoku_solved, row, col, num):
+                        if is_number_valid(
+                            sudoku_solved, row, col, num, topology
+                        ):
                             sudoku_solved[row][col] = num
+                            nodes += 1
                             # Solve the updated sudoku with recursion
                             if solve():
                                 return True
                             # Backtrack if the number doesn't lead to solution
                             sudoku_solved[row][col] = 0
+                            backtracks += 1
+                    return False
+        return True
+
+    # Same search, reporting every event to the observer (a separate copy
+    # so that the unobserved search has no per-node observer checks)
+    def solve_observed():
+        nonlocal nodes, backtracks
+        for row in range(9):
+            for col in range(9):
+                if sudoku_solved[row][col] == 0:
+                    contradiction = True
+                    for num in range(1, 10):
+                        if is_number_valid(
+                            sudoku_solved, row, col, num, topology
+                        ):
+                            contradiction = False
+                            sudoku_solved[row][col] = num
+                            nodes += 1
+                            observer.on_assign(row, col, num)
+                            if solve_observed():
+                                return True
+                            sudoku_solved[row][col] = 0
+                            backtracks += 1
+                            observer.on_unassign(row, col, num)
+                    if contradiction:
+                        observer.on_contradiction(row, col)
                     return False
         return True
 
     # Return the solved sudoku if the sudoku is valid
-    if solve():
+    solved = solve() if observer is None else solve_observed()
+    if stats is not None:
+        stats.update(nodes=nodes, backtracks=backtracks)
+    if solved:
         return sudoku_solved
     else:
         # Print a warning if sudoku is invalid/unsolveable
@@ -93,7 +141,7 @@ def solve_sudoku_bt(sudoku):
 # 1.1 is_number_valid
 
 
-def is_number_valid(sudoku, row, col, num):
+def is_number_valid(sudoku, row, col, num, topology=STANDARD):
     """!@brief Checks if a number is valid in sudoku at the given row and
     column index.
 
@@ -110,18 +158,17 @@ def is_number_valid(sudoku, row, col, num):
     @type col int
     @param num The number to check
     @type num int
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
     @return A boolean value indicating if the number is valid in sudoku
     @rtype bool
     """
-    # Check if the given number is valid in its row and column
-    for i in range(9):
-        if sudoku[row][i] == num or sudoku[i][col] == num:
+    # Check if the given number is valid in its row
+    if num in sudoku[row]:
+        return False
+    # Check if the given number is used by another peer (column, subgrid)
+    for peer_row, peer_col in topology.nonrow_peer_coords[row * 9 + col]:
+        if sudoku[peer_row][peer_col] == num:
             return False
-    # Check if the given number is possible in its subgrid
-    sub_row_start = (row // 3) * 3  # define subgrid row start index
-    sub_col_start = (col // 3) * 3  # define subgrid column start index
-    for i in range(0, 3):
-        for j in range(0, 3):
-            if sudoku[sub_row_start + i][sub_col_start + j] == num:
-                return False
     return True
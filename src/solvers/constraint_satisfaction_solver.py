@@ -1,3 +1,8 @@
+import random
+import collections
+from processors.topology import STANDARD
+from .domains import DomainStore
+
 # flake8: noqa F401
 import typing
 
@@ -7,14 +12,42 @@ import typing
 
 @details  This script takes a sudoku array (list of lists) as an input and
 returns a solved sudoku array (list of lists) using the backtracking algorithm
-with an elimination constraint.
+with an elimination constraint. The candidate numbers of a cell are tried in
+ascending order by default, or ordered by the least-constraining-value
+heuristic or at random (see ORDERINGS). In the 'cbj' mode the search jumps
+back directly to the cell that caused a dead end (conflict-directed
+backjumping) and records small nogoods that prune later branches, and in the
+'propagate' mode it keeps the candidates of all cells in a trail-based
+DomainStore that propagates every assignment. The empty
+cells are filled row by row, or with the 'mrv' cell order the cell with the
+fewest valid numbers is filled first. With a node limit the search gives up
+after placing that many numbers (see the restarts module).
 @author Created by Steven Dillmann 17/12/2023
 """
 
+# Value ordering strategies of solve_sudoku_cs
+ORDERINGS = ("ascending", "lcv", "random")
+# Search modes of solve_sudoku_cs
+MODES = ("chronological", "cbj", "propagate")
+# Orders in which solve_sudoku_cs chooses the next empty cell
+CELL_ORDERS = ("row", "mrv")
+# Largest nogood (number of assignments) recorded by the 'cbj' mode
+MAX_NOGOOD_SIZE = 4
+
 # 1. solve_sudoku_cs
 
 
-def solve_sudoku_cs(sudoku):
+def solve_sudoku_cs(
+    sudoku,
+    topology=STANDARD,
+    stats=None,
+    observer=None,
+    ordering="ascending",
+    seed=None,
+    mode="chronological",
+    node_limit=None,
+    cell_order="row",
+):
     """!@brief This is the main function to solve a sudoku using the
     backtracking algorithm with an elimination constraint.
 
@@ -25,9 +58,48 @@ def solve_sudoku_cs(sudoku):
 
     @param sudoku The sudoku array (list of lists) to solve
     @type sudoku list of lists
+    @param topology Optional topology of the sudoku (e.g. X-sudoku or jigsaw
+    regions), defaults to the standard sudoku
+    @type topology Topology
+    @param stats Optional dictionary that is updated with the search
+    statistics (nodes: numbers placed, backtracks: numbers taken back)
+    @type stats dict
+    @param observer Optional search observer (see observers.SearchObserver)
+    that is told about every assign, backtrack and contradiction; without an
+    observer the unobserved search loop runs
+    @type observer SearchObserver
+    @param ordering Optional order in which the valid numbers of a cell are
+    tried: 'ascending', 'lcv' (least constraining value first, i.e. the
+    number that is a candidate of the fewest empty peers) or 'random'
+    @type ordering str
+    @param seed Optional seed of the 'random' ordering and of the
+    tie-breaking of the 'mrv' cell order (ties are broken at random if a
+    seed is given or the ordering is 'random', else row by row)
+    @type seed int
+    @param mode Optional search mode: 'chronological' backtracking, 'cbj'
+    (conflict-directed backjumping with nogood recording, see solve_cbj),
+    which adds backjumps, nogoods and nogood_prunes to the statistics, or
+    'propagate' (candidate propagation with an undo trail, see
+    solve_propagate), which adds propagations and trail_peak
+    @type mode str
+    @param node_limit Optional maximum number of numbers to place: the
+    search below the first node_limit numbers is completed and
+    NodeLimitReached is raised instead of placing one more
+    @type node_limit int
+    @param cell_order Optional order in which the empty cells are filled:
+    'row' (row by row) or 'mrv' (minimum remaining values: the cell with the
+    fewest valid numbers first, see solve_mrv)
+    @type cell_order str
     @return sudoku_solved The solved sudoku array (list of lists) to solve
     @rtype list of lists
+    @raises ValueError If the ordering, the mode or the cell order is
+    unknown, if the 'cbj' mode is combined with the 'mrv' cell order or the
+    'propagate' mode with the 'lcv' ordering
+    @raises NodeLimitReached If the node limit is reached before the search
+    ends (the statistics are updated first)
     @see get_valid_numbers Function to get all valid numbers for a cell
+    @see order_least_constraining Function to order numbers by the
+    least-constraining-value heuristic
 
     References:
     - Helmut Simonis. Sudoku as a constraint problem. In CP Workshop on
@@ -60,33 +132,165 @@ def solve_sudoku_cs(sudoku):
         [6, 1, 9, 3, 8, 2, 5, 4, 7],
     ]
     """
+    # Get the function that reorders the valid numbers (None: ascending)
+    if ordering not in ORDERINGS:
+        raise ValueError(
+            f"Unknown ordering '{ordering}'. "
+            f"Choose one of: {', '.join(ORDERINGS)}.\n"
+        )
+    if mode not in MODES:
+        raise ValueError(
+            f"Unknown mode '{mode}'. Choose one of: {', '.join(MODES)}.\n"
+        )
+    if cell_order not in CELL_ORDERS:
+        raise ValueError(
+            f"Unknown cell order '{cell_order}'. "
+            f"Choose one of: {', '.join(CELL_ORDERS)}.\n"
+        )
+    if mode == "cbj" and cell_order != "row":
+        raise ValueError("The cbj mode needs the 'row' cell order.\n")
+    if mode == "propagate" and ordering == "lcv":
+        raise ValueError("The propagate mode does not support 'lcv'.\n")
+    rng = None
+    if ordering == "random" or seed is not None:
+        rng = random.Random(seed)
+    order = None
+    if ordering == "lcv":
+
+        def order(numbers, row, col):
+            return order_least_constraining(
+                sudoku_solved, row, col, numbers, topology
+            )
+
+    elif ordering == "random":
+
+        def order(numbers, row, col):
+            rng.shuffle(numbers)
+            return numbers
+
     # Create copy of initial sudoku
     sudoku_solved = [row[:] for row in sudoku]
+    # Count the numbers placed and taken back
+    nodes = backtracks = 0
+    # Node count after which the search gives up (-1: never)
+    limit = -1 if node_limit is None else node_limit
 
     # Run backtracking algorithm including elimination constraint
     def solve():
+        nonlocal nodes, backtracks
         for row in range(9):
             for col in range(9):
                 # Find an empty cell
                 if sudoku_solved[row][col] == 0:
                     # Get all valid numbers for this cell based on rules
-                    valid_numbers = get_valid_numbers(sudoku_solved, row, col)
+                    valid_numbers = get_valid_numbers(
+                        sudoku_solved, row, col, topology
+                    )
                     # Trigger backtracking if no valid numbers
                     if len(valid_numbers) == 0:
                         return False
                     # Try the valid numbers for this cell
                     for num in valid_numbers:
                         sudoku_solved[row][col] = num
+                        nodes += 1
                         # Solve the updated sudoku with recursion
                         if solve():
                             return True
                         # Backtrack if the number doesn't lead to solution
                         sudoku_solved[row][col] = 0
+                        backtracks += 1
+                    return False
+        return True
+
+    # Same search with a value ordering and/or a node limit (a separate copy
+    # so that the default search has no per-node ordering or limit checks)
+    def solve_checked():
+        nonlocal nodes, backtracks
+        for row in range(9):
+            for col in range(9):
+                if sudoku_solved[row][col] == 0:
+                    valid_numbers = get_valid_numbers(
+                        sudoku_solved, row, col, topology
+                    )
+                    if len(valid_numbers) == 0:
+                        return False
+                    if order is not None:
+                        valid_numbers = order(valid_numbers, row, col)
+                    for num in valid_numbers:
+                        if nodes == limit:
+                            raise NodeLimitReached()
+                        sudoku_solved[row][col] = num
+                        nodes += 1
+                        if solve_checked():
+                            return True
+                        sudoku_solved[row][col] = 0
+                        backtracks += 1
+                    return False
+        return True
+
+    # Same search, reporting every event to the observer (a separate copy
+    # so that the unobserved searches have no per-node observer checks)
+    def solve_observed():
+        nonlocal nodes, backtracks
+        for row in range(9):
+            for col in range(9):
+                if sudoku_solved[row][col] == 0:
+                    valid_numbers = get_valid_numbers(
+                        sudoku_solved, row, col, topology
+                    )
+                    if len(valid_numbers) == 0:
+                        observer.on_contradiction(row, col)
+                        return False
+                    if order is not None:
+                        valid_numbers = order(valid_numbers, row, col)
+                    for num in valid_numbers:
+                        if nodes == limit:
+                            raise NodeLimitReached()
+                        sudoku_solved[row][col] = num
+                        nodes += 1
+                        observer.on_assign(row, col, num)
+                        if solve_observed():
+                            return True
+                        sudoku_solved[row][col] = 0
+                        backtracks += 1
+                        observer.on_unassign(row, col, num)
                     return False
         return True
 
     # Return the solved sudoku if the sudoku is valid
-    if solve():
+    if mode == "cbj":
+        solved = solve_cbj(
+            sudoku_solved, topology, order, observer, stats, node_limit
+        )
+    elif mode == "propagate":
+        solved = solve_propagate(
+            sudoku_solved,
+            topology,
+            order,
+            rng,
+            observer,
+            stats,
+            node_limit,
+            cell_order,
+        )
+    elif cell_order == "mrv":
+        solved = solve_mrv(
+            sudoku_solved, topology, order, rng, observer, stats, node_limit
+        )
+    else:
+        # Pick the search loop once instead of checking on every node
+        if observer is not None:
+            search = solve_observed
+        elif order is None and node_limit is None:
+            search = solve
+        else:
+            search = solve_checked
+        try:
+            solved = search()
+        finally:
+            if stats is not None:
+                stats.update(nodes=nodes, backtracks=backtracks)
+    if solved:
         return sudoku_solved
     else:
         # Print a warning if sudoku is invalid/unsolveable
@@ -99,7 +303,7 @@ def solve_sudoku_cs(sudoku):
 # 1.1 get_valid_numbers
 
 
-def get_valid_numbers(sudoku, row, col):
+def get_valid_numbers(sudoku, row, col, topology=STANDARD):
     """!@brief Gets all valid numbers for a cell in the sudoku array
     (list of lists).
 
@@ -114,20 +318,595 @@ def get_valid_numbers(sudoku, row, col):
     @type row int
     @param col The column index of the cell to check
     @type col int
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
     @return A list of valid numbers for the cell at the given row and
     column index
     @rtype list
     """
-    # Get a set of all numbers
-    valid_numbers = set(range(1, 10))
-    # Eliminate numbers from the set that exist in row and column
-    for i in range(9):
-        valid_numbers.discard(sudoku[row][i])
-        valid_numbers.discard(sudoku[i][col])
-    # Eliminate numbers from the set that exist in subgrid
-    sub_row_start = (row // 3) * 3  # define subgrid row start index
-    sub_col_start = (col // 3) * 3  # define subgrid column start index
-    for i in range(3):
-        for j in range(3):
-            valid_numbers.discard(sudoku[sub_row_start + i][sub_col_start + j])
-    return list(valid_numbers)
+    # Get the numbers used in the row and by the other peers (column,
+    # subgrid) of the cell
+    used_numbers = set(sudoku[row])
+    for peer_row, peer_col in topology.nonrow_peer_coords[row * 9 + col]:
+        used_numbers.add(sudoku[peer_row][peer_col])
+    # Eliminate the used numbers from all numbers
+    return [num for num in range(1, 10) if num not in used_numbers]
+
+
+# 1.2 order_least_constraining
+
+
+def order_least_constraining(sudoku, row, col, numbers, topology=STANDARD):
+    """!@brief Orders the valid numbers of a cell by the
+    least-constraining-value heuristic.
+
+    @details Counts for each number the empty peers of the cell that still
+    have the number as a candidate, i.e. the candidates that placing the
+    number would eliminate, and orders the numbers by this count (ties in
+    ascending order). Trying the least constraining number first leaves the
+    most options for the rest of the search.
+
+    @param sudoku The sudoku array (list of lists) to solve
+    @type sudoku list of lists
+    @param row The row index of the cell
+    @type row int
+    @param col The column index of the cell
+    @type col int
+    @param numbers The valid numbers of the cell
+    @type numbers list
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
+    @return The valid numbers, least constraining first
+    @rtype list
+    """
+    eliminated = dict.fromkeys(numbers, 0)
+    for peer_row, peer_col in topology.peer_coords[row * 9 + col]:
+        if sudoku[peer_row][peer_col] == 0:
+            for num in get_valid_numbers(sudoku, peer_row, peer_col, topology):
+                if num in eliminated:
+                    eliminated[num] += 1
+    return sorted(numbers, key=eliminated.__getitem__)
+
+
+# 1.3 solve_cbj
+
+
+def solve_cbj(
+    sudoku,
+    topology=STANDARD,
+    order=None,
+    observer=None,
+    stats=None,
+    node_limit=None,
+):
+    """!@brief Solves a sudoku in place with conflict-directed backjumping
+    and nogood recording.
+
+    @details The empty cells are assigned in the same (row by row) order as
+    the chronological search. Each cell keeps a conflict set: the search
+    levels of the earlier assignments that ruled out one of its numbers
+    (the earliest peer holding the number) or that explain the failure of a
+    subtree below it. When all numbers of a cell fail, the search jumps
+    back to the latest level of its conflict set, skipping the levels in
+    between whose numbers play no part in the dead end. The assignments of
+    a conflict set with at most MAX_NOGOOD_SIZE levels are recorded as a
+    nogood; a number whose assignment would complete a nogood is pruned
+    without searching below it.
+
+    References:
+    - Patrick Prosser. Hybrid algorithms for the constraint satisfaction
+    problem. Computational Intelligence, 9(3):268-299, 1993.
+
+    @param sudoku The sudoku array (list of lists), solved in place
+    @type sudoku list of lists
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
+    @param order Optional function (numbers, row, col) reordering the valid
+    numbers of a cell
+    @type order function
+    @param observer Optional search observer (see observers.SearchObserver)
+    @type observer SearchObserver
+    @param stats Optional dictionary that is updated with the search
+    statistics (nodes, backtracks, backjumps: levels jumped over, nogoods:
+    nogoods recorded, nogood_prunes: numbers pruned by a nogood)
+    @type stats dict
+    @param node_limit Optional maximum number of numbers to place
+    @type node_limit int
+    @return True if the sudoku was solved, False otherwise
+    @rtype bool
+    @raises NodeLimitReached If the node limit is reached before the search
+    ends (the statistics are updated first)
+    """
+    cells = [
+        (row, col)
+        for row in range(9)
+        for col in range(9)
+        if not sudoku[row][col]
+    ]
+    peer_coords = topology.peer_coords
+    # Search level of each assigned cell (-1 for clues and empty cells)
+    levels = [[-1] * 9 for _ in range(9)]
+    # Recorded nogoods (tuples of (row, col, num)) by each of their elements
+    nogoods = collections.defaultdict(list)
+    nodes = backtracks = backjumps = recorded = prunes = 0
+    limit = -1 if node_limit is None else node_limit
+
+    # Search from the cell of the given level, returns (solved, conflicts)
+    def search(level):
+        nonlocal nodes, backtracks, backjumps, recorded, prunes
+        if level == len(cells):
+            return True, None
+        row, col = cells[level]
+        # Earliest level holding each used number (-1: ruled out by a clue)
+        culprits = {}
+        for peer_row, peer_col in peer_coords[row * 9 + col]:
+            num = sudoku[peer_row][peer_col]
+            if num and levels[peer_row][peer_col] < culprits.get(num, 81):
+                culprits[num] = levels[peer_row][peer_col]
+        conflicts = {culprit for culprit in culprits.values() if culprit >= 0}
+        valid_numbers = [num for num in range(1, 10) if num not in culprits]
+        if order is not None:
+            valid_numbers = order(valid_numbers, row, col)
+        for num in valid_numbers:
+            # Prune the number if it completes a recorded nogood
+            nogood = _find_nogood(
+                sudoku, row, col, nogoods.get((row, col, num))
+            )
+            if nogood is not None:
+                prunes += 1
+                conflicts.update(
+                    levels[r][c] for r, c, _ in nogood if (r, c) != (row, col)
+                )
+                continue
+            if nodes == limit:
+                raise NodeLimitReached()
+            sudoku[row][col] = num
+            levels[row][col] = level
+            nodes += 1
+            solved, child_conflicts = search(level + 1)
+            if solved:
+                return True, None
+            sudoku[row][col] = 0
+            levels[row][col] = -1
+            backtracks += 1
+            if level not in child_conflicts:
+                # The dead end below does not depend on this cell, so the
+                # other numbers of the cell cannot help: jump back over it
+                backjumps += 1
+                return False, child_conflicts
+            child_conflicts.discard(level)
+            conflicts |= child_conflicts
+        # The assignments of the conflict levels cannot be extended to a
+        # solution, record them as a nogood if they are few
+        if 0 < len(conflicts) <= MAX_NOGOOD_SIZE:
+            nogood = tuple(
+                cells[culprit]
+                + (sudoku[cells[culprit][0]][cells[culprit][1]],)
+                for culprit in sorted(conflicts)
+            )
+            for element in nogood:
+                nogoods[element].append(nogood)
+            recorded += 1
+        return False, conflicts
+
+    # Same search, reporting every event to the observer (a separate copy
+    # so that the unobserved search has no per-node observer checks)
+    def search_observed(level):
+        nonlocal nodes, backtracks, backjumps, recorded, prunes
+        if level == len(cells):
+            return True, None
+        row, col = cells[level]
+        # Earliest level holding each used number (-1: ruled out by a clue)
+        culprits = {}
+        for peer_row, peer_col in peer_coords[row * 9 + col]:
+            num = sudoku[peer_row][peer_col]
+            if num and levels[peer_row][peer_col] < culprits.get(num, 81):
+                culprits[num] = levels[peer_row][peer_col]
+        conflicts = {culprit for culprit in culprits.values() if culprit >= 0}
+        valid_numbers = [num for num in range(1, 10) if num not in culprits]
+        if not valid_numbers:
+            observer.on_contradiction(row, col)
+        if order is not None:
+            valid_numbers = order(valid_numbers, row, col)
+        for num in valid_numbers:
+            # Prune the number if it completes a recorded nogood
+            nogood = _find_nogood(
+                sudoku, row, col, nogoods.get((row, col, num))
+            )
+            if nogood is not None:
+                prunes += 1
+                conflicts.update(
+                    levels[r][c] for r, c, _ in nogood if (r, c) != (row, col)
+                )
+                continue
+            if nodes == limit:
+                raise NodeLimitReached()
+            sudoku[row][col] = num
+            levels[row][col] = level
+            nodes += 1
+            observer.on_assign(row, col, num)
+            solved, child_conflicts = search_observed(level + 1)
+            if solved:
+                return True, None
+            sudoku[row][col] = 0
+            levels[row][col] = -1
+            backtracks += 1
+            observer.on_unassign(row, col, num)
+            if level not in child_conflicts:
+                # The dead end below does not depend on this cell, so the
+                # other numbers of the cell cannot help: jump back over it
+                backjumps += 1
+                return False, child_conflicts
+            child_conflicts.discard(level)
+            conflicts |= child_conflicts
+        # The assignments of the conflict levels cannot be extended to a
+        # solution, record them as a nogood if they are few
+        if 0 < len(conflicts) <= MAX_NOGOOD_SIZE:
+            nogood = tuple(
+                cells[culprit]
+                + (sudoku[cells[culprit][0]][cells[culprit][1]],)
+                for culprit in sorted(conflicts)
+            )
+            for element in nogood:
+                nogoods[element].append(nogood)
+            recorded += 1
+        return False, conflicts
+
+    # Pick the search once instead of checking the observer on every node
+    run = search if observer is None else search_observed
+
+    try:
+        return run(0)[0]
+    finally:
+        if stats is not None:
+            stats.update(
+                nodes=nodes,
+                backtracks=backtracks,
+                backjumps=backjumps,
+                nogoods=recorded,
+                nogood_prunes=prunes,
+            )
+
+
+# 1.4 solve_mrv
+
+
+def solve_mrv(
+    sudoku,
+    topology=STANDARD,
+    order=None,
+    rng=None,
+    observer=None,
+    stats=None,
+    node_limit=None,
+):
+    """!@brief Solves a sudoku in place, filling the cell with the fewest
+    valid numbers first.
+
+    @details At each node the valid numbers of all empty cells are counted
+    and the cell with the fewest is filled next (minimum remaining values),
+    so that a cell without valid numbers is found as early as possible and
+    forced cells are filled without branching. Ties between cells are broken
+    at random with rng (reservoir sampling), else the first cell row by row
+    is taken. Randomized tie-breaking makes the searches of different seeds
+    diverge early, which the restarts module relies on.
+
+    @param sudoku The sudoku array (list of lists), solved in place
+    @type sudoku list of lists
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
+    @param order Optional function (numbers, row, col) reordering the valid
+    numbers of a cell
+    @type order function
+    @param rng Optional random number generator (random.Random) breaking
+    ties between cells
+    @type rng random.Random
+    @param observer Optional search observer (see observers.SearchObserver)
+    @type observer SearchObserver
+    @param stats Optional dictionary that is updated with the search
+    statistics (nodes, backtracks)
+    @type stats dict
+    @param node_limit Optional maximum number of numbers to place
+    @type node_limit int
+    @return True if the sudoku was solved, False otherwise
+    @rtype bool
+    @raises NodeLimitReached If the node limit is reached before the search
+    ends (the statistics are updated first)
+    """
+    empty_cells = [
+        (row, col)
+        for row in range(9)
+        for col in range(9)
+        if not sudoku[row][col]
+    ]
+    nodes = backtracks = 0
+    limit = -1 if node_limit is None else node_limit
+
+    def search():
+        nonlocal nodes, backtracks
+        # Find the empty cell with the fewest valid numbers
+        cell = valid_numbers = None
+        ties = 0
+        for row, col in empty_cells:
+            if sudoku[row][col]:
+                continue
+            numbers = get_valid_numbers(sudoku, row, col, topology)
+            if cell is None or len(numbers) < len(valid_numbers):
+                cell, valid_numbers, ties = (row, col), numbers, 1
+                if not numbers:
+                    break
+            elif len(numbers) == len(valid_numbers) and rng is not None:
+                ties += 1
+                if rng.randrange(ties) == 0:
+                    cell, valid_numbers = (row, col), numbers
+        if cell is None:
+            return True
+        row, col = cell
+        if not valid_numbers:
+            return False
+        if order is not None:
+            valid_numbers = order(valid_numbers, row, col)
+        for num in valid_numbers:
+            if nodes == limit:
+                raise NodeLimitReached()
+            sudoku[row][col] = num
+            nodes += 1
+            if search():
+                return True
+            sudoku[row][col] = 0
+            backtracks += 1
+        return False
+
+    # Same search, reporting every event to the observer (a separate copy
+    # so that the unobserved search has no per-node observer checks)
+    def search_observed():
+        nonlocal nodes, backtracks
+        # Find the empty cell with the fewest valid numbers
+        cell = valid_numbers = None
+        ties = 0
+        for row, col in empty_cells:
+            if sudoku[row][col]:
+                continue
+            numbers = get_valid_numbers(sudoku, row, col, topology)
+            if cell is None or len(numbers) < len(valid_numbers):
+                cell, valid_numbers, ties = (row, col), numbers, 1
+                if not numbers:
+                    break
+            elif len(numbers) == len(valid_numbers) and rng is not None:
+                ties += 1
+                if rng.randrange(ties) == 0:
+                    cell, valid_numbers = (row, col), numbers
+        if cell is None:
+            return True
+        row, col = cell
+        if not valid_numbers:
+            observer.on_contradiction(row, col)
+            return False
+        if order is not None:
+            valid_numbers = order(valid_numbers, row, col)
+        for num in valid_numbers:
+            if nodes == limit:
+                raise NodeLimitReached()
+            sudoku[row][col] = num
+            nodes += 1
+            observer.on_assign(row, col, num)
+            if search_observed():
+                return True
+            sudoku[row][col] = 0
+            backtracks += 1
+            observer.on_unassign(row, col, num)
+        return False
+
+    # Pick the search once instead of checking the observer on every node
+    run = search if observer is None else search_observed
+
+    try:
+        return run()
+    finally:
+        if stats is not None:
+            stats.update(nodes=nodes, backtracks=backtracks)
+
+
+# 1.5 solve_propagate
+
+
+def solve_propagate(
+    sudoku,
+    topology=STANDARD,
+    order=None,
+    rng=None,
+    observer=None,
+    stats=None,
+    node_limit=None,
+    cell_order="row",
+):
+    """!@brief Solves a sudoku in place by propagating the candidates of the
+    cells in a trail-based DomainStore.
+
+    @details Every number placed by the search is propagated (eliminated
+    from the peers, naked and hidden singles placed) in one DomainStore. The
+    search takes a checkpoint before each decision and undoes the store to
+    it on backtracking, so the candidates are never copied and the memory
+    stays flat as the search gets deeper. The next cell is the first cell
+    with several candidates row by row, or with the 'mrv' cell order the
+    cell with the fewest candidates (ties broken at random with rng).
+
+    @param sudoku The sudoku array (list of lists), solved in place
+    @type sudoku list of lists
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
+    @param order Optional function (numbers, row, col) reordering the
+    candidates of a cell
+    @type order function
+    @param rng Optional random number generator (random.Random) breaking
+    ties between cells
+    @type rng random.Random
+    @param observer Optional search observer (see observers.SearchObserver)
+    that is told about the decisions of the search (the numbers placed by
+    propagation are not reported)
+    @type observer SearchObserver
+    @param stats Optional dictionary that is updated with the search
+    statistics (nodes: decisions, backtracks, propagations: candidates
+    removed, trail_peak: largest number of changes on the trail)
+    @type stats dict
+    @param node_limit Optional maximum number of decisions
+    @type node_limit int
+    @param cell_order Optional order of the cells: 'row' or 'mrv'
+    @type cell_order str
+    @return True if the sudoku was solved, False otherwise
+    @rtype bool
+    @raises NodeLimitReached If the node limit is reached before the search
+    ends (the statistics are updated first)
+    """
+    store = DomainStore(topology)
+    domains = store.domains
+    nodes = backtracks = propagations = trail_peak = 0
+    limit = -1 if node_limit is None else node_limit
+    mrv = cell_order == "mrv"
+
+    def search():
+        nonlocal nodes, backtracks, propagations, trail_peak
+        # Find the next cell with several candidates
+        cell = None
+        best_size = 10
+        ties = 0
+        for i in range(81):
+            mask = domains[i]
+            if mask & (mask - 1):
+                if not mrv:
+                    cell = i
+                    break
+                size = _MASK_SIZE[mask]
+                if size < best_size:
+                    cell, best_size, ties = i, size, 1
+                elif size == best_size and rng is not None:
+                    ties += 1
+                    if rng.randrange(ties) == 0:
+                        cell = i
+        if cell is None:
+            return True
+        row, col = divmod(cell, 9)
+        numbers = store.candidates(cell)
+        if order is not None:
+            numbers = order(numbers, row, col)
+        for num in numbers:
+            if nodes == limit:
+                raise NodeLimitReached()
+            checkpoint = store.checkpoint()
+            nodes += 1
+            consistent = store.assign(cell, 1 << (num - 1))
+            propagations += len(store.trail) - checkpoint
+            trail_peak = max(trail_peak, len(store.trail))
+            if consistent and search():
+                return True
+            store.undo(checkpoint)
+            backtracks += 1
+        return False
+
+    # Same search, reporting every decision to the observer (a separate
+    # copy so that the unobserved search has no per-node observer checks)
+    def search_observed():
+        nonlocal nodes, backtracks, propagations, trail_peak
+        # Find the next cell with several candidates
+        cell = None
+        best_size = 10
+        ties = 0
+        for i in range(81):
+            mask = domains[i]
+            if mask & (mask - 1):
+                if not mrv:
+                    cell = i
+                    break
+                size = _MASK_SIZE[mask]
+                if size < best_size:
+                    cell, best_size, ties = i, size, 1
+                elif size == best_size and rng is not None:
+                    ties += 1
+                    if rng.randrange(ties) == 0:
+                        cell = i
+        if cell is None:
+            return True
+        row, col = divmod(cell, 9)
+        numbers = store.candidates(cell)
+        if order is not None:
+            numbers = order(numbers, row, col)
+        for num in numbers:
+            if nodes == limit:
+                raise NodeLimitReached()
+            checkpoint = store.checkpoint()
+            nodes += 1
+            observer.on_assign(row, col, num)
+            consistent = store.assign(cell, 1 << (num - 1))
+            propagations += len(store.trail) - checkpoint
+            trail_peak = max(trail_peak, len(store.trail))
+            if consistent and search_observed():
+                return True
+            store.undo(checkpoint)
+            backtracks += 1
+            observer.on_unassign(row, col, num)
+        return False
+
+    # Pick the search once instead of checking the observer on every node
+    run = search if observer is None else search_observed
+
+    try:
+        solved = store.load(sudoku)
+        propagations = trail_peak = len(store.trail)
+        solved = solved and run()
+    finally:
+        if stats is not None:
+            stats.update(
+                nodes=nodes,
+                backtracks=backtracks,
+                propagations=propagations,
+                trail_peak=trail_peak,
+            )
+    if solved:
+        for row, values in enumerate(store.to_array()):
+            sudoku[row][:] = values
+    return solved
+
+
+# Number of candidates of each 9-bit mask
+_MASK_SIZE = [bin(mask).count("1") for mask in range(512)]
+
+# 1.6 _find_nogood
+
+
+def _find_nogood(sudoku, row, col, nogoods):
+    """!@brief Finds a nogood that placing a number in the cell (row, col)
+    would complete.
+
+    @param sudoku The sudoku array (list of lists) being solved
+    @type sudoku list of lists
+    @param row The row index of the cell
+    @type row int
+    @param col The column index of the cell
+    @type col int
+    @param nogoods The recorded nogoods containing the assignment (or None)
+    @type nogoods list of tuples
+    @return The first nogood whose other assignments all hold, or None
+    @rtype tuple
+    """
+    if nogoods:
+        for nogood in nogoods:
+            if all(
+                sudoku[r][c] == num
+                for r, c, num in nogood
+                if r != row or c != col
+            ):
+                return nogood
+    return None
+
+
+# 1.7 NodeLimitReached
+
+
+class NodeLimitReached(Exception):
+    """!@brief Raised by a solver when its node limit is reached before the
+    search ends."""
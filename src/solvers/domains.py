@@ -0,0 +1,191 @@
+from processors.topology import STANDARD
+
+# flake8: noqa F401
+import typing
+
+# === MAIN CLASSES ============================================================
+"""!@file domains.py
+@brief Module containing a trail-based store of the candidate numbers of the
+cells of a sudoku.
+
+@details This script stores the candidate numbers (domain) of each of the 81
+cells as a 9-bit mask and propagates assignments: a number placed in a cell
+is eliminated from its peers, a cell left with one candidate is placed
+(naked single) and a number left with one cell in a unit is placed there
+(hidden single). Every change of a domain is recorded on a trail as the cell
+and its previous mask, so a search takes a checkpoint (the length of the
+trail) before a decision and undoes the changes back to the checkpoint when
+it backtracks, instead of copying the domains at each branch. The memory of
+the store is one list of 81 masks plus the trail, which holds at most one
+entry per removed candidate (729 in total) whatever the search depth.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Mask with all 9 numbers as candidates
+ALL_NUMBERS = 0x1FF
+
+# 1. DomainStore
+
+
+class DomainStore:
+    """!@brief Candidate numbers of the cells of a sudoku with a trail of
+    changes.
+
+    @details Numbers are given as bits (bit = 1 << (num - 1)) to the
+    propagation methods. The propagation methods return False as soon as a
+    cell or a unit is left without candidates; the domains are then
+    partially propagated and the caller undoes them to its checkpoint.
+
+    Example:
+    >>> store = DomainStore()
+    >>> store.load(sudoku)
+    True
+    >>> checkpoint = store.checkpoint()
+    >>> store.assign(2, 1 << 3)          # place 4 in cell (0, 2)
+    >>> store.undo(checkpoint)
+    """
+
+    def __init__(self, topology=STANDARD):
+        """!@brief Creates a store with all numbers as candidates of all
+        cells.
+
+        @param topology Optional topology of the sudoku, defaults to the
+        standard sudoku
+        @type topology Topology
+        """
+        self.domains = [ALL_NUMBERS] * 81
+        self.trail = []
+        self._peers = topology.peers
+        self._units = topology.units
+        self._cell_units = topology.cell_units
+
+    # 1.1 load
+
+    def load(self, sudoku):
+        """!@brief Assigns the clues of a sudoku and propagates them.
+
+        @param sudoku The sudoku array (list of lists)
+        @type sudoku list of lists
+        @return False if the clues leave a cell or a unit without candidates
+        @rtype bool
+        """
+        for row in range(9):
+            for col in range(9):
+                num = sudoku[row][col]
+                if num and not self.assign(row * 9 + col, 1 << (num - 1)):
+                    return False
+        return True
+
+    # 1.2 checkpoint
+
+    def checkpoint(self):
+        """!@brief Gets a checkpoint to undo the later changes to.
+
+        @return checkpoint The current length of the trail
+        @rtype int
+        """
+        return len(self.trail)
+
+    # 1.3 undo
+
+    def undo(self, checkpoint):
+        """!@brief Undoes the changes recorded after a checkpoint.
+
+        @param checkpoint A checkpoint returned by checkpoint
+        @type checkpoint int
+        """
+        trail, domains = self.trail, self.domains
+        while len(trail) > checkpoint:
+            cell, mask = trail.pop()
+            domains[cell] = mask
+
+    # 1.4 assign
+
+    def assign(self, cell, bit):
+        """!@brief Places a number in a cell by eliminating its other
+        candidates.
+
+        @param cell The cell (row * 9 + col)
+        @type cell int
+        @param bit The bit of the number
+        @type bit int
+        @return False if the propagation leaves a cell or a unit without
+        candidates
+        @rtype bool
+        """
+        if not self.domains[cell] & bit:
+            return False
+        others = self.domains[cell] & ~bit
+        while others:
+            other = others & -others
+            if not self.eliminate(cell, other):
+                return False
+            others ^= other
+        return True
+
+    # 1.5 eliminate
+
+    def eliminate(self, cell, bit):
+        """!@brief Removes a candidate from a cell and propagates the
+        change.
+
+        @param cell The cell (row * 9 + col)
+        @type cell int
+        @param bit The bit of the number
+        @type bit int
+        @return False if the propagation leaves a cell or a unit without
+        candidates
+        @rtype bool
+        """
+        domains = self.domains
+        mask = domains[cell]
+        if not mask & bit:
+            return True
+        if mask == bit:
+            return False
+        self.trail.append((cell, mask))
+        mask ^= bit
+        domains[cell] = mask
+        # Naked single: remove the last candidate of the cell from its peers
+        if not mask & (mask - 1):
+            for peer in self._peers[cell]:
+                if not self.eliminate(peer, mask):
+                    return False
+        # Hidden single: place the number in the last cell of a unit left
+        # for it
+        for unit in self._cell_units[cell]:
+            places = [
+                other for other in self._units[unit] if domains[other] & bit
+            ]
+            if not places:
+                return False
+            if len(places) == 1 and domains[places[0]] != bit:
+                if not self.assign(places[0], bit):
+                    return False
+        return True
+
+    # 1.6 candidates
+
+    def candidates(self, cell):
+        """!@brief Gets the candidate numbers of a cell in ascending order.
+
+        @param cell The cell (row * 9 + col)
+        @type cell int
+        @return The candidate numbers
+        @rtype list
+        """
+        mask = self.domains[cell]
+        return [num for num in range(1, 10) if mask >> (num - 1) & 1]
+
+    # 1.7 to_array
+
+    def to_array(self):
+        """!@brief Gets the sudoku array (list of lists) of the placed
+        numbers (0 for cells with several candidates)."""
+        return [
+            [
+                mask.bit_length() if not mask & (mask - 1) else 0
+                for mask in self.domains[row * 9 : row * 9 + 9]
+            ]
+            for row in range(9)
+        ]
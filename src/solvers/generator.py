@@ -0,0 +1,332 @@
+import os
+import random
+import multiprocessing
+from processors.topology import CELL_UNITS, PEERS
+
+# flake8: noqa F401
+import typing
+
+# === MAIN FUNCTIONS ==========================================================
+"""!@file generator.py
+@brief Module containing tools to generate sudoku puzzles with a unique
+solution.
+
+@details This script generates random complete sudoku grids with a randomized
+bitmask backtracking solver (most constrained cell first) and then removes
+clues in random order as long as the solution stays unique, until a target
+number of clues (or difficulty tier) is reached. Batches of sudokus can be
+generated in parallel across processes; the result only depends on the seed,
+not on the number of processes.
+
+The difficulty tiers are defined by the number of clues, following the
+recommended solver table of the README (easy ~45, medium ~35, hard ~25).
+Removing clues greedily rarely gets below ~22 clues, so the extreme tier
+targets 22 clues and keeps the sudoku with the fewest clues found within the
+attempts if the target is not reached.
+
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Target number of clues per difficulty tier
+TIERS = {"easy": 45, "medium": 35, "hard": 25, "extreme": 22}
+
+# Digits and number of digits in each 9-bit candidate mask
+_MASK_DIGITS = tuple(
+    tuple(d for d in range(1, 10) if mask >> (d - 1) & 1)
+    for mask in range(512)
+)
+_MASK_SIZE = tuple(len(digits) for digits in _MASK_DIGITS)
+
+# 1. count_solutions
+
+
+def count_solutions(sudoku, limit=2):
+    """!@brief Counts the solutions of a sudoku, up to a limit.
+
+    @details Uses a bitmask backtracking solver that always branches on the
+    empty cell with the fewest candidates. With the default limit of 2 this
+    is a uniqueness check: 0 (unsolvable), 1 (unique) or 2 (several
+    solutions).
+
+    @param sudoku The sudoku array (list of lists) or its 81 cells
+    @type sudoku list
+    @param limit Stop counting once this number of solutions is found
+    @type limit int
+    @return count The number of solutions found (at most limit)
+    @rtype int
+    """
+    return _search(_flatten(sudoku), limit)[0]
+
+
+# 2. generate_solution
+
+
+def generate_solution(rng=None):
+    """!@brief Generates a random complete sudoku grid.
+
+    @param rng Optional random number generator (random.Random)
+    @type rng random.Random
+    @return sudoku_solved The complete sudoku array (list of lists)
+    @rtype list of lists
+    """
+    rng = rng or random.Random()
+    return _unflatten(_search([0] * 81, 1, rng)[1])
+
+
+# 3. generate_sudoku
+
+
+def generate_sudoku(target_clues=None, tier=None, rng=None, attempts=3):
+    """!@brief Generates a random sudoku with a unique solution.
+
+    @details Generates a random complete grid and removes clues in random
+    order, keeping a removal only if the sudoku still has a unique solution,
+    until target_clues is reached. If the removal gets stuck above the
+    target, it is retried from a new grid up to attempts times and the
+    sudoku with the fewest clues is returned.
+
+    @param target_clues Optional target number of clues (defaults to the
+    fewest clues the removal reaches)
+    @type target_clues int
+    @param tier Optional difficulty tier (easy, medium, hard, extreme) used
+    if no target_clues is given
+    @type tier str
+    @param rng Optional random number generator (random.Random)
+    @type rng random.Random
+    @param attempts Maximum number of grids to try to reach the target
+    @type attempts int
+    @return sudoku The sudoku array (list of lists)
+    @rtype list of lists
+    @return sudoku_solved Its unique solution (list of lists)
+    @rtype list of lists
+    @raises ValueError If the tier is unknown
+    """
+    rng = rng or random.Random()
+    if target_clues is None and tier is not None:
+        if tier not in TIERS:
+            raise ValueError(
+                f"Unknown tier '{tier}'. Choose one of: {', '.join(TIERS)}.\n"
+            )
+        target_clues = TIERS[tier]
+    target_clues = target_clues or 0
+    # Without a target the first minimal sudoku is as good as any other
+    attempts = max(1, attempts) if target_clues else 1
+    best = None
+    for _ in range(attempts):
+        solution = _search([0] * 81, 1, rng)[1]
+        cells = solution[:]
+        clues = 81
+        order = list(range(81))
+        rng.shuffle(order)
+        for i in order:
+            if clues <= target_clues:
+                break
+            if _is_removal_unique(cells, i):
+                cells[i] = 0
+                clues -= 1
+        if best is None or clues < best[0]:
+            best = (clues, cells, solution)
+        if clues <= target_clues:
+            break
+    return _unflatten(best[1]), _unflatten(best[2])
+
+
+# 4. generate_sudokus
+
+
+def generate_sudokus(
+    count,
+    target_clues=None,
+    tier=None,
+    seed=None,
+    processes=None,
+    chunk_size=32,
+):
+    """!@brief Generates many sudokus in parallel across processes.
+
+    @details The sudokus are generated in chunks; chunk k uses a random
+    number generator seeded from (seed, k), so the sudokus only depend on
+    the seed and not on the number of processes. The chunks are yielded in
+    order as soon as they are ready.
+
+    @param count The number of sudokus to generate
+    @type count int
+    @param target_clues Optional target number of clues
+    @type target_clues int
+    @param tier Optional difficulty tier (easy, medium, hard, extreme)
+    @type tier str
+    @param seed Optional seed (a random seed is drawn if None)
+    @type seed int
+    @param processes Optional number of processes (defaults to the number of
+    CPUs, 1 generates in the calling process)
+    @type processes int
+    @param chunk_size The number of sudokus per task
+    @type chunk_size int
+    @return Generator of (sudoku, sudoku_solved) pairs of sudoku arrays
+    @rtype generator
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    tasks = [
+        (seed, k, min(chunk_size, count - start), target_clues, tier)
+        for k, start in enumerate(range(0, count, chunk_size))
+    ]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield from _generate_chunk(task)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        for chunk in pool.imap(_generate_chunk, tasks):
+            yield from chunk
+
+
+# === HELPER FUNCTIONS ========================================================
+
+# 1.1 _search
+
+
+def _search(cells, limit, rng=None):
+    """!@brief Bitmask backtracking search with most-constrained-cell
+    branching.
+
+    @param cells The 81 cells of the sudoku (0 for empty cells)
+    @type cells list
+    @param limit Stop once this number of solutions is found
+    @type limit int
+    @param rng Optional random number generator to shuffle the digits tried
+    @type rng random.Random
+    @return count The number of solutions found (at most limit)
+    @rtype int
+    @return first_solution The 81 cells of the first solution, or None
+    @rtype list or None
+    """
+    cells = list(cells)
+    used = [0] * 27  # digits used in each row, column and box
+    empties = []
+    for i, num in enumerate(cells):
+        if not num:
+            empties.append(i)
+            continue
+        bit = 1 << (num - 1)
+        r, c, b = CELL_UNITS[i]
+        if (used[r] | used[c] | used[b]) & bit:
+            return 0, None  # givens already break the rules
+        used[r] |= bit
+        used[c] |= bit
+        used[b] |= bit
+    n = len(empties)
+    result = [0, None]
+
+    def search(depth):
+        if depth == n:
+            result[0] += 1
+            if result[1] is None:
+                result[1] = cells[:]
+            return result[0] >= limit
+        # Branch on the empty cell with the fewest candidates
+        best_k, best_mask, best_size = depth, 0, 10
+        for k in range(depth, n):
+            r, c, b = CELL_UNITS[empties[k]]
+            mask = ~(used[r] | used[c] | used[b]) & 0x1FF
+            size = _MASK_SIZE[mask]
+            if size < best_size:
+                best_k, best_mask, best_size = k, mask, size
+                if size <= 1:
+                    break
+        if not best_size:
+            return False
+        empties[depth], empties[best_k] = empties[best_k], empties[depth]
+        i = empties[depth]
+        r, c, b = CELL_UNITS[i]
+        digits = _MASK_DIGITS[best_mask]
+        if rng is not None:
+            digits = list(digits)
+            rng.shuffle(digits)
+        for num in digits:
+            bit = 1 << (num - 1)
+            used[r] |= bit
+            used[c] |= bit
+            used[b] |= bit
+            cells[i] = num
+            if search(depth + 1):
+                return True
+            used[r] ^= bit
+            used[c] ^= bit
+            used[b] ^= bit
+        cells[i] = 0
+        return False
+
+    search(0)
+    return result[0], result[1]
+
+
+# 3.1 _is_removal_unique
+
+
+def _is_removal_unique(cells, i):
+    """!@brief Checks if removing a clue keeps the solution unique.
+
+    @details The sudoku has a known solution with cells[i] as the value of
+    cell i, so it stays unique without the clue if and only if no other
+    candidate digit of cell i leads to a solution. Each of these checks
+    stops at the first solution, which is much cheaper than counting the
+    solutions of the reduced sudoku up to 2.
+
+    @param cells The 81 cells of a sudoku with a unique solution
+    @type cells list
+    @param i The cell of the clue to remove
+    @type i int
+    @return True if the sudoku without the clue has a unique solution
+    @rtype bool
+    """
+    value = cells[i]
+    cells[i] = 0
+    used = 0
+    for j in PEERS[i]:
+        if cells[j]:
+            used |= 1 << (cells[j] - 1)
+    unique = True
+    for num in _MASK_DIGITS[~used & 0x1FF]:
+        if num != value:
+            cells[i] = num
+            if _search(cells, 1)[0]:
+                unique = False
+                break
+    cells[i] = value
+    return unique
+
+
+# 1.2 _flatten
+
+
+def _flatten(sudoku):
+    """!@brief Returns the 81 cells of a sudoku array (or a copy of the
+    cells)."""
+    if len(sudoku) == 9:
+        return [num for row in sudoku for num in row]
+    return list(sudoku)
+
+
+# 1.3 _unflatten
+
+
+def _unflatten(cells):
+    """!@brief Returns the sudoku array (list of lists) of 81 cells."""
+    return [cells[i : i + 9] for i in range(0, 81, 9)]
+
+
+# 4.1 _generate_chunk
+
+
+def _generate_chunk(task):
+    """!@brief Generates one chunk of sudokus (runs in a worker process).
+
+    @param task The (seed, chunk index, size, target_clues, tier) of the chunk
+    @type task tuple
+    @return The (sudoku, sudoku_solved) pairs of the chunk
+    @rtype list
+    """
+    seed, chunk, size, target_clues, tier = task
+    rng = random.Random(f"{seed}-{chunk}")
+    return [generate_sudoku(target_clues, tier, rng) for _ in range(size)]
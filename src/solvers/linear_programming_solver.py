@@ -4,9 +4,14 @@ from pulp import (
     lpSum,
     value,
     LpInteger,
+    LpContinuous,
     LpMinimize,
+    LpStatusOptimal,
+    LpStatusInfeasible,
     GLPK,
 )
+from processors import checkers
+from processors.topology import STANDARD
 
 # === MAIN FUNCTIONS ==========================================================
 """!@file linear_programming_solver.py
@@ -14,13 +19,22 @@ from pulp import (
 
 @details  This script takes a sudoku array (list of lists) as an input and
 returns a solved sudoku array (list of lists) using linear programming.
+Batches of sudokus can be solved with one model per block of sudokus, so the
+fixed cost of building the model, writing it and starting the solver is
+paid once per block instead of once per sudoku. The LP relaxation of a sudoku
+is often already integral, so the relaxation can be solved first and the
+integer problem (branch and bound) is only solved if it is not; the 'lpr'
+solver (solve_sudoku_lpr) and the relaxation option of the batch solver do
+this and count how often each path is taken.
 @author Created by Steven Dillmann 17/12/2023
 """
 
 # 1. solve_sudoku_lp
 
 
-def solve_sudoku_lp(sudoku):
+def solve_sudoku_lp(
+    sudoku, topology=STANDARD, relaxation=False, fix_integral=False, stats=None
+):
     """!@brief This is the main function to solve a sudoku using the linear
     programming algorithm.
 
@@ -35,12 +49,28 @@ def solve_sudoku_lp(sudoku):
 
     @param sudoku The sudoku array (list of lists) to solve
     @type sudoku list of lists
+    @param topology Optional topology of the sudoku (e.g. X-sudoku or jigsaw
+    regions), defaults to the standard sudoku
+    @type topology Topology
+    @param relaxation Optional argument to solve the LP relaxation
+    (continuous variables) first and only solve the integer problem if the
+    relaxation is not an integral, solved sudoku
+    @type relaxation bool
+    @param fix_integral Optional argument to fix the cells that are integral
+    in the relaxation before solving the integer problem
+    @type fix_integral bool
+    @param stats Optional dictionary counting the path taken: relaxation
+    (relaxation accepted), mip_fixed (integer problem with fixed cells),
+    mip (integer problem) or infeasible (relaxation infeasible). Pass the
+    same dictionary for several sudokus to add up the counts.
+    @type stats dict
     @return sudoku_solved The solved sudoku array (list of lists) to solve
     @rtype list of listss
     @see define_constraints Function to define the constraints for the
     linear programming problem
     @see extract_sudoku Function to extract the solved sudoku numbers
-    @see is_sudoku_solved Function to check if the sudoku is solved
+    @see checkers.is_sudoku_solved Function to check if the sudoku is solved
+    @see solve_relaxation_first Function to solve the relaxation first
 
     References:
     - Robert J Vanderbei et al. Linear programming. Springer, 2020.
@@ -82,20 +112,31 @@ def solve_sudoku_lp(sudoku):
         for num in range(1, 10)
     ]
     # Create a decision variable: number k exists in cell (i,j) or not (0 or 1)
-    decision = LpVariable.dicts("Cell", cells, 0, 1, LpInteger)
+    category = LpContinuous if relaxation else LpInteger
+    decision = LpVariable.dicts("Cell", cells, 0, 1, category)
     # Fix initial sudoku numbers
     for row in range(9):
         for col in range(9):
             if sudoku[row][col] != 0:
                 sudoku_lp += decision[(row, col, sudoku[row][col])] == 1
     # Add cell, row, column and subgrid constraints
-    define_constraints(sudoku_lp, decision)
-    # Solve the linear programming problem
-    sudoku_lp.solve(solver=GLPK(msg=0))
-    # Extract the solved sudoku numbers from the decision variables
-    sudoku_solved = extract_sudoku(decision)
+    define_constraints(sudoku_lp, decision, topology)
+    if relaxation:
+        # Solve the relaxation and fall back to the integer problem
+        sudoku_solved, path = solve_relaxation_first(
+            sudoku_lp, decision, topology, fix_integral
+        )
+    else:
+        # Solve the linear programming problem
+        sudoku_lp.solve(solver=GLPK(msg=0))
+        # Extract the solved sudoku numbers from the decision variables
+        sudoku_solved, path = extract_sudoku(decision), "mip"
+    if stats is not None:
+        stats[path] = stats.get(path, 0) + 1
     # Return the solved sudoku if the sudoku is valid (error trapping)
-    if is_sudoku_solved(sudoku_solved):
+    if sudoku_solved is not None and checkers.is_sudoku_solved(
+        sudoku_solved, topology, verbose=False
+    ):
         return sudoku_solved
     else:
         # Print a warning if sudoku is invalid/unsolveable
@@ -103,12 +144,104 @@ def solve_sudoku_lp(sudoku):
         return None
 
 
+# Number of sudokus per model in solve_sudoku_lp_batch
+BATCH_BLOCK_SIZE = 16
+
+# 2. solve_sudoku_lp_batch
+
+
+def solve_sudoku_lp_batch(
+    sudokus,
+    block_size=BATCH_BLOCK_SIZE,
+    topology=STANDARD,
+    relaxation=False,
+    stats=None,
+):
+    """!@brief Solves many sudokus with one linear programming problem per
+    block of sudokus.
+
+    @details The sudokus are split into blocks of block_size sudokus. Each
+    block is solved as a single problem with a disjoint set of decision
+    variables and constraints per sudoku (a block-diagonal problem), so the
+    solver is only invoked once per block. Because one unsolveable sudoku
+    makes the whole block infeasible, a block that is not solved falls back
+    to solving its sudokus one by one with solve_sudoku_lp. Sudokus whose
+    givens already break the rules are not added to a block. With
+    relaxation, the relaxation of each block is solved first and only the
+    sudokus whose relaxation is not an integral, solved sudoku are solved
+    again as an integer block.
+
+    @param sudokus The sudoku arrays (list of lists) to solve
+    @type sudokus iterable
+    @param block_size Optional number of sudokus per problem
+    @type block_size int
+    @param topology Optional topology of the sudokus, defaults to the
+    standard sudoku
+    @type topology Topology
+    @param relaxation Optional argument to solve the LP relaxation of each
+    block first
+    @type relaxation bool
+    @param stats Optional dictionary counting the path taken by each sudoku
+    (see solve_sudoku_lp), added up over all blocks
+    @type stats dict
+    @return sudokus_solved The solved sudoku arrays (None for unsolveable
+    sudokus), in the order of the input
+    @rtype list
+    @see solve_block Function to solve one block of sudokus
+
+    Example:
+    >>> solve_sudoku_lp_batch([sudoku_1, sudoku_2], block_size=8)
+    [[[3, 8, 2, ...], ...], [[1, 5, 4, ...], ...]]
+    """
+    sudokus_solved = []
+    block = []
+    for sudoku in sudokus:
+        block.append(sudoku)
+        if len(block) == block_size:
+            sudokus_solved.extend(
+                solve_block(block, topology, relaxation, stats)
+            )
+            block = []
+    if block:
+        sudokus_solved.extend(solve_block(block, topology, relaxation, stats))
+    return sudokus_solved
+
+
+# 3. solve_sudoku_lpr
+
+
+def solve_sudoku_lpr(sudoku, topology=STANDARD, fix_integral=True, stats=None):
+    """!@brief Solves a sudoku with linear programming, relaxation first.
+
+    @details Registered as the 'lpr' solver, so that the relaxation first
+    path can be chosen on the command line, in solve_batch.py and in the
+    solve server, whose results and metrics then count the path taken by
+    each solve.
+
+    @param sudoku The sudoku array (list of lists) to solve
+    @type sudoku list of lists
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
+    @param fix_integral Optional argument to fix the cells that are integral
+    in the relaxation before solving the integer problem
+    @type fix_integral bool
+    @param stats Optional dictionary counting the path taken (see
+    solve_sudoku_lp)
+    @type stats dict
+    @return sudoku_solved The solved sudoku array (list of lists)
+    @rtype list of lists
+    @see solve_sudoku_lp Function solving the sudoku
+    """
+    return solve_sudoku_lp(sudoku, topology, True, fix_integral, stats)
+
+
 # === HELPER FUNCTIONS ========================================================
 
 # 1.1 define_constraints
 
 
-def define_constraints(sudoku_lp, decision):
+def define_constraints(sudoku_lp, decision, topology=STANDARD):
     """!@brief Adds constraints to the linear programming problem to ensure
     that each cell abides by the sudoku rules.
 
@@ -124,6 +257,9 @@ def define_constraints(sudoku_lp, decision):
     @param decision The decision variable for each possible sudoku number
     in each cell (LpVariable)
     @type decision LpVariable
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
     @return None
     @rtype None
     """
@@ -133,32 +269,13 @@ def define_constraints(sudoku_lp, decision):
             sudoku_lp += (
                 lpSum([decision[(row, col, num)] for num in range(1, 10)]) == 1
             )
-    # Row constraint: rows must contain unique sudoku numbers
-    for row in range(9):
-        for num in range(1, 10):
-            sudoku_lp += (
-                lpSum([decision[(row, col, num)] for col in range(9)]) == 1
-            )
-    # Column constraint: columns must contain unique sudoku numbers
-    for col in range(9):
+    # Unit constraints: rows, columns and subgrids (and any extra units of
+    # the topology) must contain unique sudoku numbers
+    for unit in topology.unit_coords:
         for num in range(1, 10):
             sudoku_lp += (
-                lpSum([decision[(row, col, num)] for row in range(9)]) == 1
+                lpSum([decision[(row, col, num)] for row, col in unit]) == 1
             )
-    # Subgrid constraint: subgrids must contain unique sudoku numbers
-    for a in range(0, 9, 3):
-        for b in range(0, 9, 3):
-            for num in range(1, 10):
-                sudoku_lp += (
-                    lpSum(
-                        [
-                            decision[(row, col, num)]
-                            for row in range(a, a + 3)
-                            for col in range(b, b + 3)
-                        ]
-                    )
-                    == 1
-                )
 
 
 # 1.2 extract_sudoku
@@ -193,36 +310,218 @@ def extract_sudoku(decision):
     return sudoku_solved
 
 
-# 1.3 is_sudoku_solved
+# 1.3 solve_relaxation_first
 
 
-def is_sudoku_solved(sudoku):
-    """!@brief Checks if the sudoku array (list of lists) is solved.
+def solve_relaxation_first(sudoku_lp, decision, topology, fix_integral):
+    """!@brief Solves the LP relaxation of a sudoku and falls back to the
+    integer problem if needed.
 
     @details This is a helper function for the linear programming
-    algorithm. It takes a sudoku array (list of lists) as an input and
-    returns a boolean value indicating if the sudoku array is solved. The
-    function checks if each row and column contains unique numbers and if
-    each subgrid contains unique numbers.
+    algorithm. It solves the problem with continuous decision variables. If
+    every variable is integral and the rounded sudoku is solved, the
+    sudoku is returned without branch and bound. If the relaxation is
+    infeasible, so is the integer problem. Otherwise the variables are made
+    integer and the problem is solved again, first with the cells that are
+    integral in the relaxation fixed (if fix_integral) and, if that does not
+    solve the sudoku, without them.
+
+    @param sudoku_lp The linear programming problem with continuous
+    decision variables (LpProblem)
+    @type sudoku_lp LpProblem
+    @param decision The decision variable for each possible sudoku number
+    in each cell (LpVariable)
+    @type decision LpVariable
+    @param topology The topology of the sudoku
+    @type topology Topology
+    @param fix_integral Whether to fix the integral cells of the relaxation
+    @type fix_integral bool
+    @return sudoku_solved The solved sudoku array (list of lists), or None
+    if the relaxation is infeasible
+    @rtype list of lists or None
+    @return path The path taken (relaxation, mip_fixed, mip or infeasible)
+    @rtype str
+    """
+    sudoku_lp.solve(solver=GLPK(msg=0))
+    if sudoku_lp.status == LpStatusInfeasible:
+        return None, "infeasible"
+    rounded, sudoku_solved = round_relaxation(decision, topology)
+    if sudoku_lp.status == LpStatusOptimal and sudoku_solved is not None:
+        return sudoku_solved, "relaxation"
+    # Fall back to the integer problem
+    for variable in decision.values():
+        variable.cat = LpInteger
+    if fix_integral:
+        fixed = []
+        for row in range(9):
+            for col in range(9):
+                cell = [rounded[(row, col, num)] for num in range(1, 10)]
+                if None not in cell and cell.count(1) == 1:
+                    name = f"Fix_{row}_{col}"
+                    num = cell.index(1) + 1
+                    sudoku_lp += decision[(row, col, num)] == 1, name
+                    fixed.append(name)
+        sudoku_lp.solve(solver=GLPK(msg=0))
+        sudoku_solved = extract_sudoku(decision)
+        if checkers.is_sudoku_solved(sudoku_solved, topology, verbose=False):
+            return sudoku_solved, "mip_fixed"
+        # The fixed cells may exclude every solution: drop them
+        for name in fixed:
+            del sudoku_lp.constraints[name]
+    sudoku_lp.solve(solver=GLPK(msg=0))
+    return extract_sudoku(decision), "mip"
+
+
+# 1.4 round_relaxation
+
+
+def round_relaxation(decision, topology=STANDARD):
+    """!@brief Rounds the decision variables of a solved LP relaxation.
+
+    @param decision The decision variable for each possible sudoku number
+    in each cell (LpVariable)
+    @type decision LpVariable
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
+    @return rounded The rounded value of each variable (None if fractional)
+    @rtype dict
+    @return sudoku_solved The rounded sudoku array if every variable is
+    integral and the sudoku is solved, else None
+    @rtype list of lists or None
+    """
+    # Round the relaxed values that are integral (None if fractional)
+    rounded = {}
+    for key, variable in decision.items():
+        relaxed = value(variable)
+        if relaxed is not None and abs(relaxed - round(relaxed)) <= 1e-6:
+            rounded[key] = round(relaxed)
+        else:
+            rounded[key] = None
+    if None in rounded.values():
+        return rounded, None
+    sudoku_solved = [[0 for _ in range(9)] for _ in range(9)]
+    for (row, col, num), relaxed in rounded.items():
+        if relaxed == 1:
+            sudoku_solved[row][col] = num
+    if not checkers.is_sudoku_solved(sudoku_solved, topology, verbose=False):
+        return rounded, None
+    return rounded, sudoku_solved
+
+
+# 2.1 solve_block
+
+
+def solve_block(sudokus, topology=STANDARD, relaxation=False, stats=None):
+    """!@brief Solves a block of sudokus as one linear programming problem.
+
+    @details This is a helper function for the batch linear programming
+    algorithm. Each sudoku gets its own decision variables (named
+    Cell_<k>_...) and constraints; the problem is solved once and the
+    solution is split back into one sudoku per block entry. If the problem
+    is not solved optimally or a sudoku is not solved, the block falls back
+    to solve_sudoku_lp for each sudoku. With relaxation, the relaxation of
+    the block is solved and the sudokus whose relaxation is not an
+    integral, solved sudoku are solved again as an integer block.
+
+    @param sudokus The sudoku arrays (list of lists) of the block
+    @type sudokus list
+    @param topology Optional topology of the sudokus, defaults to the
+    standard sudoku
+    @type topology Topology
+    @param relaxation Optional argument to solve the relaxation first
+    @type relaxation bool
+    @param stats Optional dictionary counting the path taken by each sudoku
+    @type stats dict
+    @return sudokus_solved The solved sudoku arrays (None for unsolveable
+    sudokus)
+    @rtype list
+    """
+    sudokus_solved = [None] * len(sudokus)
+    # Givens that break the rules would make the whole block infeasible
+    block = []
+    for k, sudoku in enumerate(sudokus):
+        if has_duplicate_givens(sudoku, topology):
+            # Print a warning if sudoku is invalid
+            print("Unsolveable Sudoku. Returned 'None'.")
+        else:
+            block.append(k)
+    if len(block) == 1:
+        sudokus_solved[block[0]] = solve_sudoku_lp(
+            sudokus[block[0]], topology, relaxation, stats=stats
+        )
+    if len(block) <= 1:
+        return sudokus_solved
+    # Create one linear programming problem for the whole block
+    sudoku_lp = LpProblem("Sudoku_LP_Batch_Problem", LpMinimize)
+    cells = [
+        (row, col, num)
+        for row in range(9)
+        for col in range(9)
+        for num in range(1, 10)
+    ]
+    category = LpContinuous if relaxation else LpInteger
+    decisions = {}
+    for k in block:
+        sudoku = sudokus[k]
+        decision = LpVariable.dicts(f"Cell_{k}", cells, 0, 1, category)
+        for row in range(9):
+            for col in range(9):
+                if sudoku[row][col] != 0:
+                    sudoku_lp += decision[(row, col, sudoku[row][col])] == 1
+        define_constraints(sudoku_lp, decision, topology)
+        decisions[k] = decision
+    # Solve all sudokus of the block with a single solver call
+    sudoku_lp.solve(solver=GLPK(msg=0))
+    if relaxation and sudoku_lp.status == LpStatusOptimal:
+        fractional = []
+        for k in block:
+            _, sudokus_solved[k] = round_relaxation(decisions[k], topology)
+            if sudokus_solved[k] is None:
+                fractional.append(k)
+            elif stats is not None:
+                stats["relaxation"] = stats.get("relaxation", 0) + 1
+        # Solve the sudokus with a fractional relaxation as an integer block
+        solved = solve_block(
+            [sudokus[k] for k in fractional], topology, stats=stats
+        )
+        for k, sudoku_solved in zip(fractional, solved):
+            sudokus_solved[k] = sudoku_solved
+        return sudokus_solved
+    if not relaxation and sudoku_lp.status == LpStatusOptimal:
+        for k in block:
+            sudokus_solved[k] = extract_sudoku(decisions[k])
+        solved, _ = checkers.is_sudoku_solved_batch(
+            [sudokus_solved[k] for k in block], topology
+        )
+        if solved.all():
+            if stats is not None:
+                stats["mip"] = stats.get("mip", 0) + len(block)
+            return sudokus_solved
+    # Fall back to solving the sudokus of the block one by one
+    for k in block:
+        sudokus_solved[k] = solve_sudoku_lp(
+            sudokus[k], topology, relaxation, stats=stats
+        )
+    return sudokus_solved
+
+
+# 2.2 has_duplicate_givens
+
+
+def has_duplicate_givens(sudoku, topology=STANDARD):
+    """!@brief Checks if the givens of a sudoku already break the rules.
 
     @param sudoku The sudoku array (list of lists)
     @type sudoku list of lists
-    @return A boolean value indicating if the sudoku is solved
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
+    @return True if a number appears twice in a row, column or subgrid
     @rtype bool
     """
-    # Check rows and columns for unique numbers
-    for i in range(9):
-        row_numbers = set(sudoku[i])
-        col_numbers = set(sudoku[j][i] for j in range(9))
-        if len(row_numbers) != 9 or len(col_numbers) != 9:
-            return False
-    # Check subgrids for unique numbers
-    for a in range(0, 9, 3):
-        for b in range(0, 9, 3):
-            subgrid_values = set()
-            for i in range(3):
-                for j in range(3):
-                    subgrid_values.add(sudoku[a + i][b + j])
-            if len(subgrid_values) != 9:
-                return False
-    return True
+    for unit in topology.unit_coords:
+        numbers = [sudoku[row][col] for row, col in unit if sudoku[row][col]]
+        if len(numbers) != len(set(numbers)):
+            return True
+    return False
@@ -0,0 +1,244 @@
+import os
+import multiprocessing
+from .constraint_satisfaction_solver import get_valid_numbers
+
+# flake8: noqa F401
+import typing
+
+# === MAIN FUNCTIONS ==========================================================
+"""!@file parallel_solver.py
+@brief Module containing tools to solve a single sudoku with the constraint
+satisfaction algorithm in parallel across processes.
+
+@details This script splits the search tree of one sudoku into a frontier of
+subproblems (partial assignments) by expanding the search tree of the
+constraint satisfaction algorithm level by level until there are enough
+subproblems to keep all processes busy. The subproblems are then solved with
+the constraint satisfaction algorithm by a process pool that hands them out
+one at a time, so a process that finishes a small subtree immediately takes
+the next one instead of waiting for a static share of the work. The
+subproblems are handed out in the order in which the sequential solver would
+search them, so the first processes work on the subtrees that the
+sequential solver would have reached first. When solving,
+the pool is terminated as soon as the first solution comes back; when
+counting, the counts of all subtrees are added up.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Number of subproblems per process in the frontier
+FRONTIER_PER_PROCESS = 16
+
+# 1. solve_sudoku_pcs
+
+
+def solve_sudoku_pcs(sudoku, processes=None, stats=None):
+    """!@brief This is the main function to solve a sudoku using the
+    constraint satisfaction algorithm in parallel.
+
+    @details It takes a sudoku array (list of lists) as an input and
+    returns a solved sudoku array (list of lists). The search tree is split
+    into a frontier of subproblems that are solved by a process pool; all
+    remaining subproblems are cancelled once a solution is found. For a
+    sudoku with several solutions any one of them may be returned.
+
+    @param sudoku The sudoku array (list of lists) to solve
+    @type sudoku list of lists
+    @param processes Optional number of processes (defaults to the number of
+    CPUs, 1 solves the subproblems in the calling process, as does a call
+    from a worker process such as a pool or executor worker)
+    @type processes int
+    @param stats Optional dictionary that is updated with the number of
+    subproblems and processes
+    @type stats dict
+    @return sudoku_solved The solved sudoku array (list of lists)
+    @rtype list of lists
+    @see split_search_tree Function to split the search tree
+    @see solve_sudoku_cs Sequential constraint satisfaction solver
+
+    Example:
+    >>> solve_sudoku_pcs(sudoku, processes=4)
+    [
+        [3, 8, 2, 6, 1, 9, 4, 7, 5],
+        ...
+    ]
+    """
+    count, sudoku_solved = _run_subproblems(sudoku, 1, processes, stats)
+    if not count:
+        # Print a warning if sudoku is invalid/unsolveable
+        print("Unsolveable Sudoku. Returned 'None'.")
+        return None
+    return sudoku_solved
+
+
+# 2. count_solutions_pcs
+
+
+def count_solutions_pcs(sudoku, limit=None, processes=None):
+    """!@brief Counts the solutions of a sudoku in parallel.
+
+    @param sudoku The sudoku array (list of lists)
+    @type sudoku list of lists
+    @param limit Optional number of solutions after which counting stops
+    (the result is then at least limit); None counts all solutions
+    @type limit int
+    @param processes Optional number of processes (defaults to the number of
+    CPUs)
+    @type processes int
+    @return count The number of solutions
+    @rtype int
+    """
+    return _run_subproblems(sudoku, limit, processes)[0]
+
+
+# 3. split_search_tree
+
+
+def split_search_tree(sudoku, size):
+    """!@brief Splits the search tree of a sudoku into subproblems.
+
+    @details Branches on the same cell as solve_sudoku_cs (the first empty
+    cell, row by row) and expands the search tree one level at a time until
+    there are at least size subproblems. Subproblems without valid numbers
+    for their cell are dropped and complete ones are returned as solutions.
+    Because whole levels are expanded, the subproblems are in the order in
+    which solve_sudoku_cs visits them, and together with the solutions they
+    cover every solution of the sudoku exactly once.
+
+    @param sudoku The sudoku array (list of lists)
+    @type sudoku list of lists
+    @param size The minimum number of subproblems to create
+    @type size int
+    @return subproblems The sudoku arrays of the subproblems
+    @rtype list of lists of lists
+    @return solutions The solutions found while splitting
+    @rtype list of lists of lists
+    """
+    empty_cells = [
+        (row, col)
+        for row in range(9)
+        for col in range(9)
+        if not sudoku[row][col]
+    ]
+    frontier = [[row[:] for row in sudoku]]
+    solutions = []
+    for row, col in empty_cells:
+        if not frontier or len(frontier) >= size:
+            break
+        level = []
+        for subproblem in frontier:
+            for num in get_valid_numbers(subproblem, row, col):
+                child = [r[:] for r in subproblem]
+                child[row][col] = num
+                level.append(child)
+        frontier = level
+    else:
+        # Every empty cell is filled: the subproblems are solutions
+        solutions, frontier = frontier, []
+    return frontier, solutions
+
+
+# === HELPER FUNCTIONS ========================================================
+
+# 1.1 _run_subproblems
+
+
+def _run_subproblems(sudoku, limit, processes, stats=None):
+    """!@brief Solves or counts the subproblems of a sudoku in a process pool.
+
+    @param sudoku The sudoku array (list of lists)
+    @type sudoku list of lists
+    @param limit Stop once this number of solutions is found (None for all)
+    @type limit int
+    @param processes Optional number of processes
+    @type processes int
+    @param stats Optional dictionary for the number of subproblems and
+    processes
+    @type stats dict
+    @return count The number of solutions found
+    @rtype int
+    @return first_solution The first solution found, or None
+    @rtype list of lists or None
+    """
+    processes = processes or os.cpu_count() or 1
+    if multiprocessing.parent_process() is not None:
+        # Inside a worker process (e.g. of solve_batch or the solve server)
+        # the other workers already use the CPUs, and daemonic workers
+        # cannot have children: search the subproblems in this process
+        processes = 1
+    subproblems, solutions = split_search_tree(
+        sudoku, processes * FRONTIER_PER_PROCESS
+    )
+    count = len(solutions)
+    first_solution = solutions[0] if solutions else None
+    tasks = [(subproblem, limit) for subproblem in subproblems]
+    if stats is not None:
+        stats.update(subproblems=len(tasks), processes=processes)
+    if limit is not None and count >= limit:
+        return count, first_solution
+    if processes == 1 or len(tasks) <= 1:
+        results = map(_solve_subproblem, tasks)
+        return _collect(results, count, first_solution, limit)
+    # Leaving the with block terminates the pool, which cancels the
+    # subproblems that are still queued or running
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.imap_unordered(_solve_subproblem, tasks, chunksize=1)
+        return _collect(results, count, first_solution, limit)
+
+
+# 1.2 _collect
+
+
+def _collect(results, count, first_solution, limit):
+    """!@brief Adds up subproblem results until the limit is reached."""
+    for sub_count, sub_solution in results:
+        count += sub_count
+        if first_solution is None:
+            first_solution = sub_solution
+        if limit is not None and count >= limit:
+            break
+    return count, first_solution
+
+
+# 1.3 _solve_subproblem
+
+
+def _solve_subproblem(task):
+    """!@brief Searches the subtree of one subproblem (runs in a worker
+    process).
+
+    @details Uses the same search as solve_sudoku_cs (first empty cell row
+    by row, valid numbers from get_valid_numbers) but keeps going after a
+    solution until limit solutions are found.
+
+    @param task The (sudoku array, limit) of the subproblem
+    @type task tuple
+    @return count The number of solutions found in the subtree
+    @rtype int
+    @return first_solution The first solution found, or None
+    @rtype list of lists or None
+    """
+    sudoku, limit = task
+    empty_cells = [
+        (row, col)
+        for row in range(9)
+        for col in range(9)
+        if not sudoku[row][col]
+    ]
+    result = [0, None]
+
+    def solve(k):
+        if k == len(empty_cells):
+            result[0] += 1
+            if result[1] is None:
+                result[1] = [row[:] for row in sudoku]
+            return limit is not None and result[0] >= limit
+        row, col = empty_cells[k]
+        for num in get_valid_numbers(sudoku, row, col):
+            sudoku[row][col] = num
+            if solve(k + 1):
+                return True
+        sudoku[row][col] = 0
+        return False
+
+    solve(0)
+    return result[0], result[1]
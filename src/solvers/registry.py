@@ -0,0 +1,110 @@
+import importlib
+
+# flake8: noqa F401
+import typing
+
+# === MAIN FUNCTIONS ==========================================================
+"""!@file registry.py
+@brief Module containing the registry of the available sudoku solvers.
+
+@details This script maps the solver names used on the command line (bt, cs,
+lp, lpr, sat, pcs, rcs) to the solver modules and functions. A solver module
+is only imported the first time the solver is requested, so e.g. solving
+with the backtracking solver never imports pulp for the linear programming
+solver.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Solver name: (module in the solvers package, function, description)
+SOLVERS = {
+    "bt": ("back_tracking_solver", "solve_sudoku_bt", "backtracking"),
+    "cs": (
+        "constraint_satisfaction_solver",
+        "solve_sudoku_cs",
+        "constraint satisfaction",
+    ),
+    "lp": (
+        "linear_programming_solver",
+        "solve_sudoku_lp",
+        "linear programming",
+    ),
+    "lpr": (
+        "linear_programming_solver",
+        "solve_sudoku_lpr",
+        "linear programming, relaxation first",
+    ),
+    "sat": ("sat_solver", "solve_sudoku_sat", "boolean satisfiability"),
+    "pcs": (
+        "parallel_solver",
+        "solve_sudoku_pcs",
+        "parallel constraint satisfaction",
+    ),
+    "rcs": (
+        "restarts",
+        "solve_sudoku_restarts",
+        "constraint satisfaction with randomized restarts",
+    ),
+}
+# Solver functions that have already been imported
+_loaded_solvers = {}
+
+# 1. get_solver
+
+
+def get_solver(solver):
+    """!@brief Gets the function of a solver, importing its module on first
+    use.
+
+    @param solver The solver name (e.g. bt, cs, lp)
+    @type solver str
+    @return solve_function The solver function taking and returning a sudoku
+    array (list of lists)
+    @rtype function
+    @raises ValueError If the solver is not registered
+    """
+    try:
+        return _loaded_solvers[solver]
+    except KeyError:
+        pass
+    if solver not in SOLVERS:
+        raise ValueError(
+            f"Unknown solver '{solver}'. "
+            f"Choose one of: {', '.join(SOLVERS)}.\n"
+        )
+    module, function, _ = SOLVERS[solver]
+    solve_function = getattr(
+        importlib.import_module("." + module, __package__), function
+    )
+    _loaded_solvers[solver] = solve_function
+    return solve_function
+
+
+# 2. get_solver_description
+
+
+def get_solver_description(solver):
+    """!@brief Gets the description of a solver without importing it.
+
+    @param solver The solver name (e.g. bt, cs, lp)
+    @type solver str
+    @return description The description of the solver algorithm
+    @rtype str
+    @raises ValueError If the solver is not registered
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver '{solver}'.\n")
+    return SOLVERS[solver][2]
+
+
+# 3. is_solver_loaded
+
+
+def is_solver_loaded(solver):
+    """!@brief Checks if the module of a solver has already been imported.
+
+    @param solver The solver name (e.g. bt, cs, lp)
+    @type solver str
+    @return True if the solver has been imported, False otherwise
+    @rtype bool
+    """
+    return solver in _loaded_solvers
@@ -0,0 +1,154 @@
+import random
+import itertools
+from processors.topology import STANDARD
+from . import registry
+from .constraint_satisfaction_solver import NodeLimitReached
+
+# flake8: noqa F401
+import typing
+
+# === MAIN FUNCTIONS ==========================================================
+"""!@file restarts.py
+@brief Module containing randomized restarts of the constraint satisfaction
+solver.
+
+@details The search time of the backtracking solvers on sudokus of the same
+difficulty is heavy-tailed: a bad choice in one of the first cells can cost
+orders of magnitude more nodes than a good one. This script runs the
+constraint satisfaction search with the 'mrv' cell order (fewest valid
+numbers first, ties broken at random), numbers tried in a random order and
+a node limit, and restarts it with new random choices and a larger limit
+whenever the limit is reached. The node limits follow the Luby sequence (1,
+1, 2, 1, 1, 2, 4, 1, ...) or a geometric sequence, multiplied by a unit. The
+random choices of each run are drawn from the seed, so a solve with a fixed
+seed is deterministic.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Node limit schedules of solve_sudoku_restarts
+SCHEDULES = ("luby", "geometric")
+# Node limit of the first run (times the terms of the schedule)
+DEFAULT_UNIT = 5000
+
+# 1. solve_sudoku_restarts
+
+
+def solve_sudoku_restarts(
+    sudoku,
+    schedule="luby",
+    unit=DEFAULT_UNIT,
+    factor=1.5,
+    seed=None,
+    topology=STANDARD,
+    stats=None,
+    **options,
+):
+    """!@brief Solves a sudoku with randomized restarts.
+
+    @details Runs solve_sudoku_cs with randomized cell and number choices
+    and the node limits of the schedule until a run ends within its limit,
+    i.e. finds the solution or proves that there is none.
+
+    @param sudoku The sudoku array (list of lists) to solve
+    @type sudoku list of lists
+    @param schedule Optional node limit schedule: 'luby' (unit times the
+    Luby sequence) or 'geometric' (unit times factor to the power of the run)
+    @type schedule str
+    @param unit Optional node limit of the first run
+    @type unit int
+    @param factor Optional growth factor of the 'geometric' schedule
+    @type factor float
+    @param seed Optional seed of the random orders
+    @type seed int
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
+    @param stats Optional dictionary that is updated with the search
+    statistics of all runs (nodes, backtracks, restarts)
+    @type stats dict
+    @param options Optional further keyword arguments of solve_sudoku_cs
+    (e.g. ordering='lcv')
+    @type options dict
+    @return sudoku_solved The solved sudoku array (list of lists), or None
+    if the sudoku is unsolvable
+    @rtype list of lists
+    @raises ValueError If the schedule or an option is unknown
+    """
+    solve_function = registry.get_solver("cs")
+    options.setdefault("ordering", "random")
+    options.setdefault("cell_order", "mrv")
+    rng = random.Random(seed)
+    totals = {"nodes": 0, "backtracks": 0, "restarts": 0}
+    try:
+        for node_limit in get_node_limits(schedule, unit, factor):
+            run_stats = {}
+            try:
+                return solve_function(
+                    sudoku,
+                    topology=topology,
+                    stats=run_stats,
+                    seed=rng.getrandbits(32),
+                    node_limit=node_limit,
+                    **options,
+                )
+            except NodeLimitReached:
+                totals["restarts"] += 1
+            finally:
+                for key, value in run_stats.items():
+                    totals[key] = totals.get(key, 0) + value
+    finally:
+        if stats is not None:
+            stats.update(totals)
+
+
+# === HELPER FUNCTIONS ========================================================
+
+# 1.1 get_node_limits
+
+
+def get_node_limits(schedule="luby", unit=DEFAULT_UNIT, factor=1.5):
+    """!@brief Generates the node limits of a restart schedule.
+
+    @param schedule The schedule: 'luby' or 'geometric'
+    @type schedule str
+    @param unit The node limit of the first run
+    @type unit int
+    @param factor The growth factor of the 'geometric' schedule
+    @type factor float
+    @return node_limits The (endless) node limits of the runs
+    @rtype generator of int
+    @raises ValueError If the schedule is unknown
+    """
+    if schedule not in SCHEDULES:
+        raise ValueError(
+            f"Unknown schedule '{schedule}'. "
+            f"Choose one of: {', '.join(SCHEDULES)}.\n"
+        )
+    if schedule == "luby":
+        return (unit * luby(i) for i in itertools.count(1))
+    return (max(1, round(unit * factor**i)) for i in itertools.count())
+
+
+# 1.2 luby
+
+
+def luby(i):
+    """!@brief Gets the i-th term of the Luby sequence (1, 1, 2, 1, 1, 2, 4,
+    1, 1, 2, ...).
+
+    References:
+    - Michael Luby, Alistair Sinclair and David Zuckerman. Optimal speedup of
+    Las Vegas algorithms. Information Processing Letters, 47(4):173-180,
+    1993.
+
+    @param i The index of the term (starting at 1)
+    @type i int
+    @return The i-th term
+    @rtype int
+    """
+    while True:
+        # Find k with 2^(k-1) <= i < 2^k
+        k = i.bit_length()
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
@@ -0,0 +1,381 @@
+from itertools import combinations
+from processors.topology import STANDARD
+from .restarts import luby
+
+# flake8: noqa F401
+import typing
+
+# === MAIN FUNCTIONS ==========================================================
+"""!@file sat_solver.py
+@brief Module containing tools to solve a sudoku as a boolean satisfiability
+(SAT) problem.
+
+@details This script takes a sudoku array (list of lists) as an input and
+returns a solved sudoku array (list of lists). The sudoku rules are encoded
+once, at import, as a base CNF over the 729 boolean variables "cell (row, col)
+contains num"; the givens of a puzzle are added as unit clauses. The CNF is
+solved with an in-process conflict-driven clause learning (CDCL) engine with
+two watched literals, first-UIP clause learning, activity-based branching
+with phase saving and Luby restarts. No external solver binary is needed.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+# Number of conflicts per unit of the Luby restart sequence
+RESTART_BASE = 64
+# Decay of the variable activities after each conflict
+ACTIVITY_DECAY = 0.95
+
+
+def _var(row, col, num):
+    """!@brief Variable (1 to 729) of "cell (row, col) contains num"."""
+    return row * 81 + col * 9 + num
+
+
+def _build_base_cnf(topology=STANDARD):
+    """!@brief Builds the CNF of the sudoku rules (without givens).
+
+    @param topology Optional topology of the sudoku, defaults to the
+    standard sudoku
+    @type topology Topology
+    @return clauses The clauses as tuples of DIMACS literals
+    @rtype tuple
+    """
+    clauses = []
+    for cell in range(81):
+        # Every cell contains at least one and at most one number
+        literals = [cell * 9 + num for num in range(1, 10)]
+        clauses.append(tuple(literals))
+        clauses.extend((-x, -y) for x, y in combinations(literals, 2))
+    for unit in topology.units:
+        for num in range(1, 10):
+            # Every number appears at least once and at most once per unit
+            literals = [cell * 9 + num for cell in unit]
+            clauses.append(tuple(literals))
+            clauses.extend((-x, -y) for x, y in combinations(literals, 2))
+    return tuple(clauses)
+
+
+# Base CNF of the sudoku rules, precomputed once at import
+BASE_CNF = _build_base_cnf()
+NUM_VARS = 729
+
+# 1. solve_sudoku_sat
+
+
+def solve_sudoku_sat(sudoku, stats=None, topology=STANDARD):
+    """!@brief This is the main function to solve a sudoku as a boolean
+    satisfiability problem.
+
+    @details It takes a sudoku array (list of lists) as an input and
+    returns a solved sudoku array (list of lists). The algorithm adds a unit
+    clause for every given to the precomputed base CNF of the sudoku rules
+    and solves the CNF with the CDCL engine.
+
+    @param sudoku The sudoku array (list of lists) to solve
+    @type sudoku list of lists
+    @param stats Optional dictionary that is updated with the search
+    statistics (decisions, conflicts, propagations, restarts, learned)
+    @type stats dict
+    @return sudoku_solved The solved sudoku array (list of lists)
+    @rtype list of lists
+    @see encode_sudoku Function to encode the sudoku as CNF
+    @see CDCLSolver Class of the CDCL engine
+
+    References:
+    - Ines Lynce and Joel Ouaknine. Sudoku as a SAT problem. In ISAIM, 2006.
+    - Niklas Een and Niklas Sorensson. An extensible SAT-solver. In SAT,
+    pages 502–518. Springer, 2003.
+
+    Example:
+    >>> solve_sudoku_sat(sudoku)
+    [
+        [3, 8, 2, 6, 1, 9, 4, 7, 5],
+        ...
+    ]
+    """
+    solver = CDCLSolver(NUM_VARS, encode_sudoku(sudoku, topology))
+    satisfiable = solver.solve()
+    if stats is not None:
+        stats.update(solver.stats)
+    if not satisfiable:
+        # Print a warning if sudoku is invalid/unsolveable
+        print("Unsolveable Sudoku. Returned 'None'.")
+        return None
+    sudoku_solved = [[0 for _ in range(9)] for _ in range(9)]
+    for row in range(9):
+        for col in range(9):
+            for num in range(1, 10):
+                if solver.model[_var(row, col, num)]:
+                    sudoku_solved[row][col] = num
+                    break
+    return sudoku_solved
+
+
+# === HELPER FUNCTIONS ========================================================
+
+# 1.1 encode_sudoku
+
+
+def encode_sudoku(sudoku, topology=STANDARD):
+    """!@brief Encodes a sudoku as CNF.
+
+    @param sudoku The sudoku array (list of lists)
+    @type sudoku list of lists
+    @param topology Optional topology of the sudoku; the base CNF is only
+    precomputed for the standard sudoku
+    @type topology Topology
+    @return clauses The base CNF followed by one unit clause per given
+    @rtype list
+    """
+    givens = [
+        (_var(row, col, sudoku[row][col]),)
+        for row in range(9)
+        for col in range(9)
+        if sudoku[row][col]
+    ]
+    base_cnf = BASE_CNF if topology is STANDARD else _build_base_cnf(topology)
+    return list(base_cnf) + givens
+
+
+# 1.2 CDCLSolver
+
+
+class CDCLSolver:
+    """!@brief Conflict-driven clause learning SAT solver.
+
+    @details Literals are stored internally as 2 * var for var and
+    2 * var + 1 for -var, so the negation of literal p is p ^ 1. Every clause
+    with two or more literals watches its first two literals; watches[p]
+    holds the clauses watching the negation of p, which are visited when p
+    becomes true.
+    """
+
+    def __init__(self, num_vars, clauses):
+        """!@brief Loads a CNF.
+
+        @param num_vars The number of variables (1 to num_vars)
+        @type num_vars int
+        @param clauses The clauses as sequences of DIMACS literals
+        @type clauses iterable
+        """
+        self.num_vars = num_vars
+        size = 2 * num_vars + 2
+        self.values = [0] * size  # 1 true, -1 false, 0 unassigned
+        self.level = [0] * (num_vars + 1)
+        self.reason = [None] * (num_vars + 1)
+        self.activity = [0.0] * (num_vars + 1)
+        self.phase = [True] * (num_vars + 1)
+        self.watches = [[] for _ in range(size)]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.var_inc = 1.0
+        self.model = None
+        self.unsat = False
+        self.stats = {
+            "decisions": 0,
+            "conflicts": 0,
+            "propagations": 0,
+            "restarts": 0,
+            "learned": 0,
+        }
+        for clause in clauses:
+            self.add_clause(clause)
+
+    # 1.2.1 add_clause
+
+    def add_clause(self, clause):
+        """!@brief Adds a clause of DIMACS literals at decision level 0."""
+        lits = [2 * lit if lit > 0 else -2 * lit + 1 for lit in clause]
+        if len(lits) == 1:
+            value = self.values[lits[0]]
+            if value == -1:
+                self.unsat = True
+            elif value == 0:
+                self._enqueue(lits[0], None)
+            return
+        self.watches[lits[0] ^ 1].append(lits)
+        self.watches[lits[1] ^ 1].append(lits)
+
+    # 1.2.2 solve
+
+    def solve(self):
+        """!@brief Solves the CNF.
+
+        @return True if the CNF is satisfiable (the model is stored in
+        self.model, indexed by variable), False otherwise
+        @rtype bool
+        """
+        if self.unsat or self._propagate() is not None:
+            return False
+        restarts = 0
+        conflicts_until_restart = RESTART_BASE * luby(restarts + 1)
+        stats = self.stats
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                stats["conflicts"] += 1
+                if not self.trail_lim:
+                    return False  # conflict without decisions
+                learnt, backjump_level = self._analyze(conflict)
+                self._backtrack(backjump_level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    self.watches[learnt[0] ^ 1].append(learnt)
+                    self.watches[learnt[1] ^ 1].append(learnt)
+                    self._enqueue(learnt[0], learnt)
+                    stats["learned"] += 1
+                self.var_inc /= ACTIVITY_DECAY
+                conflicts_until_restart -= 1
+                if conflicts_until_restart <= 0:
+                    restarts += 1
+                    stats["restarts"] += 1
+                    conflicts_until_restart = RESTART_BASE * luby(restarts + 1)
+                    self._backtrack(0)
+                continue
+            var = self._pick_branch_var()
+            if var is None:
+                self.model = [False] + [
+                    self.values[2 * v] == 1
+                    for v in range(1, self.num_vars + 1)
+                ]
+                return True
+            stats["decisions"] += 1
+            self.trail_lim.append(len(self.trail))
+            self._enqueue(2 * var if self.phase[var] else 2 * var + 1, None)
+
+    # === HELPER METHODS ======================================================
+
+    def _enqueue(self, lit, reason):
+        """!@brief Makes a literal true at the current decision level."""
+        self.values[lit] = 1
+        self.values[lit ^ 1] = -1
+        var = lit >> 1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def _propagate(self):
+        """!@brief Unit propagation with two watched literals.
+
+        @return The conflicting clause, or None if there is no conflict
+        @rtype list or None
+        """
+        values, watches, trail = self.values, self.watches, self.trail
+        while self.qhead < len(trail):
+            p = trail[self.qhead]
+            self.qhead += 1
+            self.stats["propagations"] += 1
+            false_lit = p ^ 1
+            watchers = watches[p]
+            i = j = 0
+            n = len(watchers)
+            while i < n:
+                clause = watchers[i]
+                i += 1
+                # Make sure the false literal is the second watch
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if values[first] == 1:
+                    watchers[j] = clause
+                    j += 1
+                    continue
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    if values[clause[k]] != -1:
+                        clause[1], clause[k] = clause[k], false_lit
+                        watches[clause[1] ^ 1].append(clause)
+                        break
+                else:
+                    watchers[j] = clause
+                    j += 1
+                    if values[first] == -1:
+                        # Conflict: keep the remaining watchers and stop
+                        watchers[j : j + n - i] = watchers[i:n]
+                        del watchers[j + n - i :]
+                        self.qhead = len(trail)
+                        return clause
+                    self._enqueue(first, clause)
+            del watchers[j:]
+        return None
+
+    def _analyze(self, conflict):
+        """!@brief Derives the first-UIP learned clause of a conflict.
+
+        @return learnt The learned clause (asserting literal first, literal
+        of the backjump level second)
+        @rtype list
+        @return backjump_level The decision level to backjump to
+        @rtype int
+        """
+        level, reason, trail = self.level, self.reason, self.trail
+        current_level = len(self.trail_lim)
+        seen = set()
+        learnt = [0]
+        counter = 0
+        p = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            for q in clause if p is None else clause[1:]:
+                var = q >> 1
+                if var not in seen and level[var] > 0:
+                    seen.add(var)
+                    self._bump(var)
+                    if level[var] >= current_level:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            # Next literal of the current level on the trail
+            while (trail[index] >> 1) not in seen:
+                index -= 1
+            p = trail[index]
+            index -= 1
+            clause = reason[p >> 1]
+            counter -= 1
+            if counter == 0:
+                break
+        learnt[0] = p ^ 1
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the literal with the highest level next to the asserting one
+        k = max(range(1, len(learnt)), key=lambda i: level[learnt[i] >> 1])
+        learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, level[learnt[1] >> 1]
+
+    def _backtrack(self, target_level):
+        """!@brief Undoes all assignments above a decision level."""
+        if len(self.trail_lim) <= target_level:
+            return
+        start = self.trail_lim[target_level]
+        values, phase, reason = self.values, self.phase, self.reason
+        for lit in self.trail[start:]:
+            var = lit >> 1
+            values[lit] = values[lit ^ 1] = 0
+            reason[var] = None
+            phase[var] = not lit & 1  # phase saving
+        del self.trail[start:]
+        del self.trail_lim[target_level:]
+        self.qhead = len(self.trail)
+
+    def _bump(self, var):
+        """!@brief Increases the activity of a variable in a conflict."""
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+
+    def _pick_branch_var(self):
+        """!@brief Gets the unassigned variable with the highest activity.
+
+        @return The variable, or None if all variables are assigned
+        @rtype int or None
+        """
+        values, activity = self.values, self.activity
+        best, best_activity = None, -1.0
+        for var in range(1, self.num_vars + 1):
+            if values[2 * var] == 0 and activity[var] > best_activity:
+                best, best_activity = var, activity[var]
+        return best
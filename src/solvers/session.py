@@ -0,0 +1,244 @@
+from . import registry
+from processors import metrics
+from processors.topology import CELL_UNITS, UNITS
+
+# flake8: noqa F401
+import typing
+
+# === MAIN CLASSES ============================================================
+"""!@file session.py
+@brief Module containing an incremental solving session for interactive use.
+
+@details This script keeps the state of a sudoku that is being filled in by a
+user: the digit counts and digit masks of every row, column and subgrid, so
+that changing a single cell updates its validity in constant time instead of
+re-running checkers.is_sudoku_valid. The solution is solved once and cached;
+the cache is only invalidated when an entry contradicts it (the hits and
+misses are counted in the default metrics registry). The next logically
+deducible cell (naked or hidden single) is found from the candidate masks
+without solving.
+@author Created by Steven Dillmann 17/12/2023
+"""
+
+_ALL_DIGITS = 0x1FF
+
+# 1. SudokuSession
+
+
+class SudokuSession:
+    """!@brief Stateful sudoku session for hint and consistency requests.
+
+    Example:
+    >>> session = SudokuSession(sudoku)
+    >>> session.set_cell(0, 1, 8)
+    True
+    >>> session.next_hint()
+    (2, 0, 1, 'naked single')
+    """
+
+    def __init__(self, sudoku, solver="cs"):
+        """!@brief Starts a session from a sudoku puzzle.
+
+        @param sudoku The sudoku array (list of lists); non-zero cells are
+        the givens and cannot be changed
+        @type sudoku list of lists
+        @param solver Optional solver used to compute the cached solution
+        @type solver str
+        """
+        self._solver = solver
+        self._cells = [0] * 81
+        self._givens = [False] * 81
+        # Count of each digit (index 1-9) and mask of present digits per unit
+        self._counts = [[0] * 10 for _ in range(27)]
+        self._masks = [0] * 27
+        self._conflicts = 0  # number of (unit, digit) pairs with duplicates
+        self._solution = None  # cached solution (81 cells), False if none
+        for row in range(9):
+            for col in range(9):
+                if sudoku[row][col]:
+                    self._place(row * 9 + col, sudoku[row][col])
+                    self._givens[row * 9 + col] = True
+
+    # 1.1 Cell access
+
+    def get_cell(self, row, col):
+        """!@brief Gets the number in a cell (0 if empty)."""
+        return self._cells[row * 9 + col]
+
+    def set_cell(self, row, col, num):
+        """!@brief Enters (or clears with 0) a number in a cell.
+
+        @details Updates the digit counts of the three units of the cell and
+        invalidates the cached solution only if the entry contradicts it (a
+        cached unsolvable result is invalidated by any change).
+
+        @param row The row index of the cell
+        @type row int
+        @param col The column index of the cell
+        @type col int
+        @param num The number to enter (1-9), or 0 to clear the cell
+        @type num int
+        @return True if the cell does not conflict with its peers
+        @rtype bool
+        @raises ValueError If the cell is a given or the number is not 0-9
+        """
+        i = row * 9 + col
+        if self._givens[i]:
+            raise ValueError(f"Cell ({row + 1}, {col + 1}) is a given.\n")
+        if not 0 <= num <= 9:
+            raise ValueError("Sudoku numbers must be between 0 and 9.\n")
+        if self._cells[i]:
+            self._remove(i)
+        if num:
+            self._place(i, num)
+        if self._solution is False:
+            self._solution = None  # any change may make it solvable again
+        elif num and self._solution and self._solution[i] != num:
+            self._solution = None
+        return self.is_cell_consistent(row, col)
+
+    def to_array(self):
+        """!@brief Gets the current sudoku array (list of lists)."""
+        return [self._cells[i : i + 9] for i in range(0, 81, 9)]
+
+    # 1.2 Consistency
+
+    def is_consistent(self):
+        """!@brief Checks if no row, column or subgrid has duplicates.
+
+        @return True if the current sudoku is valid, False otherwise
+        @rtype bool
+        """
+        return self._conflicts == 0
+
+    def is_cell_consistent(self, row, col):
+        """!@brief Checks if a cell does not conflict with its peers.
+
+        @return True if the number in the cell appears only once in its row,
+        column and subgrid (always True for empty cells)
+        @rtype bool
+        """
+        i = row * 9 + col
+        num = self._cells[i]
+        return not num or all(self._counts[u][num] == 1 for u in CELL_UNITS[i])
+
+    def is_solved(self):
+        """!@brief Checks if every cell is filled without conflicts."""
+        return self._conflicts == 0 and 0 not in self._cells
+
+    def get_candidates(self, row, col):
+        """!@brief Gets the numbers not yet used by the peers of a cell.
+
+        @return The candidate numbers of the cell (empty if it is filled)
+        @rtype list
+        """
+        i = row * 9 + col
+        if self._cells[i]:
+            return []
+        mask = self._candidate_mask(i)
+        return [num for num in range(1, 10) if mask >> (num - 1) & 1]
+
+    # 1.3 Solution and hints
+
+    def get_solution(self):
+        """!@brief Gets the solution of the current sudoku (cached).
+
+        @return The solved sudoku array (list of lists), or None if the
+        current entries cannot lead to a solution
+        @rtype list of lists or None
+        """
+        metrics.CACHE_LOOKUPS.inc(
+            cache="session", result="miss" if self._solution is None else "hit"
+        )
+        if self._solution is None:
+            if self._conflicts:
+                self._solution = False
+            else:
+                solved = registry.get_solver(self._solver)(self.to_array())
+                self._solution = (
+                    [num for row in solved for num in row] if solved else False
+                )
+        if not self._solution:
+            return None
+        return [self._solution[i : i + 9] for i in range(0, 81, 9)]
+
+    def is_entry_correct(self, row, col):
+        """!@brief Checks a filled cell against the cached solution.
+
+        @return True if the cell is empty or agrees with the solution, False
+        otherwise (also if the current entries have no solution)
+        @rtype bool
+        """
+        i = row * 9 + col
+        if not self._cells[i]:
+            return True
+        return self.get_solution() is not None and (
+            self._solution[i] == self._cells[i]
+        )
+
+    def next_hint(self):
+        """!@brief Finds the next logically deducible cell without solving.
+
+        @details Looks for a naked single (an empty cell with a single
+        candidate) first and then for a hidden single (a number that fits in
+        only one cell of a row, column or subgrid).
+
+        @return (row, col, num, reason) of the deducible cell, or None if
+        the sudoku has conflicts or no single can be found
+        @rtype tuple or None
+        """
+        if self._conflicts:
+            return None
+        cells = self._cells
+        masks = [0] * 81
+        for i in range(81):
+            if not cells[i]:
+                mask = self._candidate_mask(i)
+                if mask & (mask - 1) == 0 and mask:
+                    return i // 9, i % 9, mask.bit_length(), "naked single"
+                masks[i] = mask
+        for unit in UNITS:
+            once = twice = 0
+            for i in unit:
+                twice |= once & masks[i]
+                once |= masks[i]
+            single = once & ~twice
+            if single:
+                num = (single & -single).bit_length()
+                bit = 1 << (num - 1)
+                for i in unit:
+                    if masks[i] & bit:
+                        return i // 9, i % 9, num, "hidden single"
+        return None
+
+    # === HELPER METHODS ======================================================
+
+    def _candidate_mask(self, i):
+        """!@brief Mask of the numbers not used in the units of cell i."""
+        r, c, b = CELL_UNITS[i]
+        return ~(self._masks[r] | self._masks[c] | self._masks[b]) & (
+            _ALL_DIGITS
+        )
+
+    def _place(self, i, num):
+        """!@brief Puts a number in an empty cell and updates its units."""
+        self._cells[i] = num
+        for u in CELL_UNITS[i]:
+            count = self._counts[u][num] + 1
+            self._counts[u][num] = count
+            if count == 1:
+                self._masks[u] |= 1 << (num - 1)
+            elif count == 2:
+                self._conflicts += 1
+
+    def _remove(self, i):
+        """!@brief Clears a cell and updates its units."""
+        num = self._cells[i]
+        self._cells[i] = 0
+        for u in CELL_UNITS[i]:
+            count = self._counts[u][num] - 1
+            self._counts[u][num] = count
+            if count == 0:
+                self._masks[u] &= ~(1 << (num - 1))
+            elif count == 1:
+                self._conflicts -= 1
@@ -1,4 +1,4 @@
-from src.processors import checkers, converters
+from src.processors import checkers, converters, corpus
 import pytest
 
 # === MAIN FUNCTION TESTS =====================================================
@@ -7,9 +7,12 @@ import pytest
 
     @details This script contains tests for the checkers module. It tests the
     following functions: is_sudoku_file_valid, is_sudoku_valid,
-    is_sudoku_solved. The tests are parametrised to test a variety of
-    different inputs. The test resources are located in the tests_resources
-    folder.
+    is_sudoku_solved, repair_sudoku_file, repair_sudoku_text and the batch
+    checkers is_sudoku_valid_batch, is_sudoku_solved_batch,
+    verify_solution_batch, verify_sudoku_bin_file and
+    verify_sudoku_line_files. The tests
+    are parametrised to test a variety of different inputs. The test
+    resources are located in the tests_resources folder.
 
     @author Created by Steven Dillmann 17/12/2023
 """
@@ -193,3 +196,222 @@ def test_is_sudoku_solved(sudoku_files_solved, expected_solved):
     """
     sudoku_arr = converters.convert_sudoku_txt_to_arr(sudoku_files_solved)
     assert checkers.is_sudoku_solved(sudoku_arr) == expected_solved
+
+
+# 4. Test repair_sudoku_file
+
+
+@pytest.mark.parametrize(
+    "sudoku_file, fixed_file, expected_codes",
+    [
+        ("tests_resources/easy_1.txt", "tests_resources/easy_1.txt", []),
+        (
+            "tests_resources/sudoku_invalid_bad_file_type_md.md",
+            "tests_resources/sudoku_invalid_bad_file_type_md_fixed.txt",
+            ["extension"],
+        ),
+        (
+            "tests_resources/sudoku_invalid_bad_separator_lines.txt",
+            "tests_resources/sudoku_invalid_bad_separator_lines_fixed.txt",
+            ["separator_line"],
+        ),
+        (
+            "tests_resources/sudoku_invalid_leading_white_space.txt",
+            "tests_resources/sudoku_invalid_leading_white_space_fixed.txt",
+            ["whitespace"],
+        ),
+        (
+            "tests_resources/sudoku_invalid_middle_empty_lines.txt",
+            "tests_resources/sudoku_invalid_middle_empty_lines_fixed.txt",
+            ["middle_empty_lines"],
+        ),
+        (
+            "tests_resources/sudoku_invalid_trailing_empty_lines.txt",
+            "tests_resources/sudoku_invalid_trailing_empty_lines_fixed.txt",
+            ["trailing_empty_lines"],
+        ),
+        (
+            "tests_resources/sudoku_invalid_bad_numbered_lines.txt",
+            None,
+            ["line_format"],
+        ),
+        (
+            "tests_resources/sudoku_invalid_extra_sudoku_line.txt",
+            None,
+            ["line_count"],
+        ),
+    ],
+)
+def test_repair_sudoku_file(sudoku_file, fixed_file, expected_codes):
+    """!@brief Test repair_sudoku_file function.
+
+    @details This function tests that sudoku files are repaired in memory
+    like the '_fixed.txt' files that is_sudoku_file_valid writes, that the
+    repairs are reported as diagnostics and that files that cannot be
+    repaired return None.
+
+    @param sudoku_file The path to the sudoku file to repair.
+    @type sudoku_file str
+    @param fixed_file The path to the expected repaired file, or None if the
+    file cannot be repaired.
+    @type fixed_file str or None
+    @param expected_codes The expected diagnostic codes.
+    @type expected_codes list of str
+    """
+    sudoku_txt, diagnostics = checkers.repair_sudoku_file(sudoku_file)
+    assert [diagnostic.code for diagnostic in diagnostics] == expected_codes
+    if fixed_file is None:
+        assert sudoku_txt is None
+        assert not diagnostics[-1].repaired
+    else:
+        assert all(diagnostic.repaired for diagnostic in diagnostics)
+        assert converters.convert_sudoku_str_to_arr(
+            sudoku_txt
+        ) == converters.convert_sudoku_txt_to_arr(fixed_file)
+
+
+# 5. Test repair_sudoku_text
+
+
+def test_repair_sudoku_text():
+    """!@brief Test repair_sudoku_text with missing separators.
+
+    @details Tests that 9 lines of 9 digits with surrounding white space and
+    no separators are repaired to the expected format.
+    """
+    sudoku_arr = converters.convert_sudoku_txt_to_arr(
+        "tests_resources/easy_1.txt"
+    )
+    sudoku_lines = [" " + "".join(map(str, row)) + "\r" for row in sudoku_arr]
+    sudoku_txt, diagnostics = checkers.repair_sudoku_text(
+        "\n".join(sudoku_lines)
+    )
+    assert converters.convert_sudoku_str_to_arr(sudoku_txt) == sudoku_arr
+    assert sudoku_txt.split("\n")[3] == checkers.SEPARATOR_LINE
+    assert {diagnostic.code for diagnostic in diagnostics} == {
+        "whitespace",
+        "numbered_line",
+        "separator_line",
+    }
+
+
+# 6. Test the batch checkers
+
+sudoku_files = [
+    "tests_resources/sudoku_valid_solved.txt",
+    "tests_resources/sudoku_valid_not_yet_solved.txt",
+    "tests_resources/sudoku_valid_solved_rules_invalid.txt",
+    "tests_resources/sudoku_valid_rules_invalid.txt",
+    "tests_resources/easy_1.txt",
+    "tests_resources/hard_1.txt",
+    "tests_resources/easy_1_solved.txt",
+    "tests_resources/hard_1_solved.txt",
+]
+
+
+def test_batch_checkers():
+    """!@brief Test is_sudoku_valid_batch and is_sudoku_solved_batch.
+
+    @details Tests that the batch checkers agree with is_sudoku_valid and
+    is_sudoku_solved on the test sudokus and on a solved sudoku with one
+    cell emptied, and that the first offending unit is reported.
+    """
+    sudokus = [converters.convert_sudoku_txt_to_arr(f) for f in sudoku_files]
+    emptied = [row[:] for row in sudokus[-1]]
+    emptied[4][0] = 0
+    sudokus.append(emptied)
+    valid, first_invalid = checkers.is_sudoku_valid_batch(sudokus)
+    solved, first_unsolved = checkers.is_sudoku_solved_batch(sudokus)
+    for k, sudoku in enumerate(sudokus):
+        assert valid[k] == checkers.is_sudoku_valid(sudoku)
+        assert solved[k] == checkers.is_sudoku_solved(sudoku)
+        assert (first_invalid[k] == -1) == valid[k]
+        assert (first_unsolved[k] == -1) == solved[k]
+    # Row 5 is the first unit of the emptied cell
+    assert checkers.STANDARD.unit_labels[first_unsolved[-1]] == "row 5"
+    with pytest.raises(ValueError):
+        checkers.is_sudoku_solved_batch([[10] * 81])
+
+
+# 7. Test verify_solution_batch and verify_sudoku_bin_file
+
+
+def test_verify_solution_batch(tmp_path):
+    """!@brief Test the verification of solutions against their sudokus.
+
+    @details Tests that the solutions of the easy, medium and hard sudokus
+    are verified, and that a solution of another sudoku (changed givens) and
+    an unsolved grid are not, both in memory and from a packed binary file.
+    """
+    tiers = ["easy_1", "medium_1", "hard_1"]
+    sudokus = [
+        converters.convert_sudoku_txt_to_arr(f"tests_resources/{tier}.txt")
+        for tier in tiers
+    ]
+    solutions = [
+        converters.convert_sudoku_txt_to_arr(
+            f"tests_resources/{tier}_solved.txt"
+        )
+        for tier in tiers
+    ]
+    sudokus += [sudokus[0], sudokus[1]]
+    solutions += [solutions[1], sudokus[1]]
+    expected = [True, True, True, False, False]
+    verified, first_unit = checkers.verify_solution_batch(sudokus, solutions)
+    assert verified.tolist() == expected
+    assert [unit == -1 for unit in first_unit] == expected
+    bin_file = str(tmp_path / "solutions.bin")
+    converters.write_sudoku_bin_file(bin_file, sudokus, solutions)
+    verified, _ = checkers.verify_sudoku_bin_file(bin_file, chunk_size=2)
+    assert verified.tolist() == expected
+    with pytest.raises(ValueError):
+        checkers.verify_solution_batch(sudokus, solutions[:2])
+
+
+# 8. Test verify_sudoku_line_files
+
+
+@pytest.mark.parametrize("suffix", ["", ".gz"])
+def test_verify_sudoku_line_files(tmp_path, suffix):
+    """!@brief Test the verification of solutions in corpus files.
+
+    @details Writes the sudokus and solutions of the easy, medium and hard
+    sudokus (plus a wrong solution and an unsolved grid) to corpus files
+    and verifies them in chunks of two. Tests that files with different
+    numbers of sudokus and lines that are not sudokus raise a ValueError.
+
+    @param tmp_path The pytest temporary directory.
+    @type tmp_path pathlib.Path
+    @param suffix The compression suffix of the corpus files.
+    @type suffix str
+    """
+    tiers = ["easy_1", "medium_1", "hard_1"]
+    sudokus = [
+        converters.convert_sudoku_txt_to_arr(f"tests_resources/{tier}.txt")
+        for tier in tiers
+    ]
+    solutions = [
+        converters.convert_sudoku_txt_to_arr(
+            f"tests_resources/{tier}_solved.txt"
+        )
+        for tier in tiers
+    ]
+    sudokus += [sudokus[0], sudokus[1]]
+    solutions += [solutions[1], sudokus[1]]
+    sudoku_file = str(tmp_path / f"sudokus.txt{suffix}")
+    solution_file = str(tmp_path / f"solutions.txt{suffix}")
+    corpus.write_corpus(sudoku_file, sudokus)
+    corpus.write_corpus(solution_file, solutions)
+    verified, first_unit = checkers.verify_sudoku_line_files(
+        sudoku_file, solution_file, chunk_size=2
+    )
+    assert verified.tolist() == [True, True, True, False, False]
+    assert (first_unit == -1).tolist() == verified.tolist()
+    short_file = str(tmp_path / f"short.txt{suffix}")
+    corpus.write_corpus(short_file, solutions[:4])
+    with pytest.raises(ValueError):
+        checkers.verify_sudoku_line_files(sudoku_file, short_file)
+    bad_file = tmp_path / "bad.txt"
+    bad_file.write_text("123\n" * 5)
+    with pytest.raises(ValueError):
+        checkers.verify_sudoku_line_files(sudoku_file, str(bad_file))
@@ -1,4 +1,5 @@
 from src.processors import converters
+import numpy as np
 import pytest
 
 # === TEST EXAMPLE DEFINITIONS ================================================
@@ -56,7 +57,9 @@ with open(
     @brief Module containing tests for the converters module.
 
     @details This script contains tests for the converters module. It tests the
-    following functions: convert_sudoku_txt_to_arr, convert_sudoku_arr_to_txt.
+    following functions: convert_sudoku_txt_to_arr, convert_sudoku_arr_to_txt,
+    format_sudoku, format_sudoku_batch, the packed binary conversions and
+    convert_sudoku_str_to_arr.
     The tests are parametrised to test a variety of different inputs. The test
     resources are located in the tests_resources folder.
 
@@ -140,3 +143,171 @@ def test_convert_sudoku_arr_to_txt(sudoku_arr, expected_sudoku_txt):
     assert (
         converters.convert_sudoku_arr_to_txt(sudoku_arr) == expected_sudoku_txt
     )
+
+
+# 3. Test format_sudoku
+
+
+@pytest.mark.parametrize(
+    "sudoku_arr, fmt, expected_sudoku_txt",
+    [
+        (sudoku_solved_arr, "boxed", sudoku_solved_txt),
+        (
+            sudoku_not_yet_solved_arr,
+            "line",
+            "".join(
+                str(num) for row in sudoku_not_yet_solved_arr for num in row
+            ),
+        ),
+    ],
+)
+def test_format_sudoku(sudoku_arr, fmt, expected_sudoku_txt):
+    """!@brief Test format_sudoku function.
+
+    @details This function tests the format_sudoku function. It tests the
+    following cases:
+
+    1. Test format_sudoku with a solved sudoku in 'boxed' format.
+    2. Test format_sudoku with a sudoku that is not yet solved in 'line'
+    format.
+
+    @param sudoku_arr The sudoku array to format.
+    @type sudoku_arr list of lists
+    @param fmt The output format.
+    @type fmt str
+    @param expected_sudoku_txt The expected formatted sudoku.
+    @type expected_sudoku_txt str
+
+    @return assertion True if the formatted sudoku is equal to the expected
+    formatted sudoku. False otherwise.
+    """
+    assert converters.format_sudoku(sudoku_arr, fmt) == expected_sudoku_txt
+
+
+# 4. Test format_sudoku_batch
+
+
+@pytest.mark.parametrize("fmt", ["boxed", "line"])
+def test_format_sudoku_batch(fmt):
+    """!@brief Test format_sudoku_batch function.
+
+    @details This function tests that the format_sudoku_batch function
+    renders a batch of sudokus into the same text as formatting each sudoku
+    separately, in both 'boxed' and 'line' format, and that an unsupported
+    format raises a ValueError.
+
+    @param fmt The output format.
+    @type fmt str
+
+    @return assertion True if the formatted batch is equal to the joined
+    formatted sudokus. False otherwise.
+    """
+    batch = [sudoku_not_yet_solved_arr, sudoku_solved_arr] * 700
+    separator = "\n\n" if fmt == "boxed" else "\n"
+    expected = separator.join(
+        converters.format_sudoku(arr, fmt) for arr in batch
+    )
+    assert converters.format_sudoku_batch(batch, fmt) == expected + "\n"
+    assert converters.format_sudoku_batch([], fmt) == ""
+    with pytest.raises(ValueError):
+        converters.format_sudoku_batch(batch, "grid")
+
+
+# 5. Test packed binary conversions
+
+
+@pytest.mark.parametrize(
+    "sudoku_arr",
+    [sudoku_not_yet_solved_arr, sudoku_solved_arr, sudoku_unsolved_arr],
+)
+def test_convert_sudoku_bin(sudoku_arr):
+    """!@brief Test the packed and sparse binary conversions.
+
+    @details This function tests that convert_sudoku_arr_to_bin and
+    convert_sudoku_arr_to_sparse_bin round-trip through their inverse
+    functions and produce records of the expected size.
+
+    @param sudoku_arr The sudoku array to pack.
+    @type sudoku_arr list of lists
+
+    @return assertion True if the unpacked sudoku is equal to the sudoku.
+    """
+    packed = converters.convert_sudoku_arr_to_bin(sudoku_arr)
+    assert len(packed) == converters.PACKED_SIZE
+    assert converters.convert_sudoku_bin_to_arr(packed) == sudoku_arr
+    sparse = converters.convert_sudoku_arr_to_sparse_bin(sudoku_arr)
+    clues = sum(num != 0 for row in sudoku_arr for num in row)
+    assert len(sparse) == 11 + (clues + 1) // 2
+    assert converters.convert_sudoku_sparse_bin_to_arr(sparse) == sudoku_arr
+    with pytest.raises(ValueError):
+        converters.convert_sudoku_sparse_bin_to_arr(sparse[:-1])
+
+
+# 6. Test packed binary batches and files
+
+
+def test_sudoku_bin_batch_and_file(tmp_path):
+    """!@brief Test pack_sudoku_batch, unpack_sudoku_batch and the packed
+    binary file functions.
+
+    @details This function tests that the vectorized batch packing matches
+    the single sudoku packing and that sudokus and solutions round-trip
+    through a packed binary file.
+
+    @param tmp_path The pytest temporary directory.
+    @type tmp_path pathlib.Path
+    """
+    sudokus = [sudoku_not_yet_solved_arr, sudoku_unsolved_arr] * 3
+    solutions = [sudoku_solved_arr] * 6
+    packed = converters.pack_sudoku_batch(sudokus)
+    assert packed.shape == (6, converters.PACKED_SIZE)
+    assert packed[1].tobytes() == converters.convert_sudoku_arr_to_bin(
+        sudoku_unsolved_arr
+    )
+    unpacked = converters.unpack_sudoku_batch(packed.tobytes())
+    assert unpacked.reshape(6, 9, 9).tolist() == sudokus
+    bin_file = str(tmp_path / "sudokus.bin")
+    converters.write_sudoku_bin_file(bin_file, sudokus, solutions)
+    file_sudokus, file_solutions = converters.read_sudoku_bin_file(bin_file)
+    assert np.array_equal(file_sudokus, packed)
+    assert (
+        converters.unpack_sudoku_batch(file_solutions[2:4])
+        .reshape(2, 9, 9)
+        .tolist()
+        == solutions[2:4]
+    )
+    with pytest.raises(ValueError):
+        converters.pack_sudoku_batch([[10] * 81])
+
+
+# 7. Test convert_sudoku_str_to_arr
+
+
+@pytest.mark.parametrize(
+    "sudoku_str, expected_sudoku_arr",
+    [
+        (sudoku_not_yet_solved_txt, sudoku_not_yet_solved_arr),
+        (sudoku_solved_txt, sudoku_solved_arr),
+        (sudoku_unsolved_txt, sudoku_unsolved_arr),
+    ],
+)
+def test_convert_sudoku_str_to_arr(sudoku_str, expected_sudoku_arr):
+    """!@brief Test convert_sudoku_str_to_arr function.
+
+    @details This function tests that the text of a sudoku file converts to
+    the same sudoku array as the file itself, since
+    convert_sudoku_txt_to_arr only reads the file and converts its text.
+
+    @param sudoku_str The text of a sudoku file.
+    @type sudoku_str str
+    @param expected_sudoku_arr The expected sudoku array.
+    @type expected_sudoku_arr list of lists
+    """
+    sudoku_arr = converters.convert_sudoku_str_to_arr(sudoku_str)
+    assert sudoku_arr == expected_sudoku_arr
+    assert (
+        converters.convert_sudoku_str_to_arr(
+            converters.convert_sudoku_arr_to_txt(sudoku_arr)
+        )
+        == expected_sudoku_arr
+    )
@@ -0,0 +1,159 @@
+from src.processors import converters, corpus
+import os
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+easy_arr = converters.convert_sudoku_txt_to_arr("tests_resources/easy_1.txt")
+easy_solved_arr = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/easy_1_solved.txt"
+)
+medium_arr = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/medium_1.txt"
+)
+hard_arr = converters.convert_sudoku_txt_to_arr("tests_resources/hard_1.txt")
+
+corpus_arrs = [easy_arr, easy_solved_arr, medium_arr, hard_arr] * 5
+
+
+@pytest.fixture
+def corpus_file(tmp_path):
+    """!@brief Write a corpus file with 20 sudokus in 'line' format, with
+    CRLF line endings, a blank line and '.' for some empty cells."""
+    lines = [converters.format_sudoku(arr, "line") for arr in corpus_arrs]
+    lines[3] = lines[3].replace("0", ".")
+    lines.insert(7, "")
+    corpus_path = tmp_path / "corpus.txt"
+    corpus_path.write_bytes("\r\n".join(lines).encode("ascii") + b"\r\n")
+    return str(corpus_path)
+
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_corpus.py
+    @brief Module containing tests for the corpus module.
+
+    @details This script contains tests for the corpus module. It tests the
+    PuzzleCorpus class: random access, slicing, sharding and the sidecar
+    index, and reading and writing compressed corpus files. The corpus
+    files are generated from the sudokus in the tests_resources folder.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test PuzzleCorpus random access
+
+
+@pytest.mark.parametrize("i", [0, 1, 3, 7, 19, -1, -20])
+def test_puzzle_corpus_getitem(corpus_file, i):
+    """!@brief Test PuzzleCorpus random access to single sudokus.
+
+    @param corpus_file The path to the corpus file.
+    @type corpus_file str
+    @param i The index of the sudoku.
+    @type i int
+    @return assertion True if the sudoku is equal to the written sudoku.
+    """
+    with corpus.PuzzleCorpus(corpus_file) as puzzles:
+        assert len(puzzles) == len(corpus_arrs)
+        assert puzzles[i] == corpus_arrs[i]
+
+
+# 2. Test PuzzleCorpus slicing and sharding
+
+
+def test_puzzle_corpus_slices_and_shards(corpus_file):
+    """!@brief Test PuzzleCorpus slices and disjoint worker shards.
+
+    @details Tests that slices match the written sudokus, that the shards of
+    3 workers cover the corpus exactly once and that out of range indices
+    raise an IndexError.
+
+    @param corpus_file The path to the corpus file.
+    @type corpus_file str
+    """
+    with corpus.PuzzleCorpus(corpus_file) as puzzles:
+        assert puzzles[2:11:3] == corpus_arrs[2:11:3]
+        assert list(puzzles) == corpus_arrs
+        shards = [puzzles[puzzles.shard(w, 3)] for w in range(3)]
+        assert [arr for shard in shards for arr in shard] == corpus_arrs
+        with pytest.raises(IndexError):
+            puzzles[len(corpus_arrs)]
+
+
+# 3. Test PuzzleCorpus sidecar index
+
+
+def test_puzzle_corpus_index(corpus_file):
+    """!@brief Test PuzzleCorpus sidecar index reuse and rebuild.
+
+    @details Tests that the index file is written on first use, reused on
+    the next use and rebuilt after the corpus file changed.
+
+    @param corpus_file The path to the corpus file.
+    @type corpus_file str
+    """
+    index_file = corpus_file + corpus.INDEX_SUFFIX
+    with corpus.PuzzleCorpus(corpus_file) as puzzles:
+        assert puzzles[5] == corpus_arrs[5]
+    assert os.path.exists(index_file)
+    with corpus.PuzzleCorpus(corpus_file) as puzzles:
+        assert puzzles._index_data is not None
+        assert puzzles[-1] == corpus_arrs[-1]
+    with open(corpus_file, "a") as file:
+        file.write(converters.format_sudoku(easy_arr, "line") + "\n")
+    with corpus.PuzzleCorpus(corpus_file) as puzzles:
+        assert len(puzzles) == len(corpus_arrs) + 1
+        assert puzzles[-1] == easy_arr
+
+
+# 4. Test write_corpus
+
+
+def test_write_corpus(tmp_path):
+    """!@brief Test write_corpus function.
+
+    @details Tests that sudokus written (and appended) with write_corpus are
+    read back unchanged by PuzzleCorpus.
+
+    @param tmp_path The pytest temporary directory.
+    @type tmp_path pathlib.Path
+    """
+    corpus_file = str(tmp_path / "written.txt")
+    assert corpus.write_corpus(corpus_file, iter(corpus_arrs)) == 20
+    assert corpus.write_corpus(corpus_file, [hard_arr], append=True) == 1
+    with corpus.PuzzleCorpus(corpus_file) as puzzles:
+        assert list(puzzles) == corpus_arrs + [hard_arr]
+
+
+# 5. Test compressed corpus files
+
+
+@pytest.mark.parametrize("suffix", [".txt", ".txt.gz", ".txt.xz", ".txt.bz2"])
+def test_compressed_corpus(tmp_path, suffix):
+    """!@brief Test reading and writing compressed corpus files.
+
+    @details Tests that sudokus written (and appended) to a plain or
+    compressed corpus file are read back unchanged by PuzzleCorpus and by
+    iter_corpus_lines, including start/stop ranges and a reader that stops
+    early.
+
+    @param tmp_path The pytest temporary directory.
+    @type tmp_path pathlib.Path
+    @param suffix The suffix of the corpus file.
+    @type suffix str
+    """
+    corpus_file = str(tmp_path / ("corpus" + suffix))
+    corpus.write_corpus(corpus_file, corpus_arrs)
+    corpus.write_corpus(corpus_file, [hard_arr], append=True)
+    expected_arrs = corpus_arrs + [hard_arr]
+    assert corpus.is_compressed(corpus_file) == (suffix != ".txt")
+    with corpus.PuzzleCorpus(corpus_file) as puzzles:
+        assert list(puzzles) == expected_arrs
+    lines = list(corpus.iter_corpus_lines(corpus_file))
+    assert [
+        converters.convert_sudoku_line_to_arr(line) for line in lines
+    ] == expected_arrs
+    assert list(corpus.iter_corpus_lines(corpus_file, 3, 7)) == lines[3:7]
+    reader = corpus.iter_corpus_lines(corpus_file)
+    assert next(reader) == lines[0]
+    reader.close()
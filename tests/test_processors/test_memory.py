@@ -0,0 +1,58 @@
+from src.processors import memory
+import tracemalloc
+import pytest
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_memory.py
+    @brief Module containing tests for the memory module.
+
+    @details This script contains tests for the memory module. It tests that
+    the MemoryTracker measures the peak and net memory and the memory blocks
+    of each stage and that it only stops tracing if it started it.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test MemoryTracker stages
+
+
+def test_memory_tracker_stages():
+    """!@brief Test MemoryTracker peak, net memory and blocks per stage.
+
+    @details Allocates a temporary list of 100000 numbers in the first stage
+    (freed before the stage ends) and keeps 1000 lists in the second stage.
+    """
+    tracker = memory.MemoryTracker()
+    tracker.start()
+    temporary = list(range(100000))
+    del temporary
+    tracker.end_stage("temporary")
+    kept = [[i] for i in range(1000)]
+    tracker.end_stage("kept")
+    stages = tracker.stop()
+    assert not tracemalloc.is_tracing()
+    assert stages["temporary"]["peak"] >= 100000 * 8
+    assert stages["temporary"]["net"] < 100000
+    assert stages["kept"]["blocks"] >= 1000
+    assert stages["kept"]["net"] >= 1000 * 56
+    assert stages["total"]["peak"] == pytest.approx(
+        stages["temporary"]["peak"], rel=0.1
+    )
+    assert len(kept) == 1000
+
+
+# 2. Test MemoryTracker inside an active trace
+
+
+def test_memory_tracker_keeps_tracing():
+    """!@brief Test that MemoryTracker does not stop a trace it did not
+    start."""
+    tracemalloc.start()
+    try:
+        tracker = memory.MemoryTracker()
+        tracker.start()
+        tracker.end_stage("solve")
+        assert set(tracker.stop()) == {"solve", "total"}
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
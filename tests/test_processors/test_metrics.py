@@ -0,0 +1,95 @@
+from src.processors import metrics
+import time
+import pytest
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_metrics.py
+    @brief Module containing tests for the metrics module.
+
+    @details This script contains tests for the metrics module. It tests the
+    counters and histograms with labels, the Prometheus text format of a
+    registry, record_solve and the periodic export of a registry to a file.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test counters and histograms
+
+
+def test_counter_and_histogram():
+    """!@brief Test the series, buckets and label checks of the metrics."""
+    registry = metrics.MetricsRegistry()
+    solves = registry.counter("solves_total", "Solves.", ("solver", "status"))
+    solves.inc(solver="cs", status="solved")
+    solves.inc(2, solver="cs", status="solved")
+    assert solves.get(solver="cs", status="solved") == 3
+    assert solves.get(solver="bt", status="solved") == 0
+    assert registry.counter("solves_total", "", ("solver", "status")) is solves
+    durations = registry.histogram(
+        "seconds", "Durations.", ("stage",), buckets=(0.1, 1.0)
+    )
+    for value in (0.05, 0.1, 0.5, 3.0):
+        durations.observe(value, stage="solve")
+    assert durations.get(stage="solve") == (4, pytest.approx(3.65))
+    buckets = [
+        (labels[-1][1], value)
+        for name, labels, value in durations.samples()
+        if name == "seconds_bucket"
+    ]
+    assert buckets == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    with pytest.raises(ValueError):
+        solves.inc(solver="cs")
+    with pytest.raises(ValueError):
+        solves.inc(-1, solver="cs", status="solved")
+    with pytest.raises(ValueError):
+        registry.histogram("solves_total", "Solves.", ("solver", "status"))
+
+
+# 2. Test the Prometheus text format
+
+
+def test_to_prometheus():
+    """!@brief Test the text of a registry with a counter and a histogram."""
+    registry = metrics.MetricsRegistry()
+    registry.counter("lookups_total", "Cache lookups.", ("result",)).inc(
+        result='say "hi"\n'
+    )
+    registry.histogram("nodes", "Nodes.", buckets=(10,)).observe(3)
+    assert registry.to_prometheus() == (
+        "# HELP lookups_total Cache lookups.\n"
+        "# TYPE lookups_total counter\n"
+        'lookups_total{result="say \\"hi\\"\\n"} 1\n'
+        "# HELP nodes Nodes.\n"
+        "# TYPE nodes histogram\n"
+        'nodes_bucket{le="10"} 1\n'
+        'nodes_bucket{le="+Inf"} 1\n'
+        "nodes_sum 3\n"
+        "nodes_count 1\n"
+    )
+
+
+# 3. Test record_solve and the file export
+
+
+def test_record_solve_and_export(tmp_path):
+    """!@brief Test that record_solve updates the default registry (also the
+    linear programming paths) and that the exporter writes it to a file."""
+    solves = metrics.SOLVES.get(solver="test", status="solved")
+    metrics.record_solve(
+        "test", "solved", {"solve": 0.002, "total": 0.003}, {"nodes": 42}
+    )
+    assert metrics.SOLVES.get(solver="test", status="solved") == solves + 1
+    assert metrics.STAGE_DURATIONS.get(solver="test", stage="solve")[0] >= 1
+    assert metrics.SEARCH_NODES.get(solver="test")[1] >= 42
+    paths = metrics.LP_PATHS.get(solver="test", path="relaxation")
+    metrics.record_solve("test", "solved", stats={"relaxation": 2, "mip": 1})
+    assert metrics.LP_PATHS.get(solver="test", path="relaxation") == paths + 2
+    path = tmp_path / "sudoku.prom"
+    exporter = metrics.MetricsExporter(metrics.REGISTRY, str(path), 0.01)
+    exporter.start()
+    time.sleep(0.05)
+    exporter.stop()
+    text = path.read_text()
+    assert 'sudoku_solves_total{solver="test",status="solved"}' in text
+    assert "# TYPE sudoku_stage_duration_seconds histogram" in text
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,150 @@
+from src.processors import results
+import csv
+import json
+import threading
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+solution = "693875412145632798782194356357421869816957234429368175274519683968743521531286947"  # noqa: E501
+timings = {"parse": 0.001, "validate": 0.002, "solve": 0.5, "total": 0.503}
+stats = {"nodes": 45012, "backtracks": 44956}
+usage = {"solve": {"peak": 12288, "net": 1024, "blocks": 20}}
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_results.py
+    @brief Module containing tests for the results module.
+
+    @details This script contains tests for the results module. It tests that
+    the ResultWriter writes JSON lines and CSV records that read back
+    unchanged, that a CSV header is written once per file, that a writer
+    replaces the file unless it appends, that records of concurrent threads
+    are not interleaved and that unknown statuses and formats raise a
+    ValueError.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test the JSON lines and CSV formats
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".csv"])
+def test_result_writer_formats(tmp_path, suffix):
+    """!@brief Test ResultWriter records in the JSON lines and CSV formats.
+
+    @details Writes a solved and an invalid sudoku with two writers on the
+    same file (the second appending) and reads the records back (one CSV
+    header only).
+
+    @param tmp_path The pytest temporary directory.
+    @type tmp_path pathlib.Path
+    @param suffix The extension of the result file.
+    @type suffix str
+    """
+    path = str(tmp_path / ("results" + suffix))
+    with results.ResultWriter(path) as writer:
+        writer.write(0, "solved", "cs", solution, timings, stats, usage)
+    with results.ResultWriter(path, buffer_size=1, append=True) as writer:
+        writer.write("hard_1.txt", "invalid", "cs")
+        assert writer.count == 1
+    with open(path, newline="") as file:
+        if suffix == ".jsonl":
+            records = [json.loads(line) for line in file]
+            assert records[0]["timings"] == timings
+            assert records[0]["stats"] == stats
+            assert records[0]["memory"] == usage
+            assert "memory" not in records[1]
+        else:
+            records = list(csv.DictReader(file))
+            assert float(records[0]["time_solve"]) == timings["solve"]
+            assert records[0]["time_verify"] == ""
+            assert json.loads(records[0]["stats"]) == stats
+            assert json.loads(records[0]["memory"]) == usage
+    assert [record["status"] for record in records] == ["solved", "invalid"]
+    assert str(records[1]["id"]) == "hard_1.txt"
+    assert records[0]["solution"] == solution
+
+
+# 2. Test replacing and appending
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".csv"])
+def test_result_writer_append(tmp_path, suffix):
+    """!@brief Test that a writer replaces the file unless it appends.
+
+    @details Writes two records, replaces them with one record and appends
+    one with each of two writers opened before either writes (the CSV header
+    is written once, when the file is replaced).
+
+    @param tmp_path The pytest temporary directory.
+    @type tmp_path pathlib.Path
+    @param suffix The extension of the result file.
+    @type suffix str
+    """
+    path = str(tmp_path / ("results" + suffix))
+    with results.ResultWriter(path) as writer:
+        writer.write(0, "solved", "cs", solution)
+        writer.write(1, "solved", "cs", solution)
+    with results.ResultWriter(path) as writer:
+        writer.write(2, "solved", "cs", solution)
+    first = results.ResultWriter(path, append=True)
+    second = results.ResultWriter(path, append=True)
+    for writer, puzzle_id in ((first, 3), (second, 4)):
+        writer.write(puzzle_id, "invalid", "cs")
+        writer.close()
+    with open(path, newline="") as file:
+        if suffix == ".jsonl":
+            records = [json.loads(line) for line in file]
+        else:
+            records = list(csv.DictReader(file))
+    assert [int(record["id"]) for record in records] == [2, 3, 4]
+
+
+# 3. Test concurrent writes
+
+
+def test_result_writer_threads(tmp_path):
+    """!@brief Test ResultWriter shared by several threads.
+
+    @details Writes 200 records from each of 4 threads with a small buffer
+    and checks that every line of the file is one complete record.
+
+    @param tmp_path The pytest temporary directory.
+    @type tmp_path pathlib.Path
+    """
+    path = str(tmp_path / "results.jsonl")
+
+    def write_records(writer, thread):
+        for i in range(200):
+            writer.write(f"{thread}-{i}", "solved", "cs", solution, timings)
+
+    with results.ResultWriter(path, buffer_size=7) as writer:
+        threads = [
+            threading.Thread(target=write_records, args=(writer, thread))
+            for thread in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    with open(path) as file:
+        ids = [json.loads(line)["id"] for line in file]
+    assert sorted(ids) == sorted(
+        f"{thread}-{i}" for thread in range(4) for i in range(200)
+    )
+
+
+# 4. Test invalid statuses and formats
+
+
+def test_result_writer_errors(tmp_path):
+    """!@brief Test that ResultWriter rejects unknown statuses and formats.
+
+    @param tmp_path The pytest temporary directory.
+    @type tmp_path pathlib.Path
+    """
+    with pytest.raises(ValueError):
+        results.ResultWriter(str(tmp_path / "results.txt"), fmt="xml")
+    with results.ResultWriter(str(tmp_path / "results.jsonl")) as writer:
+        with pytest.raises(ValueError):
+            writer.write(0, "done", "cs")
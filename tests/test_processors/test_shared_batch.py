@@ -0,0 +1,85 @@
+from src.processors import shared_batch, converters
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+medium_arr = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/medium_1.txt"
+)
+medium_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/medium_1_solved.txt"
+)
+medium_line = converters.format_sudoku(medium_arr, "line")
+solved_line = converters.format_sudoku(medium_solved, "line")
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_shared_batch.py
+    @brief Module containing tests for the shared_batch module.
+
+    @details This script contains tests for the shared_batch module. It tests
+    that sudokus loaded into a SharedBatch are read back unchanged by a batch
+    attached by name, that results written in place are read back by the
+    creating batch and that lines which are not sudokus get the status
+    'error'.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test the round trip through shared memory
+
+
+def test_shared_batch_round_trip():
+    """!@brief Test SharedBatch load, attach, write and read back.
+
+    @details Loads the medium sudoku (also with '.' for empty cells), an
+    invalid line, an empty line and a line with a non-ASCII digit, solves
+    the first record through a second batch attached by name and marks the
+    second as unsolvable.
+    """
+    batch = shared_batch.SharedBatch(size=8)
+    try:
+        lines = [
+            medium_line,
+            medium_line.replace("0", "."),
+            "123",
+            "",
+            "\u0661" + medium_line[1:],
+        ]
+        assert batch.load_lines(lines) == 5
+        attached = shared_batch.SharedBatch(name=batch.name)
+        assert attached.size == 8
+        assert attached.get_sudoku(0) == medium_arr
+        assert attached.get_sudoku(1) == medium_arr
+        attached.set_result(0, "solved", medium_solved, {"solve": 0.5})
+        attached.set_result(1, "unsolvable", None, {"parse": 0.1})
+        attached.close()
+        results = batch.get_results()
+        assert results[0] == ("solved", solved_line, {"solve": 0.5})
+        assert results[1] == ("unsolvable", None, {"parse": 0.1})
+        assert results[2] == ("error", None, {})
+        assert results[3] == ("error", None, {})
+        assert results[4] == ("error", None, {})
+        # Reloading resets the statuses and timings of the records
+        batch.load_lines([medium_line])
+        assert batch.records[0]["status"] == shared_batch.PENDING
+        assert batch.get_results() == [("error", None, {})]
+    finally:
+        batch.close()
+        batch.unlink()
+
+
+# 2. Test invalid batches
+
+
+def test_shared_batch_errors():
+    """!@brief Test that SharedBatch rejects a missing size and name and more
+    lines than records."""
+    with pytest.raises(ValueError):
+        shared_batch.SharedBatch()
+    batch = shared_batch.SharedBatch(size=1)
+    try:
+        with pytest.raises(ValueError):
+            batch.load_lines([medium_line] * (batch.size + 1))
+    finally:
+        batch.close()
+        batch.unlink()
@@ -0,0 +1,148 @@
+from src.processors import topology, checkers
+from src.solvers import back_tracking_solver, constraint_satisfaction_solver
+from src.solvers import sat_solver
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+# Solved X-sudoku (both diagonals contain the numbers 1-9)
+x_sudoku_solved = [
+    [1, 2, 3, 4, 5, 6, 7, 8, 9],
+    [4, 5, 6, 7, 8, 9, 1, 2, 3],
+    [7, 8, 9, 1, 2, 3, 4, 5, 6],
+    [2, 1, 4, 3, 6, 5, 8, 9, 7],
+    [3, 6, 8, 9, 7, 2, 5, 1, 4],
+    [5, 9, 7, 8, 1, 4, 6, 3, 2],
+    [9, 4, 1, 6, 3, 8, 2, 7, 5],
+    [8, 3, 2, 5, 4, 7, 9, 6, 1],
+    [6, 7, 5, 2, 9, 1, 3, 4, 8],
+]
+x_sudoku = [
+    [num if (row + col) % 2 == 0 else 0 for col, num in enumerate(line)]
+    for row, line in enumerate(x_sudoku_solved)
+]
+
+# Jigsaw regions: each band of three rows is split into shifted regions
+jigsaw_regions = [
+    [(row // 3) * 3 + ((col + row) % 9) // 3 for col in range(9)]
+    for row in range(9)
+]
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_topology.py
+    @brief Module containing tests for the topology module.
+
+    @details This script contains tests for the topology module. It tests the
+    precomputed tables of the standard sudoku and that the solvers and
+    checkers solve and check X-sudokus and jigsaw sudokus with a custom
+    Topology.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test the standard tables
+
+
+def test_standard_tables():
+    """!@brief Test the precomputed tables of the standard sudoku.
+
+    @details Tests that there are 27 units of 9 cells, that every cell has
+    3 units and 20 peers and that the peers of a cell are its row, column
+    and subgrid.
+    """
+    assert len(topology.UNITS) == 27
+    assert all(len(unit) == 9 for unit in topology.UNITS)
+    assert all(len(units) == 3 for units in topology.CELL_UNITS)
+    assert all(len(peers) == 20 for peers in topology.PEERS)
+    assert topology.PEER_COORDS[40] == tuple(
+        (row, col)
+        for row in range(9)
+        for col in range(9)
+        if (row, col) != (4, 4)
+        and (row == 4 or col == 4 or (row // 3, col // 3) == (1, 1))
+    )
+    assert topology.UNIT_LABELS[18] == "subgrid starting at cell (1, 1)"
+
+
+# 2. Test variant topologies
+
+
+@pytest.mark.parametrize(
+    "regions, diagonals, expected_peers",
+    [
+        (None, True, 26),
+        (jigsaw_regions, False, None),
+        ([[0] * 9] * 9, False, ValueError),
+        ("123456789" * 8, False, ValueError),
+    ],
+)
+def test_topology_variants(regions, diagonals, expected_peers):
+    """!@brief Test Topology with custom regions and diagonals.
+
+    @details This function tests the Topology class. It tests the following
+    cases:
+
+    1. Test an X-sudoku (the corner cells have 26 peers).
+    2. Test a jigsaw sudoku (every cell has 3 units of 9 cells).
+    3. Test regions that are not 9 regions of 9 cells.
+    4. Test regions that do not cover all 81 cells.
+
+    @param regions The regions of the topology.
+    @type regions list of lists or str or None
+    @param diagonals Whether the diagonals are units.
+    @type diagonals bool
+    @param expected_peers The expected number of peers of cell 0, None to
+    only check the units, or ValueError if the regions are invalid.
+    @type expected_peers int or None or type
+    """
+    if expected_peers is ValueError:
+        with pytest.raises(ValueError):
+            topology.Topology(regions, diagonals)
+        return
+    variant = topology.Topology(regions, diagonals)
+    assert all(len(unit) == 9 for unit in variant.units)
+    if expected_peers is not None:
+        assert len(variant.peers[0]) == expected_peers
+    else:
+        assert all(len(units) == 3 for units in variant.cell_units)
+
+
+# 3. Test solving and checking variants
+
+
+@pytest.mark.parametrize(
+    "solve_function",
+    [
+        back_tracking_solver.solve_sudoku_bt,
+        constraint_satisfaction_solver.solve_sudoku_cs,
+        sat_solver.solve_sudoku_sat,
+    ],
+)
+def test_solve_x_sudoku(solve_function):
+    """!@brief Test the solvers and checkers with an X-sudoku.
+
+    @param solve_function The solver function.
+    @type solve_function function
+    @return assertion True if the solved sudoku is a solved X-sudoku.
+    """
+    solved = solve_function(x_sudoku, topology=topology.X_SUDOKU)
+    assert checkers.is_sudoku_solved(solved, topology.X_SUDOKU)
+    assert all(
+        x_sudoku[row][col] in (0, solved[row][col])
+        for row in range(9)
+        for col in range(9)
+    )
+
+
+def test_solve_jigsaw_sudoku():
+    """!@brief Test the SAT solver and checkers with a jigsaw sudoku.
+
+    @details Solves the empty jigsaw sudoku and checks that the solution is
+    solved for the jigsaw regions but not for the standard subgrids.
+    """
+    jigsaw = topology.Topology(jigsaw_regions)
+    solved = sat_solver.solve_sudoku_sat(
+        [[0] * 9 for _ in range(9)], topology=jigsaw
+    )
+    assert checkers.is_sudoku_solved(solved, jigsaw)
+    assert not checkers.is_sudoku_valid(solved)
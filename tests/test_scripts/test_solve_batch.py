@@ -0,0 +1,108 @@
+from src import solve_batch
+from src.processors import converters
+import gzip
+import json
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+easy_line = converters.format_sudoku(
+    converters.convert_sudoku_txt_to_arr("tests_resources/easy_1.txt"), "line"
+)
+# 50 sudokus: line 3 has a non-ASCII byte, line 7 is too short
+corpus_lines = [easy_line.encode("ascii")] * 50
+corpus_lines[3] = b"\xff" + corpus_lines[3][1:]
+corpus_lines[7] = corpus_lines[7][:80]
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_solve_batch.py
+    @brief Module containing tests for the solve_batch script.
+
+    @details This script contains tests for the solve_batch script. It tests
+    that the start and stop of a batch are clamped to the corpus and that
+    lines that cannot be parsed (including non-ASCII lines) get the status
+    error, with one and two processes and with plain and compressed corpora,
+    and that a second run replaces the result file unless it appends.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test start, stop and bad lines of a batch
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+@pytest.mark.parametrize("compressed", [False, True])
+@pytest.mark.parametrize(
+    "start, stop, expected_ids",
+    [
+        (0, None, range(50)),
+        (40, 100, range(40, 50)),
+        (2, 9, range(2, 9)),
+        (60, 100, range(0)),
+    ],
+)
+def test_solve_batch_range(
+    tmp_path, processes, compressed, start, stop, expected_ids
+):
+    """!@brief Test the records of a range of a corpus.
+
+    @param tmp_path The temporary directory of the test.
+    @type tmp_path pathlib.Path
+    @param processes The number of processes.
+    @type processes int
+    @param compressed Whether the corpus is compressed with gzip.
+    @type compressed bool
+    @param start The index of the first sudoku.
+    @type start int
+    @param stop The index after the last sudoku.
+    @type stop int
+    @param expected_ids The expected ids of the records.
+    @type expected_ids range
+    """
+    corpus_data = b"\n".join(corpus_lines) + b"\n"
+    corpus_file = tmp_path / "corpus.txt"
+    if compressed:
+        corpus_file = tmp_path / "corpus.txt.gz"
+        corpus_data = gzip.compress(corpus_data)
+    corpus_file.write_bytes(corpus_data)
+    results_file = tmp_path / "results.jsonl"
+    counts = solve_batch.solve_batch(
+        str(corpus_file),
+        str(results_file),
+        processes=processes,
+        start=start,
+        stop=stop,
+    )
+    records = [json.loads(line) for line in open(results_file)]
+    assert [record["id"] for record in records] == list(expected_ids)
+    expected_errors = len({3, 7} & set(expected_ids))
+    assert counts["error"] == expected_errors
+    assert counts["solved"] == len(expected_ids) - expected_errors
+
+
+# 2. Test re-running a batch
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".csv"])
+def test_solve_batch_rerun(tmp_path, suffix):
+    """!@brief Test that a re-run replaces the results and --append resumes.
+
+    @param tmp_path The temporary directory of the test.
+    @type tmp_path pathlib.Path
+    @param suffix The extension of the result file.
+    @type suffix str
+    """
+    corpus_file = tmp_path / "corpus.txt"
+    corpus_file.write_text((easy_line + "\n") * 4)
+    results_file = str(tmp_path / ("results" + suffix))
+    for _ in range(2):
+        solve_batch.solve_batch(str(corpus_file), results_file, stop=2)
+    solve_batch.solve_batch(
+        str(corpus_file), results_file, processes=2, start=2, append=True
+    )
+    with open(results_file) as file:
+        lines = file.read().splitlines()
+    if suffix == ".csv":
+        assert lines[0].startswith("id,")
+        lines = lines[1:]
+    assert len(lines) == 4
@@ -0,0 +1,153 @@
+from src import solve_server
+from src.solvers import parallel_solver
+from src.processors import converters
+import os
+import json
+import signal
+import time
+import asyncio
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+easy_line = converters.format_sudoku(
+    converters.convert_sudoku_txt_to_arr("tests_resources/easy_1.txt"), "line"
+)
+extreme_line = converters.format_sudoku(
+    converters.convert_sudoku_txt_to_arr("tests_resources/extreme_1.txt"),
+    "line",
+)
+
+
+def pcs_stats(grid):
+    """!@brief Solve a sudoku with pcs (2 processes) and return the stats."""
+    stats = {}
+    sudoku = converters.convert_sudoku_line_to_arr(grid)
+    parallel_solver.solve_sudoku_pcs(sudoku, processes=2, stats=stats)
+    return stats
+
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_solve_server.py
+    @brief Module containing tests for the solve_server script.
+
+    @details This script contains tests for the solve_server script. It tests
+    that a worker stops a solve at the deadline of its request and disarms
+    the timer afterwards, that client solver names are mapped to a bounded
+    set of metrics labels, that idle connections do not block the requests
+    of other connections and that pcs does not start a pool of its own in
+    the server workers.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test the deadline of solve_request
+
+
+@pytest.mark.parametrize(
+    "grid, solver, budget, expected_status",
+    [
+        (extreme_line, "bt", 0.2, "timeout"),
+        (extreme_line, "cs", -1.0, "timeout"),
+        (easy_line, "cs", 10.0, "solved"),
+    ],
+)
+def test_solve_request_deadline(grid, solver, budget, expected_status):
+    """!@brief Test that solve_request stops at the deadline.
+
+    @param grid The sudoku in 'line' format.
+    @type grid str
+    @param solver The solver name.
+    @type solver str
+    @param budget The time budget in seconds (negative if already expired).
+    @type budget float
+    @param expected_status The expected status of the response.
+    @type expected_status str
+    """
+    # The workers load the solvers in init_worker
+    solve_server.registry.get_solver(solver)
+    start_time = time.time()
+    response = solve_server.solve_request(grid, solver, start_time + budget)
+    assert response["status"] == expected_status
+    assert time.time() - start_time < max(budget, 0) + 1
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+
+# 2. Test the solver metrics label
+
+
+@pytest.mark.parametrize(
+    "solver, expected_label",
+    [
+        ("cs", "cs"),
+        ("pcs", "pcs"),
+        ("no-such-solver", "unknown"),
+        (["cs"], "unknown"),
+        (None, "unknown"),
+    ],
+)
+def test_solver_label(solver, expected_label):
+    """!@brief Test that unknown solver names share one metrics label.
+
+    @param solver The solver named by the request.
+    @type solver any
+    @param expected_label The expected metrics label.
+    @type expected_label str
+    """
+    assert solve_server._solver_label(solver) == expected_label
+
+
+# 3. Test that idle connections hold no in-flight permit
+
+
+def test_idle_connection_does_not_block(tmp_path):
+    """!@brief Test that a request is served while another connection is
+    idle and max_inflight is 1.
+
+    @param tmp_path The temporary directory of the Unix socket.
+    @type tmp_path pathlib.Path
+    """
+    path = str(tmp_path / "sudoku.sock")
+
+    async def run():
+        server = solve_server.SolveServer(workers=1, max_inflight=1)
+        serving = asyncio.ensure_future(server.serve(unix_path=path))
+        while not os.path.exists(path):
+            await asyncio.sleep(0.05)
+        try:
+            _, idle_writer = await asyncio.open_unix_connection(path)
+            await asyncio.sleep(0.1)
+            reader, writer = await asyncio.open_unix_connection(path)
+            for request_id in (1, 2):
+                request = {"id": request_id, "grid": easy_line}
+                writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            responses = [
+                json.loads(await asyncio.wait_for(reader.readline(), 10))
+                for _ in range(2)
+            ]
+            for stream in (idle_writer, writer):
+                stream.close()
+        finally:
+            server.stop()
+            await serving
+        return responses
+
+    responses = asyncio.run(run())
+    assert sorted(response["id"] for response in responses) == [1, 2]
+    assert all(response["status"] == "solved" for response in responses)
+
+
+# 4. Test pcs in the server workers
+
+
+def test_pcs_in_server_worker():
+    """!@brief Test that pcs searches its subproblems in the server worker
+    instead of starting a pool in every worker."""
+    pool = solve_server.SolveServer(workers=1)._create_pool()
+    try:
+        assert pool.submit(pcs_stats, easy_line).result()["processes"] == 1
+        response = pool.submit(solve_server.solve_request, easy_line, "pcs")
+        assert response.result()["status"] == "solved"
+    finally:
+        pool.shutdown()
@@ -0,0 +1,66 @@
+from src import solve_sudoku
+from src.processors import results
+import json
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+easy_file = "tests_resources/easy_1.txt"
+rules_invalid_file = "tests_resources/sudoku_valid_solved_rules_invalid.txt"
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_solve_sudoku.py
+    @brief Module containing tests for the solve_sudoku script.
+
+    @details This script contains tests for the solve_sudoku script. It tests
+    that an invalid solver name falls back to the default solver before the
+    first result is recorded, so the raw name never becomes a metrics label
+    or the solver of a result record.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test the solver of the recorded results
+
+
+@pytest.mark.parametrize(
+    "sudoku_file, solver, expected_status, expected_solver",
+    [
+        (rules_invalid_file, "no-such-solver", "invalid", "cs"),
+        (easy_file, "no-such-solver", "solved", "cs"),
+        (rules_invalid_file, "bt", "invalid", "bt"),
+    ],
+)
+def test_solve_sudoku_solver_label(
+    tmp_path, sudoku_file, solver, expected_status, expected_solver
+):
+    """!@brief Test the solver label of the metrics and the result record.
+
+    @param tmp_path The temporary directory of the result file.
+    @type tmp_path pathlib.Path
+    @param sudoku_file The path to the sudoku file.
+    @type sudoku_file str
+    @param solver The solver argument.
+    @type solver str
+    @param expected_status The expected status of the solve.
+    @type expected_status str
+    @param expected_solver The expected solver label.
+    @type expected_solver str
+    """
+    solves = solve_sudoku.metrics.SOLVES
+    before = solves.get(solver=expected_solver, status=expected_status)
+    results_file = str(tmp_path / "results.jsonl")
+    with results.ResultWriter(results_file) as writer:
+        solve_sudoku.solve_sudoku(sudoku_file, solver, results=writer)
+    with open(results_file) as file:
+        record = json.loads(file.readline())
+    assert (record["status"], record["solver"]) == (
+        expected_status,
+        expected_solver,
+    )
+    assert solves.get(solver=expected_solver, status=expected_status) == (
+        before + 1
+    )
+    assert solves.get(solver=solver, status=expected_status) == (
+        before + 1 if solver == expected_solver else 0
+    )
@@ -1,4 +1,5 @@
 from src.solvers import constraint_satisfaction_solver
+from src.solvers import observers
 from src.processors import converters
 import pytest
 
@@ -73,3 +74,111 @@ def test_solve_sudoku_cs(sudoku_files, expected_solved):
         constraint_satisfaction_solver.solve_sudoku_cs(sudoku_not_yet_solved)
         == expected_solved
     )
+
+
+# 2. Test value orderings of solve_sudoku_cs
+
+
+@pytest.mark.parametrize("ordering", ["ascending", "lcv", "random"])
+@pytest.mark.parametrize(
+    "sudoku_files, expected_solved",
+    [
+        ("tests_resources/medium_1.txt", medium_solved),
+        ("tests_resources/sudoku_valid_unsolveable.txt", None),
+    ],
+)
+def test_solve_sudoku_cs_orderings(sudoku_files, expected_solved, ordering):
+    """!@brief Test solve_sudoku_cs with each value ordering.
+
+    @details Checks that every ordering finds the solution (or None for an
+    unsolvable sudoku) and that two solves with the same seed search the
+    same number of nodes.
+
+    @param sudoku_files The path to the sudoku file to be solved.
+    @type sudoku_files str
+    @param expected_solved The expected solved sudoku.
+    @type expected_solved list of lists or None
+    @param ordering The value ordering.
+    @type ordering str
+    """
+    sudoku = converters.convert_sudoku_txt_to_arr(sudoku_files)
+    stats = [{}, {}]
+    for run_stats in stats:
+        assert (
+            constraint_satisfaction_solver.solve_sudoku_cs(
+                sudoku, stats=run_stats, ordering=ordering, seed=7
+            )
+            == expected_solved
+        )
+    assert stats[0] == stats[1]
+
+
+# 3. Test order_least_constraining
+
+
+def test_order_least_constraining():
+    """!@brief Test the least-constraining-value ordering and that unknown
+    orderings raise a ValueError.
+
+    @details In an empty grid with 1 and 2 placed in the first column of
+    the top-middle and top-right subgrids, placing 3 in the top-left cell
+    eliminates a candidate of all 20 peers, while 1 and 2 are already ruled
+    out for some of them.
+    """
+    sudoku = [[0] * 9 for _ in range(9)]
+    sudoku[1][3] = 1
+    sudoku[1][6] = 2
+    order = constraint_satisfaction_solver.order_least_constraining(
+        sudoku, 0, 0, [1, 2, 3]
+    )
+    assert order[-1] == 3
+    with pytest.raises(ValueError):
+        constraint_satisfaction_solver.solve_sudoku_cs(sudoku, ordering="most")
+
+
+# 4. Test the cbj mode of solve_sudoku_cs
+
+
+@pytest.mark.parametrize(
+    "sudoku_files, expected_solved",
+    [
+        ("tests_resources/sudoku_valid_not_yet_solved.txt", sudoku_solved),
+        ("tests_resources/easy_1.txt", easy_solved),
+        ("tests_resources/medium_1.txt", medium_solved),
+        ("tests_resources/hard_1.txt", hard_solved),
+        ("tests_resources/sudoku_valid_unsolveable.txt", None),
+        ("tests_resources/sudoku_valid_rules_invalid.txt", None),
+    ],
+)
+def test_solve_sudoku_cs_cbj(sudoku_files, expected_solved):
+    """!@brief Test solve_sudoku_cs with conflict-directed backjumping.
+
+    @details Checks that the cbj mode finds the same solution (or None) as
+    the chronological search without placing more numbers, and that a
+    TraceRecorder trace of the cbj search replays to the solution.
+
+    @param sudoku_files The path to the sudoku file to be solved.
+    @type sudoku_files str
+    @param expected_solved The expected solved sudoku.
+    @type expected_solved list of lists or None
+    """
+    sudoku = converters.convert_sudoku_txt_to_arr(sudoku_files)
+    stats = {}
+    chronological_stats = {}
+    recorder = observers.TraceRecorder()
+    assert (
+        constraint_satisfaction_solver.solve_sudoku_cs(
+            sudoku, stats=stats, observer=recorder, mode="cbj"
+        )
+        == expected_solved
+    )
+    constraint_satisfaction_solver.solve_sudoku_cs(
+        sudoku, stats=chronological_stats
+    )
+    assert stats["nodes"] <= chronological_stats["nodes"]
+    assert {"backjumps", "nogoods", "nogood_prunes"} <= set(stats)
+    assert len(recorder) >= stats["nodes"] + stats["backtracks"]
+    if expected_solved is not None:
+        for *_, grid in recorder.replay(sudoku):
+            pass
+        assert grid == expected_solved
@@ -0,0 +1,130 @@
+from src.solvers import domains
+from src.solvers import constraint_satisfaction_solver
+from src.solvers.observers import TraceRecorder
+from src.processors import converters, checkers
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+easy_arr = converters.convert_sudoku_txt_to_arr("tests_resources/easy_1.txt")
+easy_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/easy_1_solved.txt"
+)
+hard_arr = converters.convert_sudoku_txt_to_arr("tests_resources/hard_1.txt")
+hard_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/hard_1_solved.txt"
+)
+unsolvable_arr = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/sudoku_valid_unsolveable.txt"
+)
+invalid_arr = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/sudoku_valid_rules_invalid.txt"
+)
+# A sudoku that propagation alone does not solve (AI Escargot)
+escargot_arr = [
+    [1, 0, 0, 0, 0, 7, 0, 9, 0],
+    [0, 3, 0, 0, 2, 0, 0, 0, 8],
+    [0, 0, 9, 6, 0, 0, 5, 0, 0],
+    [0, 0, 5, 3, 0, 0, 9, 0, 0],
+    [0, 1, 0, 0, 8, 0, 0, 0, 2],
+    [6, 0, 0, 0, 0, 4, 0, 0, 0],
+    [3, 0, 0, 0, 0, 0, 0, 1, 0],
+    [0, 4, 0, 0, 0, 0, 0, 0, 7],
+    [0, 0, 7, 0, 0, 0, 3, 0, 0],
+]
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_domains.py
+    @brief Module containing tests for the domains module.
+
+    @details This script contains tests for the domains module. It tests that
+    undoing the trail to a checkpoint restores the domains exactly, that
+    assignments propagate to the peers and fail on a wipe-out, and that the
+    'propagate' mode of the cs solver solves the test sudokus with a bounded
+    trail and a replayable trace of its decisions.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test undoing to a checkpoint
+
+
+@pytest.mark.parametrize("sudoku", [easy_arr, hard_arr, escargot_arr])
+def test_undo(sudoku):
+    """!@brief Test that undo restores the domains of a checkpoint.
+
+    @param sudoku The sudoku array.
+    @type sudoku list of lists
+    """
+    store = domains.DomainStore()
+    assert store.load(sudoku)
+    checkpoint = store.checkpoint()
+    saved = list(store.domains)
+    for cell in range(81):
+        candidates = store.candidates(cell)
+        if len(candidates) > 1:
+            store.assign(cell, 1 << (candidates[-1] - 1))
+    store.undo(checkpoint)
+    assert store.domains == saved
+    assert store.checkpoint() == checkpoint
+
+
+# 2. Test the propagation of assignments
+
+
+def test_assign():
+    """!@brief Test that an assignment is eliminated from the peers and that
+    a contradicting assignment fails."""
+    store = domains.DomainStore()
+    assert store.assign(0, 1 << 4)
+    assert store.candidates(0) == [5]
+    for peer in (1, 8, 9, 20, 72):
+        assert 5 not in store.candidates(peer)
+    assert 5 in store.candidates(30)
+    assert not store.assign(1, 1 << 4)
+
+
+# 3. Test the propagate mode of the cs solver
+
+
+@pytest.mark.parametrize(
+    "sudoku, expected_solution",
+    [
+        (easy_arr, easy_solved),
+        (hard_arr, hard_solved),
+        (escargot_arr, None),
+        (unsolvable_arr, None),
+        (invalid_arr, None),
+    ],
+)
+@pytest.mark.parametrize("cell_order", ["row", "mrv"])
+def test_solve_propagate(sudoku, expected_solution, cell_order):
+    """!@brief Test the propagate mode of the cs solver.
+
+    @param sudoku The sudoku array.
+    @type sudoku list of lists
+    @param expected_solution The expected solved sudoku array (None if the
+    solution is only checked or the sudoku is unsolvable).
+    @type expected_solution list of lists
+    @param cell_order The cell order of the search.
+    @type cell_order str
+    """
+    solve_sudoku_cs = constraint_satisfaction_solver.solve_sudoku_cs
+    stats = {}
+    recorder = TraceRecorder()
+    result = solve_sudoku_cs(
+        sudoku,
+        mode="propagate",
+        cell_order=cell_order,
+        stats=stats,
+        observer=recorder,
+    )
+    if sudoku is escargot_arr:
+        assert checkers.is_sudoku_solved(result)
+        assert stats["nodes"] > 0
+        # The decisions replay on the sudoku (a mismatch raises ValueError)
+        assert len(list(recorder.replay(sudoku))) == len(recorder)
+    else:
+        assert result == expected_solution
+    assert stats["nodes"] - stats["backtracks"] <= 81
+    assert stats["trail_peak"] <= 729
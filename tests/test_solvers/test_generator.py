@@ -0,0 +1,126 @@
+from src.solvers import generator
+from src.processors import checkers, converters
+import random
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+sudoku_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/sudoku_valid_solved.txt"
+)
+
+empty_sudoku = [[0] * 9 for _ in range(9)]
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_generator.py
+    @brief Module containing tests for the generator module.
+
+    @details This script contains tests for the generator module. It tests the
+    following functions: count_solutions, generate_solution, generate_sudoku
+    and generate_sudokus. The test resources are located in the
+    tests_resources folder.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test count_solutions
+
+
+@pytest.mark.parametrize(
+    "sudoku_files, expected_count",
+    [
+        ("tests_resources/sudoku_valid_not_yet_solved.txt", 1),
+        ("tests_resources/easy_1.txt", 1),
+        ("tests_resources/hard_1.txt", 1),
+        ("tests_resources/sudoku_valid_solved.txt", 1),
+        ("tests_resources/sudoku_valid_unsolveable.txt", 0),
+        ("tests_resources/sudoku_valid_rules_invalid.txt", 0),
+    ],
+)
+def test_count_solutions(sudoku_files, expected_count):
+    """!@brief Test count_solutions function.
+
+    @details This function tests the count_solutions function. It tests the
+    following cases:
+
+    1. Test count_solutions with a valid sudoku that is not yet solved.
+    2. Test count_solutions with an easy sudoku.
+    3. Test count_solutions with a hard sudoku.
+    4. Test count_solutions with a solved sudoku.
+    5. Test count_solutions with a sudoku that is unsolveable.
+    6. Test count_solutions with a sudoku that is invalid.
+
+    @param sudoku_files The path to the sudoku file.
+    @type sudoku_files str
+    @param expected_count The expected number of solutions.
+    @type expected_count int
+    @return assertion True if the number of solutions is as expected.
+    """
+    sudoku = converters.convert_sudoku_txt_to_arr(sudoku_files)
+    assert generator.count_solutions(sudoku) == expected_count
+    assert generator.count_solutions(empty_sudoku, limit=5) == 5
+
+
+# 2. Test generate_sudoku
+
+
+@pytest.mark.parametrize(
+    "tier, target_clues", [("easy", None), ("hard", None), (None, 30)]
+)
+def test_generate_sudoku(tier, target_clues):
+    """!@brief Test generate_sudoku function.
+
+    @details This function tests that generate_sudoku returns a sudoku with
+    a unique solution that reaches the target number of clues, together with
+    its solution, and that the result only depends on the seed.
+
+    @param tier The difficulty tier.
+    @type tier str
+    @param target_clues The target number of clues.
+    @type target_clues int
+    """
+    sudoku, sudoku_solved = generator.generate_sudoku(
+        target_clues, tier, random.Random(7)
+    )
+    clues = sum(num != 0 for row in sudoku for num in row)
+    assert clues == (target_clues or generator.TIERS[tier])
+    assert generator.count_solutions(sudoku) == 1
+    assert checkers.is_sudoku_solved(sudoku_solved)
+    assert all(
+        num in (0, sudoku_solved[row][col])
+        for row in range(9)
+        for col, num in enumerate(sudoku[row])
+    )
+    assert generator.generate_sudoku(target_clues, tier, random.Random(7)) == (
+        sudoku,
+        sudoku_solved,
+    )
+    assert checkers.is_sudoku_solved(generator.generate_solution())
+
+
+# 3. Test generate_sudokus
+
+
+def test_generate_sudokus():
+    """!@brief Test generate_sudokus function.
+
+    @details This function tests that generating in parallel gives the same
+    sudokus as generating in a single process for the same seed and chunk
+    size, and that an unknown tier raises a ValueError.
+    """
+    sequential = list(
+        generator.generate_sudokus(10, tier="medium", seed=3, processes=1)
+    )
+    parallel = list(
+        generator.generate_sudokus(
+            10, tier="medium", seed=3, processes=2, chunk_size=3
+        )
+    )
+    assert len(sequential) == 10
+    assert parallel == list(
+        generator.generate_sudokus(
+            10, tier="medium", seed=3, processes=1, chunk_size=3
+        )
+    )
+    with pytest.raises(ValueError):
+        generator.generate_sudoku(tier="impossible")
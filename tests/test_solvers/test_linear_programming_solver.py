@@ -1,4 +1,4 @@
-from src.solvers import linear_programming_solver
+from src.solvers import linear_programming_solver, registry
 from src.processors import converters
 import pytest
 
@@ -21,12 +21,23 @@ hard_solved = converters.convert_sudoku_txt_to_arr(
     "tests_resources/hard_1_solved.txt"
 )
 
+batch_files = [
+    "tests_resources/easy_1.txt",
+    "tests_resources/sudoku_valid_unsolveable.txt",
+    "tests_resources/medium_1.txt",
+    "tests_resources/sudoku_valid_rules_invalid.txt",
+    "tests_resources/hard_1.txt",
+]
+batch_solved = [easy_solved, None, medium_solved, None, hard_solved]
+
 # === MAIN FUNCTION TESTS =====================================================
 """!@file test_linear_programming_solver.py
     @brief Module containing tests for the linear_programming_solver module.
 
     @details This script contains tests for the linear_programming_solver
-    module. It tests the following function: solve_sudoku_lp.
+    module. It tests the following functions: solve_sudoku_lp (also with
+    the relaxation first), solve_sudoku_lp_batch (also with the relaxation
+    first) and solve_sudoku_lpr (the registered lpr solver).
     The tests are parametrised to test a variety of different inputs. The test
     resources are located in the tests_resources folder.
 
@@ -73,3 +84,104 @@ def test_solve_sudoku_lp(sudoku_files, expected_solved):
         linear_programming_solver.solve_sudoku_lp(sudoku_not_yet_solved)
         == expected_solved
     )
+
+
+# 2. Test solve_sudoku_lp with the relaxation first
+
+
+@pytest.mark.parametrize(
+    "sudoku_files, expected_solved, fix_integral",
+    [
+        ("tests_resources/easy_1.txt", easy_solved, False),
+        ("tests_resources/hard_1.txt", hard_solved, True),
+        ("tests_resources/sudoku_valid_unsolveable.txt", None, False),
+        ("tests_resources/sudoku_valid_rules_invalid.txt", None, True),
+    ],
+)
+def test_solve_sudoku_lp_relaxation(
+    sudoku_files, expected_solved, fix_integral
+):
+    """!@brief Test solve_sudoku_lp function with the relaxation first.
+
+    @details Tests that the relaxation first mode (with and without fixing
+    the integral cells) returns the same solutions as the integer problem
+    and that the stats count exactly one path per sudoku.
+
+    @param sudoku_files The path to the sudoku file to be solved.
+    @type sudoku_files str
+    @param expected_solved The expected solved sudoku.
+    @type expected_solved list of lists or None
+    @param fix_integral Whether to fix the integral cells.
+    @type fix_integral bool
+    @return assertion True if the solved sudoku is equal to the expected
+    solved sudoku and one path was counted.
+    """
+    sudoku_not_yet_solved = converters.convert_sudoku_txt_to_arr(sudoku_files)
+    stats = {}
+    assert (
+        linear_programming_solver.solve_sudoku_lp(
+            sudoku_not_yet_solved,
+            relaxation=True,
+            fix_integral=fix_integral,
+            stats=stats,
+        )
+        == expected_solved
+    )
+    assert sum(stats.values()) == 1
+    assert set(stats) <= {"relaxation", "mip_fixed", "mip", "infeasible"}
+
+
+# 3. Test solve_sudoku_lp_batch
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 5])
+def test_solve_sudoku_lp_batch(block_size):
+    """!@brief Test solve_sudoku_lp_batch function.
+
+    @details Solves easy, unsolveable, medium, invalid and hard sudokus in
+    blocks of 1, 2 and 5 sudokus. Blocks with an unsolveable sudoku fall
+    back to solving each sudoku on its own.
+
+    @param block_size The number of sudokus per problem.
+    @type block_size int
+    @return assertion True if the solved sudokus are equal to the expected
+    solved sudokus, in the order of the input.
+    """
+    sudokus = [converters.convert_sudoku_txt_to_arr(f) for f in batch_files]
+    assert (
+        linear_programming_solver.solve_sudoku_lp_batch(sudokus, block_size)
+        == batch_solved
+    )
+
+
+# 4. Test the relaxation first in batches and the lpr solver
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 5])
+def test_solve_sudoku_lp_batch_relaxation(block_size):
+    """!@brief Test solve_sudoku_lp_batch with the relaxation first.
+
+    @details The solutions are the same as with the integer problem and the
+    stats count one path for each sudoku whose givens are valid (4 of 5).
+
+    @param block_size The number of sudokus per problem.
+    @type block_size int
+    """
+    sudokus = [converters.convert_sudoku_txt_to_arr(f) for f in batch_files]
+    stats = {}
+    assert (
+        linear_programming_solver.solve_sudoku_lp_batch(
+            sudokus, block_size, relaxation=True, stats=stats
+        )
+        == batch_solved
+    )
+    assert sum(stats.values()) == 4
+    assert set(stats) <= {"relaxation", "mip_fixed", "mip", "infeasible"}
+
+
+def test_solve_sudoku_lpr():
+    """!@brief Test the lpr solver of the registry and its path stats."""
+    sudoku = converters.convert_sudoku_txt_to_arr("tests_resources/hard_1.txt")
+    stats = {}
+    assert registry.get_solver("lpr")(sudoku, stats=stats) == hard_solved
+    assert sum(stats.values()) == 1
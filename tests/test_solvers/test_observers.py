@@ -0,0 +1,124 @@
+from src.solvers import observers
+from src.solvers import back_tracking_solver, constraint_satisfaction_solver
+from src.processors import converters
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+medium_arr = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/medium_1.txt"
+)
+medium_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/medium_1_solved.txt"
+)
+easy_arr = converters.convert_sudoku_txt_to_arr("tests_resources/easy_1.txt")
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_observers.py
+    @brief Module containing tests for the observers module.
+
+    @details This script contains tests for the observers module. It tests
+    that the backtracking and constraint satisfaction solvers report every
+    assign, backtrack and contradiction to an observer (in every search
+    mode), that the solution is the same with and without an observer and
+    that a TraceRecorder trace is saved, loaded and replayed unchanged.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test observed solves
+
+
+@pytest.mark.parametrize(
+    "solve_function",
+    [
+        back_tracking_solver.solve_sudoku_bt,
+        constraint_satisfaction_solver.solve_sudoku_cs,
+    ],
+)
+def test_trace_recorder(solve_function, tmp_path):
+    """!@brief Test TraceRecorder with the bt and cs solvers.
+
+    @details Solves the medium sudoku with a TraceRecorder and checks that
+    the event counts match the search statistics, that the saved and loaded
+    trace replays to the solution and that the base SearchObserver does not
+    change the result.
+
+    @param solve_function The solver function.
+    @type solve_function function
+    @param tmp_path The pytest temporary directory.
+    @type tmp_path pathlib.Path
+    """
+    recorder = observers.TraceRecorder()
+    stats = {}
+    solved = solve_function(medium_arr, stats=stats, observer=recorder)
+    assert solved == medium_solved
+    assert solve_function(medium_arr, observer=observers.SearchObserver())
+    kinds = [event[0] for event in recorder.events()]
+    assert kinds.count(observers.ASSIGN) == stats["nodes"]
+    assert kinds.count(observers.UNASSIGN) == stats["backtracks"]
+    assert kinds.count(observers.CONTRADICTION) > 0
+    trace_file = str(tmp_path / "trace.bin")
+    recorder.save(trace_file)
+    loaded = observers.TraceRecorder.load(trace_file)
+    assert loaded.trace == recorder.trace
+    for kind, row, col, num, grid in loaded.replay(medium_arr):
+        pass
+    assert grid == medium_solved
+
+
+# 2. Test invalid traces
+
+
+def test_trace_recorder_errors(tmp_path):
+    """!@brief Test that invalid trace files and replays raise a ValueError.
+
+    @param tmp_path The pytest temporary directory.
+    @type tmp_path pathlib.Path
+    """
+    trace_file = tmp_path / "trace.bin"
+    trace_file.write_bytes(b"not a trace")
+    with pytest.raises(ValueError):
+        observers.TraceRecorder.load(str(trace_file))
+    recorder = observers.TraceRecorder()
+    constraint_satisfaction_solver.solve_sudoku_cs(
+        medium_arr, observer=recorder
+    )
+    with pytest.raises(ValueError):
+        list(recorder.replay(easy_arr))
+
+
+# 3. Test observed search modes
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"mode": "cbj"},
+        {"cell_order": "mrv"},
+        {"mode": "propagate"},
+        {"mode": "propagate", "cell_order": "mrv"},
+    ],
+)
+def test_observed_search_modes(options):
+    """!@brief Test the observed searches of the other cs modes.
+
+    @details The observed and unobserved searches are separate copies, so
+    both must give the same solution and statistics, and the observer must
+    see every number placed and taken back by the search.
+
+    @param options The keyword arguments of solve_sudoku_cs.
+    @type options dict
+    """
+    recorder = observers.TraceRecorder()
+    stats, observed_stats = {}, {}
+    solve = constraint_satisfaction_solver.solve_sudoku_cs
+    assert solve(medium_arr, stats=stats, **options) == medium_solved
+    solved = solve(
+        medium_arr, stats=observed_stats, observer=recorder, **options
+    )
+    assert solved == medium_solved
+    assert observed_stats == stats
+    kinds = [event[0] for event in recorder.events()]
+    assert kinds.count(observers.ASSIGN) == stats["nodes"]
+    assert kinds.count(observers.UNASSIGN) == stats["backtracks"]
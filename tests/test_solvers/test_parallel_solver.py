@@ -0,0 +1,142 @@
+from src.solvers import parallel_solver
+from src.processors import converters
+import multiprocessing
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+sudoku_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/sudoku_valid_solved.txt"
+)
+
+easy_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/easy_1_solved.txt"
+)
+
+medium_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/medium_1_solved.txt"
+)
+
+hard_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/hard_1_solved.txt"
+)
+
+# Easy sudoku with the first two rows cleared (20 solutions)
+multiple_arr = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/easy_1.txt"
+)
+multiple_arr[0] = [0] * 9
+multiple_arr[1] = [0] * 9
+
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_parallel_solver.py
+    @brief Module containing tests for the parallel_solver module.
+
+    @details This script contains tests for the parallel_solver module.
+    It tests the following functions: solve_sudoku_pcs,
+    count_solutions_pcs, including calls from a daemonic pool worker.
+    The tests are parametrised to test a variety of different inputs. The test
+    resources are located in the tests_resources folder.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test solve_sudoku_pcs
+
+
+@pytest.mark.parametrize(
+    "sudoku_files, expected_solved",
+    [
+        ("tests_resources/sudoku_valid_not_yet_solved.txt", sudoku_solved),
+        ("tests_resources/easy_1.txt", easy_solved),
+        ("tests_resources/medium_1.txt", medium_solved),
+        ("tests_resources/hard_1.txt", hard_solved),
+        ("tests_resources/sudoku_valid_unsolveable.txt", None),
+        ("tests_resources/sudoku_valid_rules_invalid.txt", None),
+    ],
+)
+def test_solve_sudoku_pcs(sudoku_files, expected_solved):
+    """!@brief Test solve_sudoku_pcs function.
+
+    @details This function tests the solve_sudoku_pcs function. It
+    tests the following cases:
+
+    1. Test solve_sudoku_pcs with a valid sudoku that is not yet solved.
+    2. Test solve_sudoku_pcs with a easy sudoku that is not yet solved.
+    3. Test solve_sudoku_pcs with a medium sudoku that is not yet solved.
+    4. Test solve_sudoku_pcs with a hard sudoku that is not yet solved.
+    5. Test solve_sudoku_pcs with a sudoku that is unsolveable.
+    6. Test solve_sudoku_pcs with a sudoku that is invalid.
+
+    @param sudoku_files The path to the sudoku file to be solved.
+    @type sudoku_files str
+    @param expected_solved The expected solved sudoku.
+    @type expected_solved list of lists or None
+    @return assertion True if the solved sudoku is equal to the expected solved
+    sudoku. Or if the sudoku is unsolvable or invalid, then the solved sudoku
+    should be None.
+    """
+    sudoku_not_yet_solved = converters.convert_sudoku_txt_to_arr(sudoku_files)
+    assert (
+        parallel_solver.solve_sudoku_pcs(sudoku_not_yet_solved, processes=2)
+        == expected_solved
+    )
+
+
+# 2. Test count_solutions_pcs
+
+
+@pytest.mark.parametrize(
+    "processes, limit, expected_count",
+    [
+        (1, None, 20),
+        (2, None, 20),
+        (2, 1, 1),
+    ],
+)
+def test_count_solutions_pcs(processes, limit, expected_count):
+    """!@brief Test count_solutions_pcs function.
+
+    @details This function tests the count_solutions_pcs function. It tests
+    the following cases:
+
+    1. Test count_solutions_pcs in the calling process.
+    2. Test count_solutions_pcs with a process pool.
+    3. Test count_solutions_pcs with a limit (counting stops at the limit).
+
+    @param processes The number of processes.
+    @type processes int
+    @param limit The number of solutions after which counting stops.
+    @type limit int or None
+    @param expected_count The expected number of solutions (at least).
+    @type expected_count int
+    @return assertion True if the count matches the number of solutions.
+    """
+    count = parallel_solver.count_solutions_pcs(multiple_arr, limit, processes)
+    if limit is None:
+        assert count == expected_count
+    else:
+        assert expected_count <= count <= 20
+
+
+# 3. Test solve_sudoku_pcs in a pool worker
+
+
+def test_solve_sudoku_pcs_in_pool_worker():
+    """!@brief Test solve_sudoku_pcs inside a daemonic pool worker.
+
+    @details Pool workers cannot start a pool of their own, so the
+    subproblems must be searched in the worker (as in solve_batch with the
+    pcs solver) and give the same results.
+
+    @return assertion True if the worker solves and counts the sudokus.
+    """
+    sudoku = converters.convert_sudoku_txt_to_arr("tests_resources/easy_1.txt")
+    with multiprocessing.Pool(1) as pool:
+        solved = pool.apply(parallel_solver.solve_sudoku_pcs, (sudoku, 2))
+        count = pool.apply(
+            parallel_solver.count_solutions_pcs, (multiple_arr, None, 2)
+        )
+    assert solved == easy_solved
+    assert count == 20
@@ -0,0 +1,84 @@
+from src.solvers import registry
+import os
+import sys
+import subprocess
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+src_dir = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "src")
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_registry.py
+    @brief Module containing tests for the registry module.
+
+    @details This script contains tests for the registry module. It tests the
+    following function: get_solver, and that the CLI only imports the solver
+    it uses.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test get_solver
+
+
+@pytest.mark.parametrize(
+    "solver, expected_function",
+    [
+        ("bt", "solve_sudoku_bt"),
+        ("cs", "solve_sudoku_cs"),
+        ("xx", None),
+    ],
+)
+def test_get_solver(solver, expected_function):
+    """!@brief Test get_solver function.
+
+    @details This function tests the get_solver function. It tests the
+    following cases:
+
+    1. Test get_solver with the backtracking solver.
+    2. Test get_solver with the constraint satisfaction solver.
+    3. Test get_solver with an unknown solver.
+
+    @param solver The solver name.
+    @type solver str
+    @param expected_function The expected name of the solver function, or
+    None if a ValueError is expected.
+    @type expected_function str or None
+    @return assertion True if the solver function is loaded.
+    """
+    if expected_function is None:
+        with pytest.raises(ValueError):
+            registry.get_solver(solver)
+    else:
+        assert registry.get_solver(solver).__name__ == expected_function
+        assert registry.is_solver_loaded(solver)
+
+
+# 2. Test lazy loading of the CLI
+
+
+def test_cli_lazy_loading():
+    """!@brief Test that the CLI loads solvers lazily.
+
+    @details Solves an easy sudoku with the backtracking solver in a fresh
+    interpreter and checks that neither pulp nor the other solver modules
+    were imported. The start up time itself is not asserted, since it
+    depends on the load of the machine running the tests.
+    """
+    script = (
+        "import sys\n"
+        "import solve_sudoku\n"
+        "solve_sudoku.solve_sudoku('tests_resources/easy_1.txt', 'bt')\n"
+        "loaded = [m for m in ('pulp', 'solvers.linear_programming_solver',"
+        " 'solvers.constraint_satisfaction_solver') if m in sys.modules]\n"
+        "print('loaded:' + ','.join(loaded))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env={**os.environ, "PYTHONPATH": os.path.abspath(src_dir)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines()[-1] == "loaded:"
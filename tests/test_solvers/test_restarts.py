@@ -0,0 +1,155 @@
+from src.solvers import restarts
+from src.solvers import constraint_satisfaction_solver
+from src.processors import converters
+import itertools
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+medium_arr = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/medium_1.txt"
+)
+medium_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/medium_1_solved.txt"
+)
+hard_arr = converters.convert_sudoku_txt_to_arr("tests_resources/hard_1.txt")
+hard_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/hard_1_solved.txt"
+)
+unsolvable_arr = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/sudoku_valid_unsolveable.txt"
+)
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_restarts.py
+    @brief Module containing tests for the restarts module.
+
+    @details This script contains tests for the restarts module. It tests the
+    Luby and geometric node limit schedules, that the cs solver stops at
+    exactly the node limit with both cell orders, that solves with restarts are
+    deterministic for a fixed seed and that unknown schedules raise a
+    ValueError.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test the node limit schedules
+
+
+@pytest.mark.parametrize(
+    "schedule, factor, expected_limits",
+    [
+        ("luby", 1.5, [10, 10, 20, 10, 10, 20, 40, 10, 10, 20]),
+        ("geometric", 2, [10, 20, 40, 80, 160, 320, 640, 1280, 2560, 5120]),
+    ],
+)
+def test_get_node_limits(schedule, factor, expected_limits):
+    """!@brief Test the first node limits of the restart schedules.
+
+    @param schedule The restart schedule.
+    @type schedule str
+    @param factor The growth factor of the geometric schedule.
+    @type factor float
+    @param expected_limits The expected first ten node limits.
+    @type expected_limits list of int
+    """
+    limits = restarts.get_node_limits(schedule, unit=10, factor=factor)
+    assert list(itertools.islice(limits, 10)) == expected_limits
+    # The default unit is the one of solve_sudoku_restarts
+    assert next(restarts.get_node_limits(schedule)) == restarts.DEFAULT_UNIT
+
+
+# 2. Test node limits of the solvers
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"mode": "cbj"},
+        {"cell_order": "mrv"},
+        {"cell_order": "mrv", "ordering": "random", "seed": 1},
+    ],
+)
+def test_node_limit(options):
+    """!@brief Test that the cs solver stops at the node limit.
+
+    @details A search that needs exactly n nodes succeeds with a node limit
+    of n and stops after n - 1 nodes with a node limit of n - 1.
+
+    @param options Keyword arguments of solve_sudoku_cs.
+    @type options dict
+    """
+    solve_sudoku_cs = constraint_satisfaction_solver.solve_sudoku_cs
+    stats = {}
+    with pytest.raises(restarts.NodeLimitReached):
+        solve_sudoku_cs(hard_arr, stats=stats, node_limit=20, **options)
+    assert stats["nodes"] == 20
+    assert solve_sudoku_cs(medium_arr, node_limit=10**6, **options) == (
+        medium_solved
+    )
+    solve_stats = {}
+    solve_sudoku_cs(medium_arr, stats=solve_stats, **options)
+    nodes = solve_stats["nodes"]
+    assert solve_sudoku_cs(medium_arr, node_limit=nodes, **options) == (
+        medium_solved
+    )
+    with pytest.raises(restarts.NodeLimitReached):
+        solve_sudoku_cs(
+            medium_arr, stats=stats, node_limit=nodes - 1, **options
+        )
+    assert stats["nodes"] == nodes - 1
+
+
+# 3. Test solve_sudoku_restarts
+
+
+@pytest.mark.parametrize(
+    "options, sudoku, expected_solved",
+    [
+        ({}, medium_arr, medium_solved),
+        ({}, hard_arr, hard_solved),
+        ({"schedule": "geometric"}, medium_arr, medium_solved),
+        ({"ordering": "lcv"}, medium_arr, medium_solved),
+        ({}, unsolvable_arr, None),
+    ],
+)
+def test_solve_sudoku_restarts(options, sudoku, expected_solved):
+    """!@brief Test solve_sudoku_restarts.
+
+    @details Solves with a small unit (so that the search restarts) twice
+    with the same seed and checks that the results and statistics are the
+    same.
+
+    @param options Further keyword arguments of solve_sudoku_restarts.
+    @type options dict
+    @param sudoku The sudoku array to solve.
+    @type sudoku list of lists
+    @param expected_solved The expected solved sudoku.
+    @type expected_solved list of lists or None
+    """
+    stats = [{}, {}]
+    for run_stats in stats:
+        assert (
+            restarts.solve_sudoku_restarts(
+                sudoku, unit=5, seed=3, stats=run_stats, **options
+            )
+            == expected_solved
+        )
+    assert stats[0] == stats[1]
+    # The unsolvable sudoku is proven unsolvable within the first limit
+    assert (stats[0]["restarts"] > 0) == (expected_solved is not None)
+
+
+# 4. Test invalid solvers and schedules
+
+
+def test_solve_sudoku_restarts_errors():
+    """!@brief Test that unknown schedules and cell orders and the cbj mode
+    with the mrv cell order raise a ValueError."""
+    with pytest.raises(ValueError):
+        restarts.solve_sudoku_restarts(medium_arr, mode="cbj")
+    with pytest.raises(ValueError):
+        restarts.solve_sudoku_restarts(medium_arr, cell_order="column")
+    with pytest.raises(ValueError):
+        restarts.solve_sudoku_restarts(medium_arr, schedule="linear")
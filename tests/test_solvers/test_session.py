@@ -0,0 +1,127 @@
+from src.solvers import session
+from src.processors import converters
+import pytest
+
+# === TEST EXAMPLE DEFINITIONS ================================================
+
+sudoku_not_yet_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/sudoku_valid_not_yet_solved.txt"
+)
+
+sudoku_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/sudoku_valid_solved.txt"
+)
+
+hard = converters.convert_sudoku_txt_to_arr("tests_resources/hard_1.txt")
+
+easy = converters.convert_sudoku_txt_to_arr("tests_resources/easy_1.txt")
+easy_solved = converters.convert_sudoku_txt_to_arr(
+    "tests_resources/easy_1_solved.txt"
+)
+
+# === MAIN FUNCTION TESTS =====================================================
+"""!@file test_session.py
+    @brief Module containing tests for the session module.
+
+    @details This script contains tests for the session module. It tests the
+    SudokuSession class: incremental consistency checks, the cached solution
+    and the hints. The test resources are located in the tests_resources
+    folder.
+
+    @author Created by Steven Dillmann 17/12/2023
+"""
+
+# 1. Test SudokuSession consistency
+
+
+def test_session_consistency():
+    """!@brief Test SudokuSession incremental consistency checks.
+
+    @details Enters a conflicting number, checks that the cell and the
+    sudoku are reported inconsistent, clears it again and checks that givens
+    cannot be changed.
+    """
+    game = session.SudokuSession(sudoku_not_yet_solved)
+    assert game.is_consistent()
+    # Row 1 already contains a 3 (given in cell (1, 1))
+    assert not game.set_cell(0, 1, 3)
+    assert not game.is_consistent()
+    assert not game.is_cell_consistent(0, 0)
+    assert game.next_hint() is None
+    assert game.set_cell(0, 1, 0)
+    assert game.is_consistent()
+    assert game.get_candidates(0, 1) == [4, 7, 8]
+    with pytest.raises(ValueError):
+        game.set_cell(0, 0, 1)
+
+
+# 2. Test SudokuSession solution cache
+
+
+def test_session_solution_cache():
+    """!@brief Test SudokuSession cached solution.
+
+    @details Checks that a correct entry keeps the cached solution, that a
+    wrong entry invalidates it (the sudoku becomes unsolvable) and that
+    clearing the wrong entry makes it solvable again.
+    """
+    game = session.SudokuSession(sudoku_not_yet_solved)
+    assert game.get_solution() == sudoku_solved
+    assert game.set_cell(0, 1, 8)
+    assert game._solution  # still cached
+    assert game.is_entry_correct(0, 1)
+    assert game.set_cell(0, 6, 7)  # no conflict, but wrong
+    assert game._solution is None
+    assert not game.is_entry_correct(0, 6)
+    assert game.get_solution() is None
+    game.set_cell(0, 6, 0)
+    assert game.get_solution() == sudoku_solved
+
+
+def test_session_overwrite_after_conflict():
+    """!@brief Test that overwriting a conflicting entry with the correct
+    number invalidates the cached unsolvable result."""
+    game = session.SudokuSession(easy)
+    row, col = next(
+        (row, col)
+        for row in range(9)
+        for col in range(9)
+        if not easy[row][col]
+    )
+    conflict = next(num for num in easy[row] if num)
+    assert not game.set_cell(row, col, conflict)
+    assert game.get_solution() is None
+    assert game.set_cell(row, col, easy_solved[row][col])
+    assert game.is_consistent()
+    assert game.get_solution() == easy_solved
+    assert game.is_entry_correct(row, col)
+
+
+# 3. Test SudokuSession hints
+
+
+@pytest.mark.parametrize("sudoku", [sudoku_not_yet_solved, hard])
+def test_session_hints(sudoku):
+    """!@brief Test SudokuSession next_hint function.
+
+    @details Applies hints until none is left and checks that every hint
+    agrees with the solution, that the session stays consistent and that
+    the hints filled in some cells.
+
+    @param sudoku The sudoku array to fill with hints.
+    @type sudoku list of lists
+    """
+    game = session.SudokuSession(sudoku)
+    solution = game.get_solution()
+    hint = game.next_hint()
+    assert hint is not None
+    while hint is not None:
+        row, col, num, reason = hint
+        assert reason in ("naked single", "hidden single")
+        assert solution[row][col] == num
+        assert game.set_cell(row, col, num)
+        hint = game.next_hint()
+    assert game.is_consistent()
+    assert sum(row.count(0) for row in game.to_array()) < sum(
+        row.count(0) for row in sudoku
+    )
@@ -1,18 +1,25 @@
 import os
 import sys
 
+# The corpus reader lives in src/processors
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+from processors.corpus import iter_corpus_lines, is_compressed  # noqa: E402
+
 
 def save_sudokus(sudoku_category_file):
+    # Strip the compression suffix from the file name
+    uncompressed_file = sudoku_category_file
+    if is_compressed(sudoku_category_file):
+        uncompressed_file = os.path.splitext(sudoku_category_file)[0]
     # Extract filename without extension
-    category_name = os.path.splitext(os.path.basename(sudoku_category_file))[0]
+    category_name = os.path.splitext(os.path.basename(uncompressed_file))[0]
     directory_path = os.path.dirname(sudoku_category_file)
     full_category_name = os.path.join(directory_path, category_name)
     # Create a directory for the sudokus
     if not os.path.exists(full_category_name):
         os.makedirs(full_category_name)
-    # Read the file
-    with open(sudoku_category_file, "r") as file:
-        sudokus = file.read().splitlines()
 
     # Define a function to format and save sudoku puzzles
     def save_sudoku(idx, puzzle):
@@ -30,8 +37,9 @@ def save_sudokus(sudoku_category_file):
         with open(sudoku_name, "w") as output_file:
             output_file.write(formatted_sudoku)
 
-    # Parse each sudoku and save as separate file
-    for idx, sudoku in enumerate(sudokus):
+    # Parse each sudoku and save as separate file, streaming the lines with
+    # the corpus reader (decompressed while reading)
+    for idx, sudoku in enumerate(iter_corpus_lines(sudoku_category_file)):
         save_sudoku(idx + 1, sudoku)
 
 